@@ -0,0 +1,51 @@
+"""
+Synthetic data generators shared by the benchmarks.
+"""
+
+import numpy as np
+import numpy.typing as npt
+
+# Parameter ranges of the true models, chosen so that every form stays finite on [1, 10].
+PARAM_RANGES = {
+    "linear": [(-10, 10), (-5, 5)],
+    "exponential": [(-5, 5), (-0.5, 0.5), (-10, 10)],
+    "logarithmic": [(-10, 10), (-5, 5)],
+    # The breakpoint, then the intercept and slope of each segment.
+    "piecewise_linear": [(3, 8), (-10, 10), (-5, 5), (-10, 10), (-5, 5)],
+    "piecewise_logarithmic": [(3, 8), (-10, 10), (-5, 5), (-10, 10), (-5, 5)],
+}
+
+
+def make_series(
+    form,
+    name: str,
+    n_points: int,
+    n_series: int,
+    noise: float,
+    seed: int = 0,
+) -> tuple[npt.NDArray[np.floating], npt.NDArray[np.floating], npt.NDArray[np.floating]]:
+    """
+    Draw series from a functional form with random parameters and Gaussian noise.
+
+    Args:
+        form (FunctionalFormStrategy): The form generating the data.
+        name (str): The name of the form, used to look up its parameter ranges.
+        n_points (int): The number of points per series.
+        n_series (int): The number of series.
+        noise (float): The noise standard deviation, relative to the spread of each series.
+        seed (int): The random seed.
+
+    Returns:
+        tuple: The shared x of shape (n_points,), the y data of shape (n_series, n_points) and
+            the true parameters of shape (n_series, n_params).
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(1, 10, n_points)
+    low, high = np.array(PARAM_RANGES[name]).T
+    params = rng.uniform(low, high, (n_series, len(low)))
+
+    y = np.empty((n_series, n_points))
+    for i, p in enumerate(params):
+        y[i] = form.func(x, *p)
+        y[i] += rng.normal(0, noise * (np.std(y[i]) + 1e-12), n_points)
+    return x, y, params
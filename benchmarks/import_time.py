@@ -0,0 +1,64 @@
+"""
+Measure the cost of importing FitMaster entry points in a fresh interpreter.
+
+Every target is imported in a new subprocess, so nothing is cached between runs, and the script
+reports the best wall time over the repeats and which heavy optional modules the import loaded.
+Importing the tool must not load matplotlib; the script exits with status 1 if it does.
+
+Usage:
+    python -m benchmarks.import_time --repeats 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = {
+    "tool": "from fitmaster.core.curve_fitting_tool import CurveFittingTool",
+    "forms": "from fitmaster.forms.factory import FunctionalFormFactory",
+    "criteria": "from fitmaster.criteria.factory import ModelSelectionCriterionFactory",
+    "visualizer": "from fitmaster.core.visualization import CurveFittingVisualizer",
+}
+
+HEAVY_MODULES = ("matplotlib", "scipy.stats", "scipy.optimize", "joblib")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str) -> dict:
+    code = PROBE.format(statement=statement, modules=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'target':<12} {'best (ms)':>10}  loaded")
+    loads_matplotlib = False
+    for name, statement in TARGETS.items():
+        runs = [measure(statement) for _ in range(args.repeats)]
+        best = min(run["elapsed"] for run in runs)
+        loaded = runs[0]["loaded"]
+        print(f"{name:<12} {best * 1e3:>10.1f}  {', '.join(loaded) or '-'}")
+        if name != "visualizer" and "matplotlib" in loaded:
+            loads_matplotlib = True
+
+    if loads_matplotlib:
+        print("matplotlib is imported by a headless entry point.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite for CurveFittingTool over forms, series lengths, batch sizes, noise levels and
+criteria subsets.
+
+Every case fits one functional form to synthetic data, through `search_and_evaluate` for a
+single series and `search_and_evaluate_batch` otherwise, and reports the best wall time over the
+repeats, the throughput in points per second, the peak traced memory and the number of model
+evaluations (calls to ``func``, ``basis`` and ``fit``) per series. Results can be saved as a baseline and
+later runs compared against it to catch regressions.
+
+Usage:
+    python -m benchmarks.suite --profile quick --save baseline.json
+    python -m benchmarks.suite --profile quick --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+import warnings
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from benchmarks.generators import make_series
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+PROFILES = {
+    "quick": {
+        "n_points": [100, 10_000],
+        "n_series": [1, 100],
+        "noise": [0.05],
+        "criteria": [("r_squared",), ("aic", "bic", "r_squared")],
+    },
+    "full": {
+        "n_points": [10, 1_000, 100_000, 10_000_000],
+        "n_series": [1, 100, 10_000, 100_000],
+        "noise": [0.0, 0.05, 0.2],
+        "criteria": [("r_squared",), ("aic", "bic", "r_squared")],
+    },
+}
+
+
+class CountingForm(FunctionalFormStrategy):
+    """
+    Wraps a functional form and counts how often the model is evaluated.
+    """
+
+    def __init__(self, form: FunctionalFormStrategy):
+        self.form = form
+        self.linear_params = form.linear_params
+        self.evaluations = 0
+
+    @property
+    def num_params(self) -> int:
+        return self.form.num_params
+
+    @property
+    def has_jacobian(self) -> bool:
+        return self.form.has_jacobian
+
+    @property
+    def has_fit(self) -> bool:
+        return self.form.has_fit
+
+    def func(self, x, *params):
+        self.evaluations += 1
+        return self.form.func(x, *params)
+
+    def initial_guess(self, x, y):
+        return self.form.initial_guess(x, y)
+
+    def basis(self, x, *nonlinear_params):
+        self.evaluations += 1
+        return self.form.basis(x, *nonlinear_params)
+
+    def jacobian(self, x, *params):
+        return self.form.jacobian(x, *params)
+
+    def fit(self, x, y, sigma=None):
+        self.evaluations += 1
+        return self.form.fit(x, y, sigma)
+
+
+@dataclass
+class Measurement:
+    case: str
+    form: str
+    n_points: int
+    n_series: int
+    noise: float
+    criteria: str
+    seconds: float
+    points_per_second: float
+    peak_mib: float
+    evaluations_per_series: float
+
+
+def run_case(form_name, n_points, n_series, noise, criteria, repeat, n_jobs) -> Measurement:
+    tool = CurveFittingTool()
+    counting = CountingForm(tool.form_factory.get_functional_form(form_name))
+    tool.form_factory.functional_forms[form_name] = counting
+    x, y, _ = make_series(counting.form, form_name, n_points, n_series, noise)
+
+    def fit():
+        if n_series == 1:
+            tool.search_and_evaluate(x, y[0], [form_name], list(criteria))
+        else:
+            tool.search_and_evaluate_batch(
+                x, y, [form_name], list(criteria), n_jobs=n_jobs, backend="threading"
+            )
+
+    seconds = np.inf
+    for _ in range(repeat):
+        counting.evaluations = 0
+        start = time.perf_counter()
+        fit()
+        seconds = min(seconds, time.perf_counter() - start)
+    evaluations = counting.evaluations / n_series
+
+    tracemalloc.start()
+    fit()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return Measurement(
+        case=f"{form_name}/n={n_points}/series={n_series}/noise={noise}/{'+'.join(criteria)}",
+        form=form_name,
+        n_points=n_points,
+        n_series=n_series,
+        noise=noise,
+        criteria="+".join(criteria),
+        seconds=seconds,
+        points_per_second=n_points * n_series / seconds,
+        peak_mib=peak / 2**20,
+        evaluations_per_series=evaluations,
+    )
+
+
+def compare(measurements, baseline_path, threshold) -> bool:
+    """
+    Print the change of every case against a baseline and return whether any case regressed.
+    """
+    with open(baseline_path) as f:
+        baseline = {m["case"]: m for m in json.load(f)}
+
+    regressed = False
+    print(f"\n{'case':<70} {'time':>8} {'memory':>8}")
+    for m in measurements:
+        if m.case not in baseline:
+            continue
+        old = baseline[m.case]
+        time_ratio = m.seconds / old["seconds"]
+        memory_ratio = m.peak_mib / max(old["peak_mib"], 1e-9)
+        flag = ""
+        if time_ratio > 1 + threshold or memory_ratio > 1 + threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        print(f"{m.case:<70} {time_ratio:>7.2f}x {memory_ratio:>7.2f}x{flag}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", choices=PROFILES, default="quick")
+    parser.add_argument("--forms", nargs="*", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument(
+        "--max-elements",
+        type=float,
+        default=1e8,
+        help="Skip cases with more than this many points in total.",
+    )
+    parser.add_argument("--save", help="Write the measurements to this JSON file.")
+    parser.add_argument("--compare", help="Compare against a baseline JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    profile = PROFILES[args.profile]
+    forms = args.forms or list(CurveFittingTool().form_factory.functional_forms)
+
+    print(
+        f"{'case':<70} {'seconds':>9} {'points/s':>10} {'peak MiB':>9} {'evals':>7}"
+    )
+    measurements = []
+    for form, n_points, n_series, noise, criteria in itertools.product(
+        forms,
+        profile["n_points"],
+        profile["n_series"],
+        profile["noise"],
+        profile["criteria"],
+    ):
+        if n_points * n_series > args.max_elements:
+            continue
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            m = run_case(form, n_points, n_series, noise, criteria, args.repeat, args.n_jobs)
+        measurements.append(m)
+        print(
+            f"{m.case:<70} {m.seconds:>9.4f} {m.points_per_second:>10.3g} "
+            f"{m.peak_mib:>9.1f} {m.evaluations_per_series:>7.1f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump([asdict(m) for m in measurements], f, indent=2)
+    if args.compare and compare(measurements, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
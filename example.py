@@ -1,5 +1,6 @@
 import numpy as np
-from fitmaster.core.curve_fitting_tool import CurveFittingTool, CurveFittingVisualizer
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.visualization import CurveFittingVisualizer
 import matplotlib.pyplot as plt
 
 # Generate example univariate data
@@ -0,0 +1,269 @@
+import asyncio
+import copy
+import os
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Self, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.core.cache import FitCache
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.results import FitResult
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+T = TypeVar("T")
+
+
+class AsyncCurveFittingTool:
+    """
+    Asynchronous front end of a CurveFittingTool, for use from an asyncio event loop.
+
+    Fits run on an executor, so the event loop stays responsive while they compute. At most
+    ``max_concurrency`` fits run at a time; further calls wait their turn in the event loop, which
+    applies backpressure instead of queueing unbounded work on the executor.
+
+    A call can be cancelled, or given a timeout, like any coroutine. Work that has not started
+    yet is dropped. A fit cannot be interrupted from outside its thread, so a timed-out fit is
+    also given a budget deadline at its timeout, at which it stops by itself, and its
+    concurrency slot is freed only then.
+
+    With ``coalesce``, a call identical to one still in flight (same data, forms, criteria,
+    options and timeout) waits for the result of that call instead of fitting again. The shared
+    work is cancelled only once every caller waiting for it has been cancelled.
+
+    An instance must be used from a single event loop.
+
+    Attributes:
+        tool (CurveFittingTool): The tool doing the fitting.
+        executor (Executor): The executor the fits run on.
+        max_concurrency (int): The maximum number of fits running at a time.
+        timeout (float | None): The default timeout of every call, in seconds.
+        coalesce (bool): Whether identical in-flight calls share their work.
+    """
+
+    def __init__(
+        self,
+        tool: CurveFittingTool | None = None,
+        executor: Executor | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        coalesce: bool = False,
+    ):
+        """
+        Initialize the asynchronous tool.
+
+        Args:
+            tool (CurveFittingTool, optional): The tool doing the fitting. A default one is
+                created.
+            executor (Executor, optional): The executor to run the fits on. It must not be the
+                executor of ``tool``. By default a thread pool with ``max_concurrency`` workers is
+                created, and shut down by `close`.
+            max_concurrency (int, optional): The maximum number of fits running at a time.
+                Defaults to the number of CPUs.
+            timeout (float, optional): The default timeout of every call, in seconds.
+            coalesce (bool): Whether identical in-flight calls share their work.
+        """
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+        self.tool = tool if tool is not None else CurveFittingTool()
+        self._owns_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.coalesce = coalesce
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: dict[str, list] = {}
+
+    async def fit_and_evaluate(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        funtional_form: FunctionalFormStrategy,
+        criterions: list[str] | None = None,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> FitResult:
+        """
+        Fit a curve to the data and evaluate the fit, like `CurveFittingTool.fit_and_evaluate`.
+
+        Parameters:
+        x (npt.NDArray): The x data.
+        y (npt.NDArray): The y data.
+        form (str): The form of the function to fit.
+        funtional_form (FunctionalFormStrategy): The function to fit.
+        criterions (list[str], optional): The criteria to use for evaluating the fit.
+        timeout (float, optional): The timeout of the call in seconds, including the time spent
+            waiting for a concurrency slot. Defaults to the tool's timeout.
+
+        Returns:
+        FitResult: The parameters and criteria of the fit.
+
+        Raises:
+        TimeoutError: If the call does not complete in time.
+        BudgetExceededError: If the fit exceeds the per-form budget of the tool.
+        RuntimeError: If the optimizer does not converge.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        args = (x, y, form, funtional_form, criterions)
+        key = None
+        if self.coalesce:
+            key = FitCache.key(
+                x, y, form, funtional_form, criterions, {**kwargs, "timeout": timeout}
+            )
+        return await self._call("fit_and_evaluate", args, kwargs, timeout, key)
+
+    async def search_and_evaluate(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        functional_forms: list[str] | None = None,
+        criterions: list[str] | None = None,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> list[FitResult]:
+        """
+        Search for the best fit among a list of functional forms, like
+        `CurveFittingTool.search_and_evaluate`.
+
+        Parameters:
+        x (npt.NDArray): The x data.
+        y (npt.NDArray): The y data.
+        functional_forms (list[str], optional): The functional forms to consider.
+        criterions (list[str], optional): The criteria to use for evaluating the fit.
+        timeout (float, optional): The timeout of the call in seconds, including the time spent
+            waiting for a concurrency slot. Defaults to the tool's timeout.
+
+        Returns:
+        list[FitResult]: The results of the fits and evaluations, sorted by R^2 value with
+            failed fits last.
+
+        Raises:
+        TimeoutError: If the call does not complete in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        args = (x, y, functional_forms, criterions)
+        key = None
+        if self.coalesce:
+            forms = self.tool.form_factory.select(functional_forms)
+            key = FitCache.key(
+                x, y, ",".join(forms), forms, criterions, {**kwargs, "timeout": timeout}
+            )
+        results = await self._call("search_and_evaluate", args, kwargs, timeout, key)
+        # Coalesced callers share the results but not the list.
+        return list(results)
+
+    async def _call(
+        self,
+        method: str,
+        args: tuple,
+        kwargs: dict,
+        timeout: float | None,
+        key: str | None,
+    ) -> Any:
+        """
+        Run a method of the tool on the executor, within the timeout, sharing in-flight work.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        async with asyncio.timeout(timeout):
+            if key is None:
+                return await self._run(method, args, kwargs, deadline)
+            return await self._shared(key, lambda: self._run(method, args, kwargs, deadline))
+
+    async def _run(
+        self, method: str, args: tuple, kwargs: dict, deadline: float | None
+    ) -> Any:
+        """
+        Run a method of the tool on the executor once a concurrency slot is free.
+        """
+        await self._semaphore.acquire()
+        try:
+            future = self.executor.submit(_call_tool, self.tool, method, args, kwargs, deadline)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        # The slot is held until the fit ends, even if its caller stops waiting, so abandoned
+        # fits still count against the concurrency limit.
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                pass  # The loop has closed.
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def _shared(self, key: str, start: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the in-flight task of a key, starting it if there is none.
+        """
+        entry = self._in_flight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(start())
+            entry = self._in_flight[key] = [task, 0]
+
+            def forget(_, key=key, entry=entry):
+                if self._in_flight.get(key) is entry:
+                    del self._in_flight[key]
+
+            task.add_done_callback(forget)
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()
+                # Later identical calls start afresh rather than join the cancelled task.
+                if self._in_flight.get(key) is entry:
+                    del self._in_flight[key]
+
+    def close(self) -> None:
+        """
+        Shut down the executor, if it was created by this tool, cancelling fits not yet started.
+        """
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _call_tool(
+    tool: CurveFittingTool,
+    method: str,
+    args: tuple,
+    kwargs: dict,
+    deadline: float | None,
+) -> Any:
+    """
+    Call a method of the tool, with the time left before the deadline as its time budget.
+    """
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("The call timed out before its fit started.")
+        budget = tool.budget
+        field = "search_timeout" if method == "search_and_evaluate" else "timeout"
+        limit = getattr(budget, field)
+        budget = replace(budget, **{field: remaining if limit is None else min(limit, remaining)})
+        # A shallow copy with its own budget, sharing the caches of the tool. Copying goes
+        # through __getstate__, which drops the hooks and executor, so they are shared again.
+        limited = copy.copy(tool)
+        limited.budget = budget
+        limited.hooks = tool.hooks
+        limited.executor = tool.executor
+        tool = limited
+    return getattr(tool, method)(*args, **kwargs)
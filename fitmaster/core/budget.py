@@ -0,0 +1,115 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import wraps
+
+
+class BudgetExceededError(RuntimeError):
+    """
+    Raised inside a fit when it exceeds its evaluation or wall-clock budget.
+
+    It derives from RuntimeError, like the error ``curve_fit`` raises when it runs out of
+    evaluations, so callers handling non-convergence handle exhausted budgets too.
+    """
+
+
+# Errors that mark a single fit as failed instead of aborting a search.
+FIT_ERRORS = (RuntimeError, ValueError, OverflowError, FloatingPointError)
+
+
+@dataclass(frozen=True)
+class FitBudget:
+    """
+    Limits on the work spent fitting forms, per form and per search.
+
+    A form that exceeds its budget is reported by `search_and_evaluate` as a failed result and
+    the search moves on to the next form. Every limit is optional.
+
+    Attributes:
+        max_nfev (int | None): The maximum number of model evaluations of one form.
+        timeout (float | None): The maximum wall time of one form, in seconds.
+        search_max_nfev (int | None): The maximum number of model evaluations of a whole search.
+        search_timeout (float | None): The maximum wall time of a whole search, in seconds.
+        stop_r_squared (float | None): Stop a search as soon as a form reaches this R^2; the
+            remaining forms are reported as skipped.
+    """
+
+    max_nfev: int | None = None
+    timeout: float | None = None
+    search_max_nfev: int | None = None
+    search_timeout: float | None = None
+    stop_r_squared: float | None = None
+
+    def limiter(
+        self,
+        search_deadline: float | None = None,
+        search_nfev_left: int | None = None,
+    ) -> "EvaluationLimiter | None":
+        """
+        Create the limiter of a single form, starting its clock now.
+
+        Args:
+            search_deadline (float, optional): The ``time.perf_counter`` deadline of the search.
+            search_nfev_left (int, optional): The evaluations left in the search budget.
+
+        Returns:
+            EvaluationLimiter | None: The limiter, or None if the form is unlimited.
+        """
+        deadline = None if self.timeout is None else time.perf_counter() + self.timeout
+        if search_deadline is not None:
+            deadline = search_deadline if deadline is None else min(deadline, search_deadline)
+        max_nfev = self.max_nfev
+        if search_nfev_left is not None:
+            max_nfev = search_nfev_left if max_nfev is None else min(max_nfev, search_nfev_left)
+
+        if deadline is None and max_nfev is None:
+            return None
+        return EvaluationLimiter(max_nfev, deadline)
+
+
+class EvaluationLimiter:
+    """
+    Counts the model evaluations of one fit and stops it once a limit is exceeded.
+
+    Attributes:
+        max_nfev (int | None): The maximum number of model evaluations.
+        deadline (float | None): The ``time.perf_counter`` value after which the fit is stopped.
+        nfev (int): The number of model evaluations so far.
+    """
+
+    def __init__(self, max_nfev: int | None = None, deadline: float | None = None):
+        self.max_nfev = max_nfev
+        self.deadline = deadline
+        self.nfev = 0
+
+    def check(self, count: bool = True) -> None:
+        """
+        Record a model evaluation and enforce the limits.
+
+        Args:
+            count (bool): Whether the call counts as a model evaluation. Jacobian evaluations
+                are only checked against the deadline.
+
+        Raises:
+            BudgetExceededError: If a limit is exceeded.
+        """
+        if count:
+            self.nfev += 1
+            if self.max_nfev is not None and self.nfev > self.max_nfev:
+                raise BudgetExceededError(
+                    f"Evaluation budget of {self.max_nfev} model evaluations exceeded."
+                )
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceededError("Time budget exceeded.")
+
+    def wrap(self, fn: Callable, count: bool = True) -> Callable:
+        """
+        Wrap a model function so that each call is checked against the limits.
+        """
+
+        @wraps(fn)
+        def wrapped(*args, **kwargs):
+            self.check(count)
+            return fn(*args, **kwargs)
+
+        return wrapped
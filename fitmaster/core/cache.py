@@ -0,0 +1,393 @@
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+import fitmaster
+
+
+# Number of evenly spaced values of x hashed by the fingerprint of a cached design.
+_FINGERPRINT_SAMPLES = 1024
+
+
+class CacheInfo(NamedTuple):
+    """
+    Usage counters of a FitCache, in the spirit of ``functools.lru_cache``.
+
+    Attributes:
+        hits (int): Lookups answered from memory or disk.
+        misses (int): Lookups that required a fit.
+        disk_hits (int): The subset of hits answered from the on-disk store.
+        maxsize (int): The maximum number of results kept in memory.
+        currsize (int): The number of results currently kept in memory.
+    """
+
+    hits: int
+    misses: int
+    disk_hits: int
+    maxsize: int
+    currsize: int
+
+
+class FitCache:
+    """
+    Content-addressed cache of fit results with LRU eviction and an optional on-disk store.
+
+    Results are keyed by a hash of the x and y buffers, the functional form and its
+    configuration, the criteria and the fitting options, together with the library version, so
+    a result is only reused for exactly the same inputs. The most recently used results are kept
+    in memory; when a ``location`` is given, every result is also written there and survives
+    restarts.
+
+    Attributes:
+        maxsize (int): The maximum number of results kept in memory.
+        location (Path | None): The directory of the on-disk store, if any.
+    """
+
+    def __init__(self, maxsize: int = 1024, location: str | os.PathLike | None = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): The maximum number of results kept in memory.
+            location (str | os.PathLike, optional): A directory for the persistent store.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative.")
+        self.maxsize = maxsize
+        self.location = None if location is None else Path(location)
+        if self.location is not None:
+            self.location.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._disk_hits = 0
+
+    @staticmethod
+    def key(
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        functional_form: object,
+        criterions: list[str] | tuple[str, ...] | None,
+        kwargs: dict[str, Any],
+    ) -> str:
+        """
+        Compute the cache key of a fit.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The x data.
+            y (npt.NDArray[np.floating | np.integer]): The y data.
+            form (str): The name of the functional form.
+            functional_form (object): The functional form strategy, whose configuration is part
+                of the key, or a mapping of names to strategies.
+            criterions (list[str] | tuple[str, ...] | None): The criteria to evaluate.
+            kwargs (dict[str, Any]): The options passed to the optimizer.
+
+        Returns:
+            str: A hexadecimal digest identifying the fit.
+        """
+        # joblib is imported on use, here and below, to keep the import of the tool light.
+        import joblib
+
+        digest = hashlib.blake2b(digest_size=20)
+        for array in (x, y):
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(array.data)
+        digest.update(
+            joblib.hash(
+                (
+                    fitmaster.__version__,
+                    form,
+                    _form_state(functional_form),
+                    None if criterions is None else sorted(criterions),
+                    sorted(kwargs.items()),
+                )
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Look up a result, from memory first and then from the on-disk store.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Any | None: The cached result, or None on a miss. Cached results are shared and
+                must not be modified.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+
+        path = self._path(key)
+        if path is not None and path.exists():
+            import joblib
+
+            value = joblib.load(path)
+            with self._lock:
+                self._hits += 1
+                self._disk_hits += 1
+                self._remember(key, value)
+            return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a result in memory and, if configured, on disk.
+
+        Args:
+            key (str): The cache key.
+            value (Any): The result to store.
+        """
+        with self._lock:
+            self._remember(key, value)
+
+        path = self._path(key)
+        if path is not None:
+            # Write to a temporary file first so readers never see a partial result.
+            import joblib
+
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            joblib.dump(value, tmp)
+            os.replace(tmp, path)
+
+    def clear(self) -> None:
+        """
+        Empty the in-memory cache and reset the counters. The on-disk store is left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._disk_hits = 0
+
+    @property
+    def info(self) -> CacheInfo:
+        """
+        The usage counters of the cache.
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._disk_hits, self.maxsize, len(self._entries)
+            )
+
+    def _remember(self, key: str, value: Any) -> None:
+        """
+        Insert a result into the in-memory LRU, evicting the least recently used ones.
+        """
+        if self.maxsize == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path | None:
+        return None if self.location is None else self.location / f"{key}.pkl"
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Worker processes get an empty in-memory cache but share the on-disk store.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_entries"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class LinearDesign:
+    """
+    The basis of a fully linear form at fixed x, factorized once for any number of series.
+
+    Attributes:
+        basis (npt.NDArray[np.floating]): The basis matrix of shape (n_points, n_params).
+        solver (npt.NDArray[np.floating]): The least-squares pseudo-inverse of the basis, of
+            shape (n_params, n_points), so that the parameters of a series are ``solver @ y``.
+    """
+
+    basis: npt.NDArray[np.floating]
+    solver: npt.NDArray[np.floating]
+
+    @classmethod
+    def from_basis(cls, basis: npt.NDArray[np.floating]) -> "LinearDesign":
+        """
+        Factorize a basis, with the column equilibration of the linear solver.
+        """
+        scale = np.abs(basis).max(axis=0)
+        scale[scale == 0] = 1.0
+        rcond = np.finfo(float).eps * max(basis.shape)
+        solver = np.linalg.pinv(basis / scale, rcond=rcond) / scale[:, None]
+        return cls(basis, solver)
+
+    def solve(self, y: npt.NDArray[np.floating | np.integer]) -> npt.NDArray[np.floating]:
+        """
+        Compute the least-squares parameters of one series, shape (n_points,), or of many,
+        shape (n_series, n_points).
+        """
+        return y @ self.solver.T
+
+    @property
+    def nbytes(self) -> int:
+        return self.basis.nbytes + self.solver.nbytes
+
+
+class DesignCache:
+    """
+    Cache of the factorized bases of fully linear forms, keyed by the x array they were built on.
+
+    Batches and repeated fits that share one x array then pay for the basis and its
+    factorization once, and every further series costs a single matrix-vector product.
+
+    Entries are keyed by the identity of the x array and of the form object, and an entry is
+    released as soon as either object is garbage collected. Every entry also records a
+    fingerprint of x (its shape, type, strides, data pointer and a hash of a fixed number of
+    evenly spaced values), which is checked on each lookup, so an x array overwritten in place is
+    refactorized instead of reusing a stale design. The check costs the same whatever the size
+    of x; in exchange, an in-place change to values outside the sample goes unnoticed, so arrays
+    edited piecemeal should be copied, or the cache cleared, before they are fitted again.
+
+    Attributes:
+        max_bytes (int): The maximum total size of the cached arrays. Designs larger than this
+            are computed but not cached.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): The maximum total size of the cached arrays.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[int, int], tuple] = OrderedDict()
+        # Reentrant, as a garbage collection inside a locked section may run `_release`.
+        self._lock = threading.RLock()
+        self._hits = self._misses = 0
+        self._nbytes = 0
+
+    def get(
+        self,
+        functional_form: object,
+        x: npt.NDArray[np.floating | np.integer],
+    ) -> LinearDesign | None:
+        """
+        Return the factorized basis of a fully linear form at ``x``, computing it on a miss.
+
+        Args:
+            functional_form (FunctionalFormStrategy): A form without nonlinear parameters.
+            x (npt.NDArray[np.floating | np.integer]): The x data.
+
+        Returns:
+            LinearDesign | None: The design, or None if the basis is not finite.
+        """
+        key = (id(x), id(functional_form))
+        fingerprint = _fingerprint(x) if isinstance(x, np.ndarray) else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                x_ref, form_ref, cached_fingerprint, design = entry
+                if (
+                    x_ref() is x
+                    and form_ref() is functional_form
+                    and cached_fingerprint == fingerprint
+                ):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return design
+                self._discard(key)
+            self._misses += 1
+
+        basis = functional_form.basis(x)
+        if not np.isfinite(basis).all():
+            return None
+        design = LinearDesign.from_basis(basis)
+        if isinstance(x, np.ndarray) and design.nbytes <= self.max_bytes:
+            try:
+                refs = (
+                    weakref.ref(x, self._release),
+                    weakref.ref(functional_form, self._release),
+                )
+            except TypeError:
+                return design
+            with self._lock:
+                self._discard(key)
+                self._entries[key] = (*refs, fingerprint, design)
+                self._nbytes += design.nbytes
+                while self._nbytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+        return design
+
+    def clear(self) -> None:
+        """
+        Empty the cache and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._nbytes = 0
+
+    @property
+    def info(self) -> CacheInfo:
+        """
+        The usage counters of the cache; ``maxsize`` and ``currsize`` are in bytes.
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, 0, self.max_bytes, self._nbytes)
+
+    def _release(self, ref: weakref.ref) -> None:
+        """
+        Drop the entry of an array or form that has been garbage collected.
+        """
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[0] is ref or entry[1] is ref:
+                    self._discard(key)
+
+    def _discard(self, key: tuple[int, int]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[-1].nbytes
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Designs are keyed by object identity, which does not survive pickling.
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["max_bytes"])
+
+
+def _form_state(functional_form: object) -> Any:
+    """
+    The class and configuration of a form, or of every form of a mapping of forms.
+    """
+    if isinstance(functional_form, Mapping):
+        return [(name, _form_state(f)) for name, f in functional_form.items()]
+    return type(functional_form).__qualname__, getattr(functional_form, "__dict__", None)
+
+
+def _fingerprint(x: npt.NDArray) -> tuple:
+    """
+    Identify the layout of an array and a sample of its contents, to detect in-place
+    modifications in a time independent of its size.
+    """
+    sample = x.flat[np.linspace(0, x.size - 1, min(x.size, _FINGERPRINT_SAMPLES), dtype=int)]
+    digest = hashlib.blake2b(np.ascontiguousarray(sample).data, digest_size=16)
+    return (x.shape, x.dtype.str, x.strides, x.__array_interface__["data"][0], digest.digest())
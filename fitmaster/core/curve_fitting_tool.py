@@ -1,23 +1,74 @@
-import matplotlib.pyplot as plt
-from matplotlib.axes import Axes
-from matplotlib.figure import Figure
+import time
+from concurrent.futures import Executor
+from dataclasses import replace
+
 import numpy as np
 import numpy.typing as npt
-import scipy.stats as stats
-from scipy.optimize import curve_fit
+from scipy.optimize import Bounds, OptimizeResult, curve_fit
 
+from fitmaster.core.budget import FIT_ERRORS, EvaluationLimiter, FitBudget
+from fitmaster.core.cache import DesignCache, FitCache
+from fitmaster.core.hooks import FitHook
+from fitmaster.core.least_squares import (
+    _column_scale,
+    cross_validation_residuals,
+    solve_linear,
+    solve_separable,
+)
+from fitmaster.core.multistart import MultiStart
+from fitmaster.core.results import (
+    BatchSearchResult,
+    BootstrapResult,
+    FitResult,
+    MultiResolutionResult,
+    r_squared_key,
+)
 from fitmaster.criteria.factory import ModelSelectionCriterionFactory
+from fitmaster.criteria.statistics import FitStatistics
 from fitmaster.forms.factory import FunctionalFormFactory
 from fitmaster.forms.interface import FunctionalFormStrategy
 
+# curve_fit options that the linear and variable-projection solvers understand.
+_LINEAR_SOLVER_KWARGS = {"sigma", "absolute_sigma", "maxfev", "check_finite"}
+
 
 class CurveFittingTool:
-    def __init__(self):
+    def __init__(
+        self,
+        cache: FitCache | None = None,
+        hooks: list[FitHook] | None = None,
+        budget: FitBudget | None = None,
+        multistart: MultiStart | None = None,
+        design_cache: DesignCache | None = None,
+        executor: Executor | None = None,
+    ):
         """
         Initialize the CurveFittingTool with factories for functional forms and model selection criteria.
+
+        Parameters:
+        cache (FitCache, optional): A cache of fit results, reused by `fit_and_evaluate` and
+            `search_and_evaluate` when the same series is fitted again with the same options.
+        hooks (list[FitHook], optional): Callbacks notified of every fit, search and batch, e.g.
+            to export timings to a metrics system.
+        budget (FitBudget, optional): Evaluation and time limits per form and per search.
+        multistart (MultiStart, optional): Fit forms with nonlinear parameters from several
+            screened starting points instead of the single data-driven guess, unless a ``p0`` is
+            given.
+        design_cache (DesignCache, optional): The cache of factorized bases of fully linear
+            forms, shared by all series fitted on the same x array. A default one is created.
+        executor (Executor, optional): An executor, e.g. a ``ThreadPoolExecutor``, on which
+            `search_and_evaluate` fits the forms of a series concurrently. Most of a fit runs in
+            NumPy and MINPACK code, so threads cut the latency of a single large series. The
+            executor is owned by the caller and must not be the one running the search.
         """
         self.form_factory = FunctionalFormFactory()
         self.criterion_factory = ModelSelectionCriterionFactory()
+        self.cache = cache
+        self.hooks = list(hooks or [])
+        self.budget = budget if budget is not None else FitBudget()
+        self.multistart = multistart
+        self.design_cache = design_cache if design_cache is not None else DesignCache()
+        self.executor = executor
 
     def fit_and_evaluate(
         self,
@@ -27,10 +78,14 @@ class CurveFittingTool:
         funtional_form: FunctionalFormStrategy,
         criterions: list[str] | None = None,
         **kwargs,
-    ):
+    ) -> FitResult:
         """
         Fit a curve to the data and evaluate the fit.
 
+        Forms that are linear in their parameters are solved directly by linear least squares, and
+        forms with some linear parameters are fitted by variable projection over the remaining
+        nonlinear ones. All other forms are fitted with ``curve_fit``.
+
         Parameters:
         x (npt.NDArray): The x data.
         y (npt.NDArray): The y data.
@@ -39,29 +94,343 @@ class CurveFittingTool:
         criterions (list[str], optional): The criteria to use for evaluating the fit.
 
         Returns:
-        dict: A dictionary with the results of the fit and evaluation.
+        FitResult: The parameters and criteria of the fit. The fitted values are computed on
+            access to ``y_pred``.
+
+        Raises:
+        BudgetExceededError: If the fit exceeds the per-form budget of the tool.
+        RuntimeError: If the optimizer does not converge.
         """
-        params, _ = curve_fit(
-            f=funtional_form.func,
+        return self._fit_and_evaluate(
+            x, y, form, funtional_form, criterions, None, kwargs, self.budget.limiter()
+        )
+
+    def _fit_and_evaluate(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        funtional_form: FunctionalFormStrategy,
+        criterions: list[str] | None,
+        sst: float | None,
+        kwargs: dict,
+        limiter: EvaluationLimiter | None = None,
+    ) -> FitResult:
+        """
+        Fit and evaluate one form, reusing the total sum of squares of ``y`` when it is known.
+        """
+        if self.cache is not None:
+            options = kwargs
+            if self.multistart is not None:
+                options = {**kwargs, "multistart": self.multistart}
+            key = FitCache.key(x, y, form, funtional_form, criterions, options)
+            if (cached := self.cache.get(key)) is not None:
+                return replace(cached, functional_form=funtional_form, x=x, y=y)
+
+        start = time.perf_counter()
+        fit = self._fit_params(x, y, funtional_form, limiter, **kwargs)
+        y_pred = funtional_form.func(x, *fit.x)
+        stats = FitStatistics.from_predictions(y, y_pred, sst)
+
+        result = FitResult(
+            form=form,
+            params=fit.x,
+            criteria=self._evaluate_criteria(stats, len(fit.x), criterions, y, y_pred),
+            functional_form=funtional_form,
+            x=x,
+            y=y,
+            elapsed=time.perf_counter() - start,
+            nfev=fit.nfev,
+            converged=fit.success,
+            message=fit.message,
+            p0=fit.get("x0"),
+        )
+        for hook in self.hooks:
+            hook.on_fit(result)
+        if self.cache is not None:
+            # The data are not stored with the cached result; they are re-attached on a hit.
+            self.cache.set(key, replace(result, functional_form=None, x=None, y=None))
+        return result
+
+    def _fit_params(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        funtional_form: FunctionalFormStrategy,
+        limiter: EvaluationLimiter | None = None,
+        **kwargs,
+    ) -> OptimizeResult:
+        """
+        Estimate the parameters of a functional form, using a closed-form solve where possible.
+
+        A ``p0`` keyword overrides the form's data-driven initial guess, as in ``curve_fit``.
+        Forms with their own ``fit`` method are fitted by it. The returned ``OptimizeResult``
+        holds the parameters in ``x``, the number of model evaluations in ``nfev`` and the
+        solver's termination ``message``. A ``limiter`` checks
+        every model evaluation against an evaluation and time budget.
+        """
+        p0 = kwargs.pop("p0", None)
+        if limiter is not None:
+            limiter.check(count=False)
+        if funtional_form.has_fit:
+            return OptimizeResult(
+                x=funtional_form.fit(x, y, kwargs.get("sigma")),
+                success=True,
+                nfev=1,
+                message=f"Fitted by {type(funtional_form).__name__}.fit.",
+            )
+        if p0 is None and self.multistart is not None and funtional_form.nonlinear_params:
+            return self._fit_multistart(x, y, funtional_form, limiter, kwargs)
+        if self._use_linear_solvers(funtional_form, **kwargs):
+            if not funtional_form.nonlinear_params:
+                return OptimizeResult(
+                    x=self._solve_linear(x, y, funtional_form, kwargs.get("sigma")),
+                    success=True,
+                    nfev=1,
+                    message="Closed-form linear least-squares solution.",
+                )
+
+            if p0 is None:
+                p0 = funtional_form.initial_guess(x, y)
+            return solve_separable(
+                funtional_form,
+                x,
+                y,
+                np.asarray(p0, dtype=float)[list(funtional_form.nonlinear_params)],
+                kwargs.get("sigma"),
+                kwargs.get("maxfev"),
+                None if limiter is None else limiter.check,
+            )
+
+        if p0 is None:
+            p0 = funtional_form.initial_guess(x, y)
+            if "bounds" in kwargs:
+                p0 = _within_bounds(p0, kwargs["bounds"])
+        func = funtional_form.func
+        if funtional_form.has_jacobian:
+            kwargs.setdefault("jac", funtional_form.jacobian)
+        if limiter is not None:
+            func = limiter.wrap(func)
+            if callable(kwargs.get("jac")):
+                kwargs["jac"] = limiter.wrap(kwargs["jac"], count=False)
+        kwargs.pop("full_output", None)
+        params, _, infodict, message, _ = curve_fit(
+            f=func,
             xdata=x,
             ydata=y,
-            p0=funtional_form.initial_guess(x, y),
+            p0=p0,
+            full_output=True,
             **kwargs,
         )
-        y_pred = funtional_form.func(x, *params)
+        return OptimizeResult(
+            x=params, success=True, nfev=infodict["nfev"], message=message
+        )
 
-        criteria_results = {
-            name: criterion.evaluate(y, y_pred, len(params))
-            for name, criterion in self.criterion_factory.criterions.items()
-            if criterions is None or name in criterions
-        }
+    def _fit_multistart(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        funtional_form: FunctionalFormStrategy,
+        limiter: EvaluationLimiter | None,
+        kwargs: dict,
+    ) -> OptimizeResult:
+        """
+        Screen the starting points of the multi-start settings and refine the best of them.
+
+        The returned ``OptimizeResult`` also holds the winning starting point in ``x0`` and its
+        position among the candidates in ``start``. Refinements run in the calling process when
+        a budget ``limiter`` is active, so that all their evaluations are counted against it.
+        """
+        settings = self.multistart
+        guess = np.asarray(funtional_form.initial_guess(x, y), dtype=float)
+        if self._use_linear_solvers(funtional_form, **kwargs):
+            sampled = funtional_form.nonlinear_params
+        else:
+            sampled = tuple(range(len(guess)))
+
+        candidates = settings.starting_points(guess[list(sampled)])
+        scores = settings.screen(funtional_form, x, y, guess, candidates, sampled)
+        if limiter is not None:
+            limiter.check(count=False)
+        order = np.argsort(scores, kind="stable")[: settings.n_refine]
+        starts = np.broadcast_to(guess, (len(order), len(guess))).copy()
+        starts[:, list(sampled)] = candidates[order]
+        if "bounds" in kwargs:
+            starts = _within_bounds(starts, kwargs["bounds"])
+
+        def refine(p0):
+            try:
+                fit = self._fit_params(x, y, funtional_form, limiter, p0=p0, **kwargs)
+            except FIT_ERRORS as exc:
+                return exc
+            fit.sse = np.sum((y - funtional_form.func(x, *fit.x)) ** 2)
+            return fit
+
+        if limiter is None and len(starts) > 1:
+            from joblib import Parallel, delayed
+
+            fits = Parallel(n_jobs=settings.n_jobs, backend=settings.backend)(
+                delayed(refine)(p0) for p0 in starts
+            )
+        else:
+            fits = [refine(p0) for p0 in starts]
+
+        succeeded = [i for i, fit in enumerate(fits) if not isinstance(fit, Exception)]
+        if not succeeded:
+            raise fits[0]
+        best = min(succeeded, key=lambda i: np.nan_to_num(fits[i].sse, nan=np.inf))
+        fit = fits[best]
+        return OptimizeResult(
+            x=fit.x,
+            success=fit.success,
+            nfev=len(candidates) + sum(fits[i].nfev for i in succeeded),
+            message=f"{fit.message} (start {order[best]} of {len(candidates)} candidates)",
+            x0=starts[best],
+            start=int(order[best]),
+        )
+
+    def _solve_linear(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        funtional_form: FunctionalFormStrategy,
+        sigma: npt.NDArray[np.floating] | None = None,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Solve a fully linear form for one or many series, reusing the cached design of ``x``.
+        """
+        if sigma is None:
+            design = self.design_cache.get(funtional_form, x)
+            if design is not None:
+                y = np.asarray(y, dtype=float)
+                if not np.isfinite(y).all():
+                    raise ValueError("Data for a linear least-squares fit must be finite.")
+                return design.solve(y)
+        return solve_linear(funtional_form.basis(x), y, sigma)
+
+    @staticmethod
+    def _use_linear_solvers(funtional_form: FunctionalFormStrategy, **kwargs) -> bool:
+        """
+        Whether a form declaring linear parameters can be solved by the linear solvers.
 
-        return {
-            "form": form,
-            "params": params,
-            "y_pred": y_pred,
-            **criteria_results,
-        }
+        The linear and variable-projection solvers honour ``sigma`` (per point) and ``maxfev``.
+        Any other ``curve_fit`` option, such as bounds or a specific method, falls back to
+        ``curve_fit`` so that it is not silently ignored.
+        """
+        return (
+            bool(funtional_form.linear_params)
+            and set(kwargs) <= _LINEAR_SOLVER_KWARGS
+            and np.ndim(kwargs.get("sigma")) <= 1
+        )
+
+    def _evaluate_criteria(
+        self,
+        stats: FitStatistics,
+        num_params: npt.ArrayLike,
+        criterions: list[str] | tuple[str, ...] | None = None,
+        y: npt.NDArray[np.floating | np.integer] | None = None,
+        y_pred: npt.NDArray[np.floating | np.integer] | None = None,
+    ) -> dict[str, npt.NDArray[np.floating]]:
+        """
+        Evaluate the selected model selection criteria from the statistics of one or many fits.
+
+        Criteria implementing only `evaluate` are evaluated from the predictions, when given.
+        """
+        values = {}
+        for name, criterion in self.criterion_factory.criterions.items():
+            if criterions is not None and name not in criterions:
+                continue
+            try:
+                values[name] = criterion.evaluate_statistics(stats, num_params)
+            except NotImplementedError:
+                if y_pred is None:
+                    raise
+                values[name] = criterion.evaluate(y, y_pred, num_params)
+        return values
+
+    def _fit_or_fail(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        funtional_form: FunctionalFormStrategy,
+        criterions: list[str] | None,
+        sst: float | None,
+        kwargs: dict,
+        limiter: EvaluationLimiter | None,
+    ) -> FitResult:
+        """
+        Fit and evaluate one form, turning a failure into a failed result instead of raising.
+        """
+        start = time.perf_counter()
+        try:
+            return self._fit_and_evaluate(
+                x, y, form, funtional_form, criterions, sst, kwargs, limiter
+            )
+        except FIT_ERRORS as exc:
+            return self._failed_result(
+                x,
+                y,
+                form,
+                funtional_form,
+                criterions,
+                str(exc),
+                time.perf_counter() - start,
+                0 if limiter is None else limiter.nfev,
+            )
+
+    def _fit_or_fail_once_started(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        funtional_form: FunctionalFormStrategy,
+        criterions: list[str] | None,
+        sst: float | None,
+        kwargs: dict,
+        budget: FitBudget,
+        search_deadline: float | None,
+    ) -> FitResult:
+        """
+        Fit and evaluate one form on an executor, starting its per-form budget when the task
+        starts rather than when it was queued. Only the search deadline is fixed beforehand.
+        """
+        limiter = budget.limiter(search_deadline, None)
+        return self._fit_or_fail(x, y, form, funtional_form, criterions, sst, kwargs, limiter)
+
+    def _failed_result(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        funtional_form: FunctionalFormStrategy,
+        criterions: list[str] | None,
+        message: str,
+        elapsed: float = 0.0,
+        nfev: int = 0,
+    ) -> FitResult:
+        """
+        Build the result of a form that failed or was skipped, with NaN parameters and criteria.
+        """
+        result = FitResult(
+            form=form,
+            params=np.full(funtional_form.num_params, np.nan),
+            criteria={
+                name: np.nan
+                for name in self.criterion_factory.criterions
+                if criterions is None or name in criterions
+            },
+            functional_form=funtional_form,
+            x=x,
+            y=y,
+            elapsed=elapsed,
+            nfev=nfev,
+            converged=False,
+            message=message,
+        )
+        for hook in self.hooks:
+            hook.on_fit(result)
+        return result
 
     def search_and_evaluate(
         self,
@@ -70,103 +439,666 @@ class CurveFittingTool:
         functional_forms: list[str] | None = None,
         criterions: list[str] | None = None,
         **kwargs,
-    ):
+    ) -> list[FitResult]:
         """
         Search for the best fit among a list of functional forms and evaluate the fit.
 
+        A form that fails to converge, diverges or exceeds the tool's budget is returned as a
+        failed result (``converged`` is False, parameters and criteria are NaN, and ``message``
+        says why) and the search continues with the next form.
+
+        If the tool has an executor, the forms are fitted concurrently on it and the results are
+        the same, in the same order, as those of a sequential search. Searches with an
+        evaluation budget (``search_max_nfev``) or an R^2 threshold (``stop_r_squared``) depend
+        on the forms fitted before, so they always run sequentially.
+
         Parameters:
         x (npt.NDArray): The x data.
         y (npt.NDArray): The y data.
-        functional_forms (list[str], optional): The functional forms to consider.
+        functional_forms (list[str], optional): The functional forms to consider. Defaults to
+            the default forms of the factory.
         criterions (list[str], optional): The criteria to use for evaluating the fit.
 
         Returns:
-        list[dict]: A list of dictionaries with the results of the fits and evaluations, sorted by R^2 value.
+        list[FitResult]: The results of the fits and evaluations, sorted by R^2 value with
+            failed fits last.
         """
-        results = [
-            self.fit_and_evaluate(x, y, form, f, criterions, **kwargs)
-            for form, f in self.form_factory.functional_forms.items()
-            if functional_forms is None or form in functional_forms
-        ]
+        start = time.perf_counter()
+        budget = self.budget
+        search_deadline = (
+            None if budget.search_timeout is None else start + budget.search_timeout
+        )
+        nfev_used = 0
+        skip_reason = None
 
-        results.sort(key=lambda result: result["r_squared"], reverse=True)
-        return results
+        # The total sum of squares depends only on y, so it is shared by every form.
+        sst = FitStatistics.total_sum_of_squares(y)
+        forms = list(self.form_factory.select(functional_forms).items())
+        if (
+            self.executor is not None
+            and budget.search_max_nfev is None
+            and budget.stop_r_squared is None
+        ):
+            futures = [
+                self.executor.submit(
+                    self._fit_or_fail_once_started,
+                    x,
+                    y,
+                    form,
+                    f,
+                    criterions,
+                    sst,
+                    kwargs,
+                    budget,
+                    search_deadline,
+                )
+                for form, f in forms
+            ]
+            try:
+                # Collecting in submission order keeps the sort below, which is stable,
+                # independent of which fit finished first.
+                results = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        else:
+            results = []
+            for form, f in forms:
+                nfev_left = (
+                    None
+                    if budget.search_max_nfev is None
+                    else budget.search_max_nfev - nfev_used
+                )
+                if skip_reason is None and (
+                    (search_deadline is not None and time.perf_counter() >= search_deadline)
+                    or (nfev_left is not None and nfev_left <= 0)
+                ):
+                    skip_reason = "Skipped: the search budget is exhausted."
+                if skip_reason is not None:
+                    results.append(self._failed_result(x, y, form, f, criterions, skip_reason))
+                    continue
 
+                limiter = budget.limiter(search_deadline, nfev_left)
+                result = self._fit_or_fail(x, y, form, f, criterions, sst, kwargs, limiter)
+                results.append(result)
+                nfev_used += result.nfev
 
-class CurveFittingVisualizer:
-    @staticmethod
-    def plot_fits(
+                if (
+                    budget.stop_r_squared is not None
+                    and result.converged
+                    and result["r_squared"] >= budget.stop_r_squared
+                ):
+                    skip_reason = f"Skipped: {form} reached the R^2 threshold."
+
+        results.sort(key=r_squared_key, reverse=True)
+        if self.hooks:
+            elapsed = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_search(results, elapsed)
+        return results
+
+    def search_and_evaluate_multiresolution(
+        self,
         x: npt.NDArray[np.floating | np.integer],
         y: npt.NDArray[np.floating | np.integer],
-        results: list[dict[str, np.ndarray]],
-        save_path: str = "./image/",
-        save_fig: bool = True,
-    ) -> tuple[Figure, Axes]:
+        functional_forms: list[str] | None = None,
+        criterions: list[str] | None = None,
+        subsample_size: int = 10_000,
+        top_k: int = 1,
+        sampling: str = "stratified",
+        seed: int | None = None,
+        **kwargs,
+    ) -> MultiResolutionResult:
         """
-        Plot the fits to the data.
+        Search on a subsample of the data, then refit only the most promising forms on all of it.
+
+        Every form is fitted to a subsample of ``subsample_size`` points and ranked by R^2 there.
+        The ``top_k`` forms that converged are then refitted on the full data, starting from
+        their subsample parameters, so large series pay for a full-size fit of only a few forms.
 
         Parameters:
         x (npt.NDArray): The x data.
         y (npt.NDArray): The y data.
-        results (list[dict]): The results of the fits.
-        save_path (str): The path to save the figure.
-        save_fig (bool): Whether to save the figure.
+        functional_forms (list[str], optional): The functional forms to consider. Defaults to
+            the default forms of the factory.
+        criterions (list[str], optional): The criteria to use for evaluating the fit.
+        subsample_size (int): The number of points of the coarse fits.
+        top_k (int): The number of forms refitted on the full data.
+        sampling (str): "stratified" draws one random point from each of ``subsample_size``
+            equal-count strata of x; "decimate" takes evenly spaced points in x order.
+        seed (int, optional): The random seed of stratified sampling.
 
         Returns:
-        tuple[Figure, Axes]: The figure and axes of the plot.
+        MultiResolutionResult: The refined and coarse results and their rankings.
         """
-        fig, ax = plt.subplots()
-        ax.scatter(x, y, label="Data")
-        for result in results:
-            ax.plot(
+        if subsample_size < 1 or top_k < 1:
+            raise ValueError("subsample_size and top_k must be positive integers.")
+        if sampling not in ("stratified", "decimate"):
+            raise ValueError(f"Unknown sampling '{sampling}'.")
+
+        x = np.asarray(x)
+        y = np.asarray(y)
+        order = np.argsort(x, kind="stable")
+        n = len(x)
+        if n <= subsample_size:
+            index = order
+        elif sampling == "decimate":
+            index = order[np.linspace(0, n - 1, subsample_size).astype(int)]
+        else:
+            edges = np.linspace(0, n, subsample_size + 1).astype(int)
+            rng = np.random.default_rng(seed)
+            index = order[rng.integers(edges[:-1], edges[1:])]
+
+        coarse = self.search_and_evaluate(
+            x[index], y[index], functional_forms, criterions, **kwargs
+        )
+        candidates = [result for result in coarse if result.converged][:top_k]
+
+        sst = FitStatistics.total_sum_of_squares(y)
+        refined = [
+            self._fit_or_fail(
                 x,
-                result["y_pred"],
-                label=f"{result['form']} (R^2={result['r_squared']:.3f})",
+                y,
+                result.form,
+                result.functional_form,
+                criterions,
+                sst,
+                {**kwargs, "p0": result.params},
+                self.budget.limiter(),
             )
-        ax.legend()
-        if save_fig:
-            fig.savefig("{save_path}/fit_results.png")
-        return fig, ax
+            for result in candidates
+        ]
+        refined.sort(key=r_squared_key, reverse=True)
 
-    @staticmethod
-    def plot_residuals(
+        return MultiResolutionResult(
+            results=refined,
+            coarse_results=coarse,
+            coarse_ranking=tuple(result.form for result in coarse),
+            refined_ranking=tuple(result.form for result in refined),
+            subsample_size=len(index),
+        )
+
+    def search_and_evaluate_cv(
+        self,
         x: npt.NDArray[np.floating | np.integer],
         y: npt.NDArray[np.floating | np.integer],
-        results: list[dict[str, np.ndarray]],
-        save_path: str = "./image/",
-        save_fig: bool = True,
-    ) -> list[tuple[Figure, Axes]]:
+        functional_forms: list[str] | None = None,
+        criterions: list[str] | None = None,
+        k: int | None = 5,
+        shuffle: bool = True,
+        seed: int | None = None,
+        n_jobs: int | None = None,
+        backend: str = "loky",
+        **kwargs,
+    ) -> list[FitResult]:
         """
-        Plot the residuals of the fits.
+        Search for the best fit by k-fold cross-validation.
+
+        Every form is first fitted to the full data, as in `search_and_evaluate`. The out-of-fold
+        errors of forms that are linear in all their parameters are then computed in closed form
+        from a single QR decomposition, without refitting. Other forms are refitted once per
+        fold, warm-started from their full-data parameters, with the (form, fold) grid spread
+        over a joblib worker pool.
+
+        The out-of-sample mean squared error is reported as the "cv_mse" criterion, and the
+        predictive R^2 (one minus the out-of-fold sum of squares over the total sum of squares)
+        as "cv_r_squared", next to the in-sample criteria.
 
         Parameters:
         x (npt.NDArray): The x data.
         y (npt.NDArray): The y data.
-        results (list[dict]): The results of the fits.
-        save_path (str): The path to save the figures.
-        save_fig (bool): Whether to save the figure.
+        functional_forms (list[str], optional): The functional forms to consider. Defaults to
+            the default forms of the factory.
+        criterions (list[str], optional): The in-sample criteria to evaluate.
+        k (int, optional): The number of folds, or None for leave-one-out.
+        shuffle (bool): Whether to assign points to folds at random rather than in order.
+        seed (int, optional): The random seed of the fold assignment.
+        n_jobs (int, optional): The number of workers, following joblib semantics.
+        backend (str): The joblib backend, e.g. "loky" for processes or "threading".
 
         Returns:
-        list[tuple[Figure, Axes]]: A list of figures and axes of the plots.
+        list[FitResult]: The results sorted by out-of-sample mean squared error.
         """
-        figs_axes = []
+        x = np.asarray(x)
+        y = np.asarray(y)
+        n = len(y)
+        k = n if k is None else k
+        if not 2 <= k <= n:
+            raise ValueError(f"k must be between 2 and the number of points, got {k}.")
+
+        index = np.random.default_rng(seed).permutation(n) if shuffle else np.arange(n)
+        folds = np.array_split(index, k)
+
+        results = self.search_and_evaluate(x, y, functional_forms, criterions, **kwargs)
+        # Folds start from the full-data parameters rather than from a given ``p0``.
+        kwargs.pop("p0", None)
+        press = {}
+        tasks = []
         for result in results:
-            residuals = y - result["y_pred"]
+            f = result.functional_form
+            if not result.converged:
+                press[result.form] = np.nan
+            elif (
+                "sigma" not in kwargs
+                and not f.nonlinear_params
+                and self._use_linear_solvers(f, **kwargs)
+            ):
+                residuals = cross_validation_residuals(f.basis(x), y, None if k == n else folds)
+                press[result.form] = np.sum(residuals**2)
+            else:
+                press[result.form] = 0.0
+                tasks.extend((result, test) for test in folds)
+
+        if tasks:
+            # joblib is only imported when forms must be refitted, like in batches.
+            from joblib import Parallel, delayed
+
+            errors = Parallel(n_jobs=n_jobs, backend=backend)(
+                delayed(self._fold_error)(
+                    x, y, result.functional_form, result.params, test, kwargs
+                )
+                for result, test in tasks
+            )
+            for (result, _), error in zip(tasks, errors):
+                press[result.form] += error
+
+        sst = FitStatistics.total_sum_of_squares(y)
+        results = [
+            replace(
+                result,
+                criteria={
+                    **result.criteria,
+                    "cv_mse": press[result.form] / n,
+                    "cv_r_squared": 1 - press[result.form] / sst,
+                },
+            )
+            for result in results
+        ]
+        results.sort(key=lambda result: np.nan_to_num(result["cv_mse"], nan=np.inf))
+        return results
+
+    def _fold_error(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        funtional_form: FunctionalFormStrategy,
+        params: npt.NDArray[np.floating],
+        test: npt.NDArray[np.integer],
+        kwargs: dict,
+    ) -> float:
+        """
+        Refit a form without one fold and return its sum of squared errors on that fold.
+        """
+        train = np.ones(len(y), dtype=bool)
+        train[test] = False
+        kwargs = dict(kwargs)
+        sigma = kwargs.get("sigma")
+        if np.ndim(sigma) == 1:
+            kwargs["sigma"] = np.asarray(sigma)[train]
+        elif np.ndim(sigma) == 2:
+            kwargs["sigma"] = np.asarray(sigma)[np.ix_(train, train)]
+        try:
+            fit = self._fit_params(
+                x[train], y[train], funtional_form, self.budget.limiter(), p0=params, **kwargs
+            )
+        except FIT_ERRORS:
+            return np.nan
+        return np.sum((y[test] - funtional_form.func(x[test], *fit.x)) ** 2)
+
+    def bootstrap(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        form: str,
+        funtional_form: FunctionalFormStrategy,
+        criterions: list[str] | None = None,
+        n_resamples: int = 1000,
+        confidence: float = 0.95,
+        seed: int | None = None,
+        n_jobs: int | None = None,
+        backend: str = "loky",
+        chunk_size: int = 32,
+        **kwargs,
+    ) -> BootstrapResult:
+        """
+        Estimate the uncertainty of a fit by resampling the points with replacement.
+
+        All resamples are drawn at once as an index matrix. For forms that are linear in all their
+        parameters, each resample is expressed as a vector of point counts, so the normal
+        equations of every resample, in an orthonormal basis and for the residuals of the fit to
+        all points, come out of a few matrix products and are solved by one batched solve. Other forms are refitted to every resample, warm-started from the fit to
+        the original data, in chunks of ``chunk_size`` resamples spread over a joblib worker pool.
+
+        Parameters:
+        x (npt.NDArray): The x data.
+        y (npt.NDArray): The y data.
+        form (str): The form of the function to fit.
+        funtional_form (FunctionalFormStrategy): The function to fit.
+        criterions (list[str], optional): The criteria to use for evaluating the fit.
+        n_resamples (int): The number of bootstrap resamples.
+        confidence (float): The coverage of the percentile intervals.
+        seed (int, optional): The random seed of the resamples.
+        n_jobs (int, optional): The number of workers, following joblib semantics.
+        backend (str): The joblib backend, e.g. "loky" for processes or "threading".
+        chunk_size (int): The number of resamples refitted by each task.
+
+        Returns:
+        BootstrapResult: The fit to the original data and the distribution of its parameters
+            and criteria over the resamples.
+        """
+        if n_resamples < 1:
+            raise ValueError("n_resamples must be a positive integer.")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be in (0, 1).")
+
+        x = np.asarray(x)
+        y = np.asarray(y)
+        result = self.fit_and_evaluate(x, y, form, funtional_form, criterions, **kwargs)
+        kwargs.pop("p0", None)
+
+        n = len(y)
+        indices = np.random.default_rng(seed).integers(0, n, size=(n_resamples, n))
+        if (
+            "sigma" not in kwargs
+            and not funtional_form.nonlinear_params
+            and self._use_linear_solvers(funtional_form, **kwargs)
+        ):
+            params, sse, sst = self._bootstrap_linear(x, y, funtional_form, indices)
+        else:
+            from joblib import Parallel, delayed
+
+            chunks = Parallel(n_jobs=n_jobs, backend=backend)(
+                delayed(self._bootstrap_chunk)(
+                    x, y, funtional_form, result.params, indices[i : i + chunk_size], kwargs
+                )
+                for i in range(0, n_resamples, chunk_size)
+            )
+            params, sse, sst = (np.concatenate(parts) for parts in zip(*chunks))
+
+        stats = FitStatistics(sse=sse, n=n, sst=sst)
+        return BootstrapResult(
+            result=result,
+            params=params,
+            criteria=self._evaluate_criteria(stats, params.shape[1], criterions),
+            confidence=confidence,
+        )
+
+    @staticmethod
+    def _bootstrap_linear(
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        funtional_form: FunctionalFormStrategy,
+        indices: npt.NDArray[np.integer],
+    ) -> tuple[npt.NDArray[np.floating], ...]:
+        """
+        Solve a fully linear form for every resample from the counts of each point.
+        """
+        n_resamples, n = indices.shape
+        offsets = n * np.arange(n_resamples)[:, None]
+        counts = np.bincount((indices + offsets).ravel(), minlength=n_resamples * n)
+        counts = counts.reshape(n_resamples, n).astype(float)
+
+        # The sums are formed in an orthonormal basis of the columns and for the residuals of
+        # the fit to all points, both well scaled however large the offsets of x and y are.
+        basis = funtional_form.basis(x)
+        scale = _column_scale(basis)
+        q, r = np.linalg.qr(basis / scale)
+        y = np.asarray(y, dtype=float)
+        p = basis.shape[1]
+        full = q.T @ y
+        residuals = y - q @ full
+
+        # Weighted sums for every resample, one matrix product each.
+        gram = (counts @ (q[:, :, None] * q[:, None, :]).reshape(n, p * p)).reshape(
+            n_resamples, p, p
+        )
+        qte = counts @ (q * residuals[:, None])
+        ete = counts @ residuals**2
+        centered = y - y.mean()
+        sum_y, sum_yy = (counts @ np.column_stack([centered, centered**2])).T
+
+        coef = np.full((n_resamples, p), np.nan)
+        sse = np.full(n_resamples, np.nan)
+        solvable = np.linalg.matrix_rank(gram) == p
+        if np.linalg.matrix_rank(r) == p and solvable.any():
+            delta = np.linalg.solve(gram[solvable], qte[solvable][..., None])[..., 0]
+            coef[solvable] = np.linalg.solve(r, (full + delta).T).T
+            sse[solvable] = ete[solvable] - np.einsum("bp,bp->b", delta, qte[solvable])
+        return coef / scale, np.maximum(sse, 0.0), sum_yy - sum_y**2 / n
+
+    def _bootstrap_chunk(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        funtional_form: FunctionalFormStrategy,
+        params: npt.NDArray[np.floating],
+        indices: npt.NDArray[np.integer],
+        kwargs: dict,
+    ) -> tuple[npt.NDArray[np.floating], ...]:
+        """
+        Refit a form to consecutive resamples, warm-started from the original parameters.
+        """
+        fitted = np.full((len(indices), len(params)), np.nan)
+        sse = np.full(len(indices), np.nan)
+        sigma = kwargs.get("sigma")
+        for i, index in enumerate(indices):
+            options = dict(kwargs)
+            if np.ndim(sigma) == 1:
+                options["sigma"] = np.asarray(sigma)[index]
+            elif np.ndim(sigma) == 2:
+                options["sigma"] = np.asarray(sigma)[np.ix_(index, index)]
+            try:
+                fit = self._fit_params(
+                    x[index], y[index], funtional_form, self.budget.limiter(), p0=params, **options
+                )
+            except FIT_ERRORS:
+                continue
+            fitted[i] = fit.x
+            sse[i] = np.sum((y[index] - funtional_form.func(x[index], *fit.x)) ** 2)
+        return fitted, sse, FitStatistics.total_sum_of_squares(y[indices])
+
+    def search_and_evaluate_batch(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        functional_forms: list[str] | None = None,
+        criterions: list[str] | None = None,
+        n_jobs: int | None = None,
+        backend: str = "loky",
+        chunk_size: int = 256,
+        **kwargs,
+    ) -> BatchSearchResult:
+        """
+        Fit every functional form to many series at once, spreading the work over a worker pool.
+
+        Series are grouped into chunks of ``chunk_size`` rows and each chunk is fitted by a single
+        task, so the factories are reused for the whole chunk and the pool overhead is paid once
+        per chunk rather than once per series. Fits that fail to converge or exceed the per-form
+        budget of the tool are reported as NaN rather than aborting the batch.
+
+        Parameters:
+        x (npt.NDArray): The x data, either shared by all series with shape (n_points,) or one
+            row per series with shape (n_series, n_points).
+        y (npt.NDArray): The y data, one series per row with shape (n_series, n_points).
+        functional_forms (list[str], optional): The functional forms to consider. Defaults to
+            the default forms of the factory.
+        criterions (list[str], optional): The criteria to use for evaluating the fit.
+        n_jobs (int, optional): The number of workers, following joblib semantics.
+        backend (str): The joblib backend, e.g. "loky" for processes or "threading".
+        chunk_size (int): The number of series fitted by each task.
+        **kwargs: Options passed to the solvers. A ``p0`` is used as the starting point of every
+            series instead of the data-driven guesses.
+
+        Returns:
+        BatchSearchResult: The parameters, criteria and convergence flags in columnar form.
+        """
+        x = np.asarray(x)
+        y = np.atleast_2d(np.asarray(y))
+        if x.ndim == 2 and x.shape != y.shape:
+            raise ValueError(
+                f"Per-series x must have the same shape as y, got {x.shape} and {y.shape}."
+            )
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+
+        forms = tuple(self.form_factory.select(functional_forms))
+        names = tuple(
+            name
+            for name in self.criterion_factory.criterions
+            if criterions is None or name in criterions
+        )
+
+        # joblib is only imported for batches, keeping the import of the tool light.
+        from joblib import Parallel, delayed
+
+        start = time.perf_counter()
+        bounds = range(0, y.shape[0], chunk_size)
+        chunks = Parallel(n_jobs=n_jobs, backend=backend)(
+            delayed(self._search_chunk)(
+                x if x.ndim == 1 else x[i : i + chunk_size],
+                y[i : i + chunk_size],
+                forms,
+                names,
+                kwargs,
+            )
+            for i in bounds
+        )
+        result = BatchSearchResult.concatenate(chunks)
+
+        if self.hooks:
+            elapsed = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_batch(result, elapsed)
+        return result
+
+    def _search_chunk(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        forms: tuple[str, ...],
+        criterions: tuple[str, ...],
+        kwargs: dict,
+    ) -> BatchSearchResult:
+        """
+        Fit every form to a chunk of series and collect the results column by column.
+        """
+        n_series = y.shape[0]
+        kwargs = dict(kwargs)
+        p0 = kwargs.pop("p0", None)
+        params = {}
+        sse = np.full((n_series, len(forms)), np.nan)
+        elapsed = np.zeros((n_series, len(forms)))
+        nfev = np.zeros((n_series, len(forms)), dtype=int)
+        num_params = np.zeros(len(forms), dtype=int)
+
+        for j, form in enumerate(forms):
+            f = self.form_factory.get_functional_form(form)
+            num_params[j] = f.num_params
+            params[form] = np.full((n_series, f.num_params), np.nan)
+            start = time.perf_counter()
+
+            if (
+                x.ndim == 1
+                and not f.nonlinear_params
+                and self._use_linear_solvers(f, **kwargs)
+            ):
+                # Linear-in-parameter forms are solved for the whole chunk in one call, whose
+                # time is shared equally between the series.
+                # With a shared x the factorized basis is reused across chunks and calls.
+                sigma = kwargs.get("sigma")
+                with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                    design = None if sigma is not None else self.design_cache.get(f, x)
+                    basis = f.basis(x) if design is None else design.basis
+                if not np.isfinite(basis).all():
+                    # The form is undefined at the shared x, e.g. a logarithm at zero, so it
+                    # fails for every series of the chunk, as it would one series at a time.
+                    elapsed[:, j] = (time.perf_counter() - start) / n_series
+                    continue
+                finite = np.isfinite(y).all(axis=1)
+                if finite.any():
+                    params[form][finite] = np.atleast_2d(
+                        solve_linear(basis, y[finite], sigma)
+                        if design is None
+                        else design.solve(y[finite])
+                    )
+                sse[:, j] = np.sum((y - params[form] @ basis.T) ** 2, axis=1)
+                elapsed[:, j] = (time.perf_counter() - start) / n_series
+                nfev[:, j] = 1
+                continue
+
+            # Starting points for the whole chunk are estimated in one vectorized pass, except
+            # for forms with their own fitting method, which do not start from one.
+            guesses = None
+            if p0 is None and not f.has_fit:
+                with np.errstate(all="ignore"):
+                    guesses = np.atleast_2d(f.initial_guess(x, y))
+                if "bounds" in kwargs:
+                    guesses = _within_bounds(guesses, kwargs["bounds"])
+            for i in range(n_series):
+                xi = x if x.ndim == 1 else x[i]
+                try:
+                    fit = self._fit_params(
+                        xi,
+                        y[i],
+                        f,
+                        self.budget.limiter(),
+                        p0=p0 if guesses is None else guesses[i],
+                        **kwargs,
+                    )
+                except FIT_ERRORS:
+                    continue
+                finally:
+                    elapsed[i, j] = time.perf_counter() - start
+                    start = time.perf_counter()
+                params[form][i] = fit.x
+                nfev[i, j] = fit.nfev
+                sse[i, j] = np.sum((y[i] - f.func(xi, *fit.x)) ** 2)
+
+        # Every criterion is evaluated for all forms and series of the chunk in one call.
+        stats = FitStatistics(
+            sse=sse,
+            n=y.shape[1],
+            sst=FitStatistics.total_sum_of_squares(y)[:, None],
+        )
+        return BatchSearchResult(
+            forms=forms,
+            params=params,
+            criteria=self._evaluate_criteria(stats, num_params, criterions),
+            success=~np.isnan(sse),
+            elapsed=elapsed,
+            nfev=nfev,
+        )
+
+    def __getstate__(self) -> dict:
+        # Hooks report to the calling process only and are not sent to worker processes.
+        state = self.__dict__.copy()
+        state["hooks"] = []
+        # Neither are executors, which hold threads or processes of the calling process.
+        state["executor"] = None
+        return state
+
 
-            fig, ax = plt.subplots()
-            ax.scatter(x, residuals)
-            ax.hlines(0, min(x), max(x), colors="r", linestyles="dashed")
-            ax.set_title(f'Residuals for {result["form"]}')
-            fig.savefig(f"{save_path}/residuals_{result['form']}.png")
-            if save_fig:
-                figs_axes.append((fig, ax))
+def _within_bounds(
+    p0: npt.ArrayLike, bounds: Bounds | tuple[npt.ArrayLike, npt.ArrayLike]
+) -> npt.NDArray[np.floating]:
+    """
+    Move data-driven starting points into the ``bounds`` given to ``curve_fit``, just inside the
+    bounds they cross, so that a guess outside them does not abort the fit.
+    """
+    lb, ub = (bounds.lb, bounds.ub) if isinstance(bounds, Bounds) else bounds
+    lb = np.asarray(lb, dtype=float)
+    ub = np.asarray(ub, dtype=float)
+    p0 = np.clip(np.asarray(p0, dtype=float), lb, ub)
+    p0 = np.where((p0 == lb) & (lb < ub), np.nextafter(lb, ub), p0)
+    return np.where((p0 == ub) & (lb < ub), np.nextafter(ub, lb), p0)
 
-            fig_qq, ax_qq = plt.subplots()
-            stats.probplot(residuals, dist="norm", plot=ax_qq)
-            ax_qq.set_title(f'QQ Plot for {result["form"]}')
 
-            fig_qq.savefig(f"{save_path}/qqplot_{result['form']}.png")
-            if save_fig:
-                figs_axes.append((fig_qq, ax_qq))
+def __getattr__(name: str):
+    # The visualizer used to live here; it is loaded on first use so that importing the tool
+    # does not import matplotlib.
+    if name == "CurveFittingVisualizer":
+        from fitmaster.core.visualization import CurveFittingVisualizer
 
-        return figs_axes
+        return CurveFittingVisualizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,105 @@
+from collections import defaultdict
+
+import numpy as np
+
+from fitmaster.core.results import BatchSearchResult, FitResult
+
+
+class FitHook:
+    """
+    Base class for callbacks notified by CurveFittingTool.
+
+    Subclasses override the methods for the events they care about; the others do nothing. Hooks
+    run in the calling process, synchronously, so they should be cheap or hand data off quickly.
+    With an executor, or through AsyncCurveFittingTool, `on_fit` may be called from several
+    threads at once. When no hooks are registered the tool skips these calls entirely.
+
+    Methods:
+        on_fit: Called after every form fitted by `fit_and_evaluate` or `search_and_evaluate`.
+        on_search: Called after every `search_and_evaluate`.
+        on_batch: Called after every `search_and_evaluate_batch`.
+    """
+
+    def on_fit(self, result: FitResult) -> None:
+        """
+        Called after a form has been fitted and evaluated. Results served from the cache are not
+        reported.
+
+        Args:
+            result (FitResult): The result, including its ``elapsed``, ``nfev``, ``converged``
+                and ``message``.
+        """
+
+    def on_search(self, results: list[FitResult], elapsed: float) -> None:
+        """
+        Called after a search over the functional forms of one series.
+
+        Args:
+            results (list[FitResult]): The results of the search, sorted by R^2 value.
+            elapsed (float): The wall time of the whole search, in seconds.
+        """
+
+    def on_batch(self, result: BatchSearchResult, elapsed: float) -> None:
+        """
+        Called after a batched search over many series.
+
+        Args:
+            result (BatchSearchResult): The results of the batch, including per-fit ``elapsed``
+                and ``nfev``.
+            elapsed (float): The wall time of the whole batch, in seconds.
+        """
+
+
+class TimingHook(FitHook):
+    """
+    Hook collecting wall times and evaluation counts per functional form, for profiling.
+
+    Attributes:
+        fits (dict[str, list[tuple[float, int, bool]]]): The ``(elapsed, nfev, converged)`` of
+            every fit, by form.
+        searches (list[float]): The wall time of every search.
+        batches (list[float]): The wall time of every batch.
+    """
+
+    def __init__(self) -> None:
+        self.fits: dict[str, list[tuple[float, int, bool]]] = defaultdict(list)
+        self.searches: list[float] = []
+        self.batches: list[float] = []
+
+    def on_fit(self, result: FitResult) -> None:
+        self.fits[result.form].append((result.elapsed, result.nfev, result.converged))
+
+    def on_search(self, results: list[FitResult], elapsed: float) -> None:
+        self.searches.append(elapsed)
+
+    def on_batch(self, result: BatchSearchResult, elapsed: float) -> None:
+        self.batches.append(elapsed)
+        for j, form in enumerate(result.forms):
+            self.fits[form].extend(
+                zip(
+                    result.elapsed[:, j].tolist(),
+                    result.nfev[:, j].tolist(),
+                    result.success[:, j].tolist(),
+                )
+            )
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Summarise the collected fits of each form.
+
+        Returns:
+            dict[str, dict[str, float]]: For each form, the number of fits, the total, mean and
+                maximum wall time, the mean number of evaluations and the convergence rate.
+        """
+        summary = {}
+        for form, fits in self.fits.items():
+            elapsed, nfev, converged = (np.array(values) for values in zip(*fits))
+            summary[form] = {
+                "count": len(fits),
+                "total_seconds": elapsed.sum(),
+                "mean_seconds": elapsed.mean(),
+                "max_seconds": elapsed.max(),
+                "mean_nfev": nfev.mean(),
+                "converged_rate": converged.mean(),
+            }
+        return summary
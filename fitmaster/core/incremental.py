@@ -0,0 +1,254 @@
+import math
+from collections import deque
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.core.budget import FIT_ERRORS
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.least_squares import qr_update
+from fitmaster.core.results import FitResult, r_squared_key
+from fitmaster.criteria.statistics import FitStatistics
+
+# Weight below which a point no longer influences a fit with exponential forgetting.
+_FORGETTING_TOLERANCE = 1e-6
+
+# Failure message of a linear form whose basis is not finite at some of the points.
+_UNDEFINED_MESSAGE = "The form is not finite at some of the points."
+
+
+class IncrementalCurveFitter:
+    """
+    Stateful fitter for data that arrive one point (or a few points) at a time.
+
+    Forms that are linear in their parameters keep the triangular factor of their basis
+    augmented with ``y``, updated by QR as points arrive, and the moments of ``y`` about its first
+    value. An update costs O(p^2) per point regardless of how much data has been seen, their
+    criteria are always current without revisiting old points, and, as the normal equations are
+    never formed, badly scaled data such as timestamps keep their accuracy. Other forms keep the
+    retained points and are refitted lazily when results are requested, warm-started from their
+    previous parameters.
+
+    Memory can be bounded with either a sliding window, which keeps exactly the last ``window``
+    points, or exponential forgetting, which down-weights every point by ``forgetting`` per new
+    point. Points leaving a window cannot be removed from a QR factor stably, so after evictions
+    the factors are rebuilt from the window when results are next requested. Without either,
+    nonlinear forms retain the whole history.
+
+    Attributes:
+        tool (CurveFittingTool): The tool whose forms, criteria and solvers are used.
+        forms (tuple[str, ...]): The functional forms being tracked.
+        criterions (list[str] | None): The criteria reported for each form.
+        window (int | None): The size of the sliding window, if any.
+        forgetting (float | None): The forgetting factor, if any.
+    """
+
+    def __init__(
+        self,
+        functional_forms: list[str] | None = None,
+        criterions: list[str] | None = None,
+        window: int | None = None,
+        forgetting: float | None = None,
+        tool: CurveFittingTool | None = None,
+    ):
+        """
+        Initialize the fitter.
+
+        Args:
+            functional_forms (list[str], optional): The functional forms to track. Defaults to
+                the default forms of the factory.
+            criterions (list[str], optional): The criteria to report.
+            window (int, optional): Only the most recent ``window`` points are fitted.
+            forgetting (float, optional): A factor in (0, 1] by which the weight of every point is
+                multiplied whenever a new point arrives.
+            tool (CurveFittingTool, optional): The tool providing forms, criteria and solvers.
+
+        Raises:
+            ValueError: If both or invalid ``window`` and ``forgetting`` values are given.
+        """
+        if window is not None and forgetting is not None:
+            raise ValueError("Use either a sliding window or exponential forgetting, not both.")
+        if window is not None and window < 1:
+            raise ValueError("window must be a positive integer.")
+        if forgetting is not None and not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1].")
+
+        self.tool = tool if tool is not None else CurveFittingTool()
+        self.forms = tuple(self.tool.form_factory.select(functional_forms))
+        self.criterions = criterions
+        self.window = window
+        self.forgetting = forgetting
+
+        self._linear = {}
+        self._nonlinear = {}
+        for form in self.forms:
+            f = self.tool.form_factory.get_functional_form(form)
+            if f.linear_params and not f.nonlinear_params:
+                self._linear[form] = [f, np.zeros((0, f.num_params + 1))]
+            else:
+                self._nonlinear[form] = [f, None]
+
+        # Moments of y about the first value seen: weighted count, sum and sum of squares.
+        self._moments = np.zeros(3)
+        self._y_ref = None
+        # Whether points have left the window since the statistics were last rebuilt.
+        self._stale = False
+
+        # Points are only retained when a window must be downdated or nonlinear forms refitted.
+        maxlen = window
+        if forgetting is not None and forgetting < 1:
+            maxlen = math.ceil(math.log(_FORGETTING_TOLERANCE) / math.log(forgetting))
+        self._keep_points = window is not None or bool(self._nonlinear)
+        self._points: deque[tuple[float, float]] = deque()
+        self._maxlen = maxlen
+
+    @property
+    def n_observations(self) -> int:
+        """
+        The number of points currently retained or, with forgetting, their effective count.
+        """
+        if self._stale:
+            return len(self._points)
+        return round(self._moments[0])
+
+    def update(
+        self,
+        x: npt.ArrayLike,
+        y: npt.ArrayLike,
+    ) -> None:
+        """
+        Add one or more new points.
+
+        Args:
+            x (npt.ArrayLike): The x value(s) of the new points.
+            y (npt.ArrayLike): The y value(s) of the new points.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if x.shape != y.shape or x.ndim != 1:
+            raise ValueError("x and y must be scalars or 1-D arrays of the same length.")
+        if self._y_ref is None and len(y):
+            self._y_ref = y[0]
+
+        weights = np.ones_like(y)
+        if self.forgetting is not None:
+            # Older points among the new ones have already been forgotten a little.
+            weights = self.forgetting ** np.arange(len(y) - 1, -1, -1, dtype=float)
+            self._scale(self.forgetting ** len(y))
+        self._accumulate(x, y, weights)
+
+        if not self._keep_points:
+            return
+        self._points.extend(zip(x, y))
+        if self._maxlen is not None and len(self._points) > self._maxlen:
+            for _ in range(len(self._points) - self._maxlen):
+                self._points.popleft()
+            self._stale = self.window is not None
+
+    def results(self) -> list[FitResult]:
+        """
+        Return the current fit of every form, sorted by R^2 value.
+
+        Forms whose fit fails, or that are not finite at one of the fitted points, are reported
+        as failed results, with ``converged`` False, NaN parameters and criteria, and the error
+        in ``message``.
+
+        Returns:
+            list[FitResult]: The parameters and criteria of each fit, failed fits last.
+        """
+        if self._stale:
+            self._rebuild()
+        count, sum_y, sum_yy = self._moments
+        sst = sum_yy - sum_y**2 / count if count > 0 else np.nan
+
+        results = []
+        for form, (f, r) in self._linear.items():
+            if r is None:
+                results.append(
+                    self.tool._failed_result(
+                        None, None, form, f, self.criterions, _UNDEFINED_MESSAGE
+                    )
+                )
+                continue
+            p = f.num_params
+            params, *_ = np.linalg.lstsq(r[:p, :p], r[:p, p], rcond=None)
+            sse = r[p, p] ** 2 if len(r) > p else 0.0
+            results.append(self._result(form, params, sse, count, sst))
+
+        if self._nonlinear and self._points:
+            x, y = (np.array(values) for values in zip(*self._points))
+            weights = self._point_weights(len(y))
+            sigma = None if self.forgetting is None else 1 / np.sqrt(weights)
+            for form, state in self._nonlinear.items():
+                f, previous = state
+                options = {} if sigma is None else {"sigma": sigma}
+                if previous is not None:
+                    options["p0"] = previous
+                try:
+                    params = self.tool._fit_params(x, y, f, **options).x
+                except FIT_ERRORS as exc:
+                    results.append(
+                        self.tool._failed_result(x, y, form, f, self.criterions, str(exc))
+                    )
+                    continue
+                state[1] = params
+                sse = np.sum(weights * (y - f.func(x, *params)) ** 2)
+                results.append(self._result(form, params, sse, count, sst))
+
+        results.sort(key=r_squared_key, reverse=True)
+        return results
+
+    def _result(self, form, params, sse, count, sst) -> FitResult:
+        stats = FitStatistics(sse=sse, n=count, sst=sst)
+        return FitResult(
+            form=form,
+            params=params,
+            criteria=self.tool._evaluate_criteria(stats, len(params), self.criterions),
+            functional_form=self.tool.form_factory.get_functional_form(form),
+        )
+
+    def _accumulate(self, x, y, weights) -> None:
+        """
+        Add weighted points to the moments and the triangular factors.
+        """
+        shifted = y - self._y_ref
+        self._moments += [weights.sum(), weights @ shifted, weights @ shifted**2]
+        root = np.sqrt(weights)
+        for state in self._linear.values():
+            f, r = state
+            if r is None:
+                continue
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                basis = f.basis(x)
+            if not (np.isfinite(basis).all() and np.isfinite(y).all()):
+                # A form undefined at a point, e.g. a logarithm at zero, fails until the point
+                # leaves the window, instead of poisoning its factor.
+                state[1] = None
+                continue
+            state[1] = qr_update(r, basis * root[:, None], y * root)
+
+    def _rebuild(self) -> None:
+        """
+        Recompute the moments and the triangular factors from the points in the window.
+        """
+        self._moments[:] = 0.0
+        for state in self._linear.values():
+            state[1] = np.zeros((0, state[0].num_params + 1))
+        if self._points:
+            x, y = (np.array(values) for values in zip(*self._points))
+            self._accumulate(x, y, np.ones_like(y))
+        self._stale = False
+
+    def _scale(self, factor: float) -> None:
+        self._moments *= factor
+        for state in self._linear.values():
+            if state[1] is not None:
+                state[1] = state[1] * np.sqrt(factor)
+
+    def _point_weights(self, n: int) -> npt.NDArray[np.floating]:
+        """
+        The weights of the retained points, oldest first.
+        """
+        if self.forgetting is None:
+            return np.ones(n)
+        return self.forgetting ** np.arange(n - 1, -1, -1, dtype=float)
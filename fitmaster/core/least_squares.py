@@ -0,0 +1,241 @@
+from collections.abc import Callable
+
+import numpy as np
+import numpy.typing as npt
+from scipy.optimize import OptimizeResult, least_squares
+
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+# Residual returned for nonlinear parameters whose basis overflows. It is large enough to be
+# rejected by the optimizer while keeping the sum of squares finite.
+_OVERFLOW_RESIDUAL = 1e100
+_MAX_GUESS_HALVINGS = 64
+
+
+def solve_linear(
+    basis: npt.NDArray[np.floating],
+    y: npt.NDArray[np.floating | np.integer],
+    sigma: npt.NDArray[np.floating] | None = None,
+) -> npt.NDArray[np.floating]:
+    """
+    Solve a linear least-squares problem for one or many series sharing the same basis.
+
+    All series are solved by a single LAPACK call, using every series as a right-hand side.
+
+    Args:
+        basis (npt.NDArray[np.floating]): The basis matrix of shape (n_points, n_params).
+        y (npt.NDArray[np.floating | np.integer]): The target data, either a single series of
+            shape (n_points,) or one series per row with shape (n_series, n_points).
+        sigma (npt.NDArray[np.floating], optional): The uncertainty of each point, with the same
+            meaning as the ``sigma`` argument of ``scipy.optimize.curve_fit``.
+
+    Returns:
+        npt.NDArray[np.floating]: The parameters, of shape (n_params,) for a single series or
+            (n_series, n_params) for many.
+
+    Raises:
+        ValueError: If the data contain non-finite values.
+    """
+    y = np.asarray(y, dtype=float)
+    if not (np.isfinite(basis).all() and np.isfinite(y).all()):
+        raise ValueError("Data for a linear least-squares fit must be finite.")
+
+    if sigma is not None:
+        weights = 1.0 / np.asarray(sigma, dtype=float)
+        basis = basis * weights[:, None]
+        y = y * weights
+
+    return _lstsq(basis, y.T).T
+
+
+def cross_validation_residuals(
+    basis: npt.NDArray[np.floating],
+    y: npt.NDArray[np.floating | np.integer],
+    folds: list[npt.NDArray[np.integer]] | None = None,
+) -> npt.NDArray[np.floating]:
+    """
+    Compute the out-of-fold residuals of a linear least-squares fit without refitting.
+
+    With the thin QR decomposition ``basis = Q R``, the residuals of the points of a fold when the
+    fold is left out are ``(I - Q_f Q_f^T)^-1 e_f``, where ``e_f`` are their in-sample residuals
+    and ``Q_f`` their rows of ``Q``. For leave-one-out this reduces to ``e_i / (1 - h_ii)``.
+
+    Args:
+        basis (npt.NDArray[np.floating]): The basis matrix of shape (n_points, n_params).
+        y (npt.NDArray[np.floating | np.integer]): The target data of shape (n_points,).
+        folds (list[npt.NDArray[np.integer]], optional): The indices of the points of each fold,
+            which must partition the points. Defaults to leave-one-out.
+
+    Returns:
+        npt.NDArray[np.floating]: The residual of every point when predicted by a fit without
+            its fold. Points that no fit without them can predict, such as a point of leverage
+            one, have infinite or NaN residuals.
+    """
+    y = np.asarray(y, dtype=float)
+    q, _ = np.linalg.qr(basis / _column_scale(basis))
+    residuals = y - q @ (q.T @ y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if folds is None:
+            return residuals / (1 - np.sum(q**2, axis=1))
+
+        out = np.empty_like(residuals)
+        for test in folds:
+            qf = q[test]
+            # Woodbury: (I - Q_f Q_f^T)^-1 = I + Q_f (I - Q_f^T Q_f)^-1 Q_f^T.
+            inner = np.eye(q.shape[1]) - qf.T @ qf
+            try:
+                correction = qf @ np.linalg.solve(inner, qf.T @ residuals[test])
+            except np.linalg.LinAlgError:
+                correction = np.nan
+            out[test] = residuals[test] + correction
+    return out
+
+
+def qr_update(
+    r: npt.NDArray[np.floating],
+    columns: npt.NDArray[np.floating],
+    y: npt.NDArray[np.floating],
+) -> npt.NDArray[np.floating]:
+    """
+    Fold a chunk of rows ``[columns | y]`` into the triangular factor ``r`` of the rows so far.
+
+    Rows are added one chunk at a time without ever forming the normal equations, whose
+    condition number is the square of that of the basis. For the final factor,
+    ``r[:p, :p] @ coef = r[:p, p]`` gives the least-squares coefficients and ``r[p, p] ** 2``
+    their sum of squared residuals.
+    """
+    rows = np.vstack([r, np.column_stack([columns, y])])
+    return np.linalg.qr(rows, mode="r")
+
+
+def solve_separable(
+    functional_form: FunctionalFormStrategy,
+    x: npt.NDArray[np.floating | np.integer],
+    y: npt.NDArray[np.floating | np.integer],
+    nonlinear_guess: npt.ArrayLike,
+    sigma: npt.NDArray[np.floating] | None = None,
+    max_nfev: int | None = None,
+    on_evaluation: Callable[[], None] | None = None,
+) -> OptimizeResult:
+    """
+    Fit a separable form by variable projection.
+
+    The optimizer only searches over the nonlinear parameters of the form. For every trial value
+    the linear parameters are eliminated by a linear least-squares solve on the form's basis, so
+    the residual being minimised is that of the best fit attainable with those nonlinear values.
+
+    Args:
+        functional_form (FunctionalFormStrategy): A form declaring `linear_params` and `basis`.
+        x (npt.NDArray[np.floating | np.integer]): The x data.
+        y (npt.NDArray[np.floating | np.integer]): The y data.
+        nonlinear_guess (npt.ArrayLike): The starting values of the nonlinear parameters.
+        sigma (npt.NDArray[np.floating], optional): The uncertainty of each point.
+        max_nfev (int, optional): The maximum number of residual evaluations.
+        on_evaluation (Callable[[], None], optional): Called before every residual evaluation;
+            it may raise to abort the fit.
+
+    Returns:
+        OptimizeResult: The optimization result, whose ``x`` holds all parameters of the form in
+            the order of `func`, along with ``nfev`` and ``message``.
+
+    Raises:
+        RuntimeError: If the optimizer does not converge.
+    """
+    y = np.asarray(y, dtype=float)
+    weights = None if sigma is None else 1.0 / np.asarray(sigma, dtype=float)
+    if weights is not None:
+        y = y * weights
+    overflow = np.full_like(y, _OVERFLOW_RESIDUAL)
+
+    linear = list(functional_form.linear_params)
+    nonlinear = list(functional_form.nonlinear_params)
+    last: dict[bytes, tuple] = {}
+
+    def project(theta):
+        # The optimizer asks for the residuals and the Jacobian at the same point, so the
+        # projection of the most recent point is kept for reuse.
+        key = theta.tobytes()
+        if key not in last:
+            last.clear()
+            with np.errstate(over="ignore", invalid="ignore"):
+                basis = functional_form.basis(x, *theta)
+            if weights is not None:
+                basis = basis * weights[:, None]
+            last[key] = (
+                (basis, _lstsq(basis, y)) if np.isfinite(basis).all() else (None, None)
+            )
+        return last[key]
+
+    def residuals(theta):
+        if on_evaluation is not None:
+            on_evaluation()
+        basis, coef = project(theta)
+        return overflow if basis is None else y - basis @ coef
+
+    def assemble(coef, theta):
+        params = np.empty(functional_form.num_params)
+        params[linear] = coef
+        params[nonlinear] = theta
+        return params
+
+    def jacobian(theta):
+        # Kaufman's approximation: the derivative of the full model with respect to the
+        # nonlinear parameters, projected onto the orthogonal complement of the basis.
+        basis, coef = project(theta)
+        if basis is None:
+            return np.zeros((len(y), len(theta)))
+        jac = functional_form.jacobian(x, *assemble(coef, theta))[:, nonlinear]
+        if weights is not None:
+            jac = jac * weights[:, None]
+        q, _ = np.linalg.qr(basis)
+        return q @ (q.T @ jac) - jac
+
+    # A starting point whose basis overflows gives the optimizer nothing to follow, so pull it
+    # towards the origin until the basis is finite.
+    theta0 = np.asarray(nonlinear_guess, dtype=float)
+    for _ in range(_MAX_GUESS_HALVINGS):
+        if project(theta0)[0] is not None:
+            break
+        theta0 = theta0 / 2
+
+    result = least_squares(
+        residuals,
+        theta0,
+        jac=jacobian if functional_form.has_jacobian else "2-point",
+        x_scale="jac",
+        max_nfev=max_nfev,
+    )
+    basis, coef = project(result.x)
+    if not result.success or basis is None:
+        raise RuntimeError(f"Optimal parameters not found: {result.message}")
+    return OptimizeResult(
+        x=assemble(coef, result.x),
+        success=True,
+        nfev=result.nfev,
+        njev=result.njev,
+        message=result.message,
+    )
+
+
+def _lstsq(
+    basis: npt.NDArray[np.floating], y: npt.NDArray[np.floating]
+) -> npt.NDArray[np.floating]:
+    """
+    Solve ``basis @ coef = y`` in the least-squares sense with column equilibration.
+
+    Scaling every column to unit maximum keeps the solve well conditioned when columns differ by
+    many orders of magnitude, as exponential terms do.
+    """
+    scale = _column_scale(basis)
+    coef, *_ = np.linalg.lstsq(basis / scale, y, rcond=None)
+    return coef / (scale[:, None] if coef.ndim == 2 else scale)
+
+
+def _column_scale(basis: npt.NDArray[np.floating]) -> npt.NDArray[np.floating]:
+    """
+    The maximum absolute value of every column of ``basis``, with zero columns left unscaled.
+    """
+    scale = np.abs(basis).max(axis=0)
+    scale[scale == 0] = 1.0
+    return scale
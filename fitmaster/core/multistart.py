@@ -0,0 +1,137 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+
+@dataclass(frozen=True)
+class MultiStart:
+    """
+    Settings of multi-start fitting, which guards nonlinear forms against poor local minima.
+
+    Starting points are spread over a box around the form's data-driven initial guess, screened
+    by evaluating the form at every candidate in one broadcast call, and only the best
+    ``n_refine`` of them are refined by the solver. The data-driven guess is always a candidate.
+
+    For forms with linear parameters only the nonlinear ones are sampled: the linear parameters
+    of every candidate are solved for exactly during screening, as variable projection does
+    during refinement.
+
+    Attributes:
+        n_starts (int): The number of candidate starting points, including the initial guess.
+        n_refine (int): The number of screened candidates refined by the solver.
+        sampling (str): "lhs" for a Latin hypercube, or "grid" for the largest full grid with at
+            most ``n_starts`` points.
+        spread (float): The half-width of the box around each parameter of the guess, relative
+            to the parameter's magnitude (or to one for parameters smaller than one).
+        max_screen_points (int): The maximum number of data points used for screening; longer
+            series are screened on evenly strided points.
+        seed (int | None): The random seed of the Latin hypercube.
+        n_jobs (int | None): The number of refinement workers, following joblib semantics.
+        backend (str): The joblib backend of the refinements.
+    """
+
+    n_starts: int = 64
+    n_refine: int = 4
+    sampling: str = "lhs"
+    spread: float = 1.0
+    max_screen_points: int = 4096
+    seed: int | None = None
+    n_jobs: int | None = None
+    backend: str = "loky"
+
+    def __post_init__(self):
+        if self.n_starts < 1 or self.n_refine < 1:
+            raise ValueError("n_starts and n_refine must be positive integers.")
+        if self.sampling not in ("lhs", "grid"):
+            raise ValueError(f"Unknown sampling '{self.sampling}'.")
+
+    def starting_points(self, guess: npt.ArrayLike) -> npt.NDArray[np.floating]:
+        """
+        Spread candidate starting points around an initial guess.
+
+        Args:
+            guess (npt.ArrayLike): The initial guess of the sampled parameters, of shape (k,).
+
+        Returns:
+            npt.NDArray[np.floating]: The candidates, of shape (n_candidates, k), starting with
+                the guess itself.
+        """
+        guess = np.asarray(guess, dtype=float)
+        k = len(guess)
+        if self.sampling == "grid":
+            levels = max(math.floor((self.n_starts - 1) ** (1 / k) + 1e-9), 1)
+            axes = np.meshgrid(*[np.linspace(0, 1, levels)] * k, indexing="ij")
+            unit = np.column_stack([axis.ravel() for axis in axes])
+        else:
+            rng = np.random.default_rng(self.seed)
+            n = self.n_starts - 1
+            strata = np.argsort(rng.random((k, n)), axis=1).T
+            unit = (strata + rng.random((n, k))) / max(n, 1)
+
+        width = self.spread * np.maximum(np.abs(guess), 1.0)
+        candidates = guess + width * (2 * unit - 1)
+        return np.vstack([guess, candidates])
+
+    def screen(
+        self,
+        functional_form: FunctionalFormStrategy,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        guess: npt.NDArray[np.floating],
+        candidates: npt.NDArray[np.floating],
+        sampled: tuple[int, ...],
+    ) -> npt.NDArray[np.floating]:
+        """
+        Score every candidate by its sum of squared residuals on the (strided) data.
+
+        Args:
+            functional_form (FunctionalFormStrategy): The form, whose ``func`` must broadcast
+                over parameter arrays.
+            x (npt.NDArray[np.floating | np.integer]): The x data.
+            y (npt.NDArray[np.floating | np.integer]): The y data.
+            guess (npt.NDArray[np.floating]): The full initial guess, of shape (p,).
+            candidates (npt.NDArray[np.floating]): The sampled parameters, of shape
+                (n_candidates, len(sampled)).
+            sampled (tuple[int, ...]): The positions of the sampled parameters. Any others are
+                linear and solved for exactly.
+
+        Returns:
+            npt.NDArray[np.floating]: The score of each candidate; infinite where the form
+                cannot be evaluated.
+        """
+        step = max(1, math.ceil(len(y) / self.max_screen_points))
+        x = np.asarray(x, dtype=float)[::step]
+        y = np.asarray(y, dtype=float)[::step]
+        linear = [i for i in range(len(guess)) if i not in sampled]
+
+        params = np.broadcast_to(guess, (len(candidates), len(guess))).copy()
+        params[:, list(sampled)] = candidates
+        shape = (len(candidates), len(x))
+
+        with np.errstate(all="ignore"):
+            if not linear:
+                pred = functional_form.func(x, *params.T[:, :, None])
+                scores = np.sum((y - np.broadcast_to(pred, shape)) ** 2, axis=1)
+            else:
+                # Each basis column is the form with one linear parameter set to one and the
+                # others to zero.
+                columns = []
+                for i in linear:
+                    unit = params.copy()
+                    unit[:, linear] = 0.0
+                    unit[:, i] = 1.0
+                    column = functional_form.func(x, *unit.T[:, :, None])
+                    columns.append(np.broadcast_to(column, shape))
+                basis = np.stack(columns, axis=-1)
+                finite = np.isfinite(basis).all(axis=(1, 2))
+                scores = np.full(len(candidates), np.inf)
+                if finite.any():
+                    q, _ = np.linalg.qr(basis[finite])
+                    projected = np.einsum("smk,m->sk", q, y)
+                    scores[finite] = y @ y - np.sum(projected**2, axis=1)
+
+        return np.where(np.isfinite(scores), scores, np.inf)
@@ -0,0 +1,360 @@
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.core.budget import FIT_ERRORS
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.least_squares import qr_update
+from fitmaster.core.results import FitResult, r_squared_key
+from fitmaster.criteria.statistics import FitStatistics
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+Chunks = Iterator[tuple[npt.NDArray[np.floating], npt.NDArray[np.floating]]]
+
+
+class OutOfCoreCurveFitter:
+    """
+    Fits functional forms to series that are too long to hold in memory.
+
+    The data are read in chunks of ``chunk_size`` points, either from arrays that may be
+    memory-mapped (or paths to ``.npy`` files, which are opened with ``mmap_mode="r"``), or from
+    a re-iterable sequence of ``(x, y)`` chunks. Only O(chunk_size * n_params) temporaries exist
+    at any time, so peak memory does not grow with the length of the series.
+
+    Forms that are linear in their parameters are solved in a single pass by a streaming QR
+    decomposition of the basis augmented with ``y``, which also yields their sum of squared
+    residuals. Other forms are started from a fit to an evenly strided subsample and refined by
+    Levenberg-Marquardt iterations, each of which is one pass accumulating the QR factor of the
+    Jacobian augmented with the residuals. Forms with their own `fit` method, such as the
+    segmented forms whose breakpoints are not differentiable, keep the nonlinear parameters of
+    their subsample fit, and their linear parameters are solved by one more streaming QR pass
+    over the basis at those values. The total sum of squares is accumulated in the first pass,
+    so the criteria of every form are computed without materializing predictions.
+
+    Attributes:
+        tool (CurveFittingTool): The tool whose forms, criteria and solvers are used.
+        forms (tuple[str, ...]): The functional forms to fit.
+        criterions (list[str] | None): The criteria reported for each form.
+        chunk_size (int): The number of points read at a time from arrays.
+        subsample_size (int): The number of points of the starting fits of nonlinear forms.
+        max_iter (int): The maximum number of refinement passes of a nonlinear form.
+        tol (float): The relative decrease of the sum of squares below which refinement stops.
+    """
+
+    def __init__(
+        self,
+        functional_forms: list[str] | None = None,
+        criterions: list[str] | None = None,
+        chunk_size: int = 1 << 16,
+        subsample_size: int = 10_000,
+        max_iter: int = 100,
+        tol: float = 1e-10,
+        tool: CurveFittingTool | None = None,
+    ):
+        """
+        Initialize the fitter.
+
+        Args:
+            functional_forms (list[str], optional): The functional forms to fit. Defaults to the
+                default forms of the factory.
+            criterions (list[str], optional): The criteria to report.
+            chunk_size (int): The number of points read at a time from arrays.
+            subsample_size (int): The number of points of the starting fits of nonlinear forms.
+            max_iter (int): The maximum number of refinement passes of a nonlinear form.
+            tol (float): The relative decrease of the sum of squares at which refinement stops.
+            tool (CurveFittingTool, optional): The tool providing forms, criteria and solvers.
+        """
+        if chunk_size < 1 or subsample_size < 1:
+            raise ValueError("chunk_size and subsample_size must be positive integers.")
+
+        self.tool = tool if tool is not None else CurveFittingTool()
+        self.forms = tuple(self.tool.form_factory.select(functional_forms))
+        self.criterions = criterions
+        self.chunk_size = chunk_size
+        self.subsample_size = subsample_size
+        self.max_iter = max_iter
+        self.tol = tol
+
+    def search_and_evaluate(
+        self,
+        x: npt.ArrayLike | str | os.PathLike,
+        y: npt.ArrayLike | str | os.PathLike,
+    ) -> list[FitResult]:
+        """
+        Fit every form to arrays that may be memory-mapped.
+
+        Args:
+            x (npt.ArrayLike | str | os.PathLike): The x data, or the path of a ``.npy`` file.
+            y (npt.ArrayLike | str | os.PathLike): The y data, or the path of a ``.npy`` file.
+
+        Returns:
+            list[FitResult]: The results sorted by R^2 value. Their lazy predictions reference
+                the (possibly memory-mapped) arrays.
+        """
+        x, y = (
+            np.load(data, mmap_mode="r") if isinstance(data, (str, os.PathLike)) else data
+            for data in (x, y)
+        )
+        if np.ndim(x) != 1 or np.shape(x) != np.shape(y):
+            raise ValueError("x and y must be 1-D arrays of the same length.")
+
+        def passes() -> Chunks:
+            for start in range(0, len(x), self.chunk_size):
+                stop = start + self.chunk_size
+                yield (
+                    np.asarray(x[start:stop], dtype=float),
+                    np.asarray(y[start:stop], dtype=float),
+                )
+
+        return self._search(passes, x, y)
+
+    def search_and_evaluate_chunks(
+        self,
+        chunks: Iterable[tuple[npt.ArrayLike, npt.ArrayLike]],
+    ) -> list[FitResult]:
+        """
+        Fit every form to data given as a sequence of ``(x, y)`` chunks.
+
+        Args:
+            chunks (Iterable[tuple[npt.ArrayLike, npt.ArrayLike]]): The chunks, in any order. The
+                iterable is iterated once per pass, so it must be re-iterable, e.g. a list or an
+                object whose ``__iter__`` reads the chunks from disk.
+
+        Returns:
+            list[FitResult]: The results sorted by R^2 value. They do not reference the data.
+
+        Raises:
+            ValueError: If ``chunks`` is a one-shot iterator.
+        """
+        if iter(chunks) is chunks:
+            raise ValueError("chunks must be re-iterable, not a one-shot iterator.")
+
+        def passes() -> Chunks:
+            for x, y in chunks:
+                x = np.asarray(x, dtype=float).ravel()
+                y = np.asarray(y, dtype=float).ravel()
+                if x.shape != y.shape:
+                    raise ValueError("The x and y of a chunk must have the same length.")
+                yield x, y
+
+        return self._search(passes, None, None)
+
+    def _search(
+        self,
+        passes: Callable[[], Chunks],
+        x: npt.ArrayLike | None,
+        y: npt.ArrayLike | None,
+    ) -> list[FitResult]:
+        factory = self.tool.form_factory
+        linear = {}
+        nonlinear = {}
+        for form in self.forms:
+            f = factory.get_functional_form(form)
+            if f.linear_params and not f.nonlinear_params:
+                linear[form] = (f, np.zeros((0, f.num_params + 1)))
+            else:
+                nonlinear[form] = f
+
+        # First pass: the moments of y, for the total sum of squares, and the linear forms.
+        start = time.perf_counter()
+        n, mean, m2 = 0, 0.0, 0.0
+        for xc, yc in passes():
+            if not (np.isfinite(xc).all() and np.isfinite(yc).all()):
+                raise ValueError("Data for an out-of-core fit must be finite.")
+            if not len(yc):
+                continue
+            # Chan et al.'s pairwise update of the count, mean and sum of squared deviations.
+            mc = yc.mean()
+            delta = mc - mean
+            m2 += np.sum((yc - mc) ** 2) + delta**2 * n * len(yc) / (n + len(yc))
+            n += len(yc)
+            mean += delta * len(yc) / n
+            for form, (f, r) in linear.items():
+                linear[form] = (f, qr_update(r, f.basis(xc), yc))
+        if n == 0:
+            raise ValueError("An out-of-core fit needs at least one point.")
+        shared = (time.perf_counter() - start) / max(len(linear), 1)
+
+        results = []
+        for form, (f, r) in linear.items():
+            p = f.num_params
+            if len(r) <= p:
+                results.append(self._failed(form, f, x, y, "Not enough points to fit.", shared))
+                continue
+            params = np.linalg.lstsq(r[:p, :p], r[:p, p], rcond=None)[0]
+            stats = FitStatistics(sse=r[p, p] ** 2, n=n, sst=m2)
+            results.append(
+                self._result(form, f, params, stats, x, y, shared, 1, True, "Streaming QR solution.")
+            )
+
+        if nonlinear:
+            xs, ys = _subsample(passes(), max(1, n // self.subsample_size))
+            for form, f in nonlinear.items():
+                start = time.perf_counter()
+                try:
+                    guess = self.tool._fit_params(xs, ys, f).x
+                    if f.has_fit:
+                        params, sse = _solve_linear_params(f, guess, passes)
+                        nfev, converged = 1, True
+                        message = "Subsample fit, with linear parameters by streaming QR."
+                    else:
+                        params, sse, nfev, converged, message = self._refine(f, guess, passes)
+                except FIT_ERRORS as exc:
+                    results.append(
+                        self._failed(form, f, x, y, str(exc), time.perf_counter() - start)
+                    )
+                    continue
+                stats = FitStatistics(sse=sse, n=n, sst=m2)
+                elapsed = time.perf_counter() - start
+                results.append(
+                    self._result(form, f, params, stats, x, y, elapsed, nfev, converged, message)
+                )
+
+        results.sort(key=r_squared_key, reverse=True)
+        return results
+
+    def _refine(
+        self,
+        f: FunctionalFormStrategy,
+        params: npt.NDArray[np.floating],
+        passes: Callable[[], Chunks],
+    ) -> tuple[npt.NDArray[np.floating], float, int, bool, str]:
+        """
+        Refine the parameters of a nonlinear form by Levenberg-Marquardt on the full data.
+        """
+        p = len(params)
+        r = _jacobian_qr(f, params, passes)
+        sse = float(np.sum(r[:, p] ** 2))
+        damping = 1e-3
+        for nfev in range(1, self.max_iter + 1):
+            # Solve min |R step - Q^T r|^2 + damping * |D step|^2 by least squares.
+            scale = np.linalg.norm(r[:p, :p], axis=0)
+            scale[scale == 0] = 1.0
+            system = np.vstack([r[:p, :p], np.diag(np.sqrt(damping) * scale)])
+            rhs = np.concatenate([r[:p, p], np.zeros(p)])
+            step = np.linalg.lstsq(system, rhs, rcond=None)[0]
+
+            candidate = params + step
+            with np.errstate(over="ignore", invalid="ignore"):
+                r_new = _jacobian_qr(f, candidate, passes)
+            sse_new = float(np.sum(r_new[:, p] ** 2))
+            if np.isfinite(sse_new) and sse_new <= sse:
+                converged = sse - sse_new <= self.tol * max(sse, np.finfo(float).tiny)
+                params, r, sse = candidate, r_new, sse_new
+                damping = max(damping / 10, 1e-12)
+                if converged:
+                    return params, sse, nfev + 1, True, "Relative reduction of SSE below tol."
+            else:
+                damping *= 10
+                if damping > 1e12:
+                    return params, sse, nfev + 1, True, "No further reduction of SSE possible."
+        return params, sse, self.max_iter + 1, False, "Maximum number of passes reached."
+
+    def _result(self, form, f, params, stats, x, y, elapsed, nfev, converged, message):
+        return FitResult(
+            form=form,
+            params=params,
+            criteria=self.tool._evaluate_criteria(stats, len(params), self.criterions),
+            functional_form=f,
+            x=x,
+            y=y,
+            elapsed=elapsed,
+            nfev=nfev,
+            converged=converged,
+            message=message,
+        )
+
+    def _failed(self, form, f, x, y, message, elapsed) -> FitResult:
+        stats = FitStatistics(sse=np.nan, n=np.nan, sst=np.nan)
+        return FitResult(
+            form=form,
+            params=np.full(f.num_params, np.nan),
+            criteria=self.tool._evaluate_criteria(stats, f.num_params, self.criterions),
+            functional_form=f,
+            x=x,
+            y=y,
+            elapsed=elapsed,
+            converged=False,
+            message=message,
+        )
+
+
+def _solve_linear_params(
+    f: FunctionalFormStrategy,
+    params: npt.NDArray[np.floating],
+    passes: Callable[[], Chunks],
+) -> tuple[npt.NDArray[np.floating], float]:
+    """
+    Solve the linear parameters of a form exactly in one pass, with the others held fixed.
+    """
+    params = np.array(params, dtype=float)
+    nonlinear = params[list(f.nonlinear_params)]
+    linear = list(f.linear_params)
+    p = len(linear)
+    r = np.zeros((0, p + 1))
+    for xc, yc in passes():
+        if p:
+            r = qr_update(r, f.basis(xc, *nonlinear), yc)
+        else:
+            r = qr_update(r, np.empty((len(yc), 0)), yc - f.func(xc, *params))
+    if len(r) <= p:
+        raise ValueError("Not enough points to fit.")
+    if p:
+        params[linear] = np.linalg.lstsq(r[:p, :p], r[:p, p], rcond=None)[0]
+    return params, float(r[p, p] ** 2)
+
+
+def _jacobian_qr(
+    f: FunctionalFormStrategy,
+    params: npt.NDArray[np.floating],
+    passes: Callable[[], Chunks],
+) -> npt.NDArray[np.floating]:
+    """
+    Accumulate the triangular factor of the Jacobian augmented with the residuals in one pass.
+    """
+    r = np.zeros((0, len(params) + 1))
+    for xc, yc in passes():
+        residuals = yc - f.func(xc, *params)
+        if f.has_jacobian:
+            jac = f.jacobian(xc, *params)
+        else:
+            jac = _forward_difference(f, xc, params, yc - residuals)
+        r = qr_update(r, jac, residuals)
+    return r
+
+
+def _forward_difference(
+    f: FunctionalFormStrategy,
+    x: npt.NDArray[np.floating],
+    params: npt.NDArray[np.floating],
+    y_pred: npt.NDArray[np.floating],
+) -> npt.NDArray[np.floating]:
+    """
+    Approximate the Jacobian of a form without an analytic one by forward differences.
+    """
+    jac = np.empty((len(x), len(params)))
+    for j in range(len(params)):
+        h = np.sqrt(np.finfo(float).eps) * max(1.0, abs(params[j]))
+        shifted = params.copy()
+        shifted[j] += h
+        jac[:, j] = (f.func(x, *shifted) - y_pred) / h
+    return jac
+
+
+def _subsample(
+    chunks: Chunks, step: int
+) -> tuple[npt.NDArray[np.floating], npt.NDArray[np.floating]]:
+    """
+    Collect every ``step``-th point of the data, counting across chunk boundaries.
+    """
+    xs, ys = [], []
+    offset = 0
+    for xc, yc in chunks:
+        first = -offset % step
+        xs.append(xc[first::step])
+        ys.append(yc[first::step])
+        offset += len(xc)
+    return np.concatenate(xs), np.concatenate(ys)
@@ -0,0 +1,89 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+
+def predict_batch(
+    x: npt.ArrayLike,
+    form_ids: npt.ArrayLike,
+    params: npt.ArrayLike,
+    forms: Sequence[str],
+    functional_forms: Mapping[str, FunctionalFormStrategy],
+    out: npt.NDArray[np.floating] | None = None,
+    dtype: npt.DTypeLike | None = None,
+    chunk_size: int = 1024,
+) -> npt.NDArray[np.floating]:
+    """
+    Evaluate the fitted models of many series, one broadcast call per form and chunk.
+
+    The series are grouped by form, and each group is evaluated by passing the columns of its
+    parameter matrix to the form's ``func`` as arrays of shape ``(n_rows, 1)``, so the cost per
+    series is a share of a few array operations rather than a Python call.
+
+    Args:
+        x (npt.ArrayLike): The points to evaluate at, of shape (n_points,) shared by every
+            series, or (n_series, n_points).
+        form_ids (npt.ArrayLike): The position in ``forms`` of the model of each series, of
+            shape (n_series,). Series with a negative id are filled with NaN.
+        params (npt.ArrayLike): The parameters of each series, of shape (n_series, max_params),
+            padded on the right for forms with fewer parameters, as stored by `ResultStore`.
+        forms (Sequence[str]): The names of the forms, indexed by ``form_ids``.
+        functional_forms (Mapping[str, FunctionalFormStrategy]): The forms by name, e.g.
+            ``tool.form_factory.functional_forms``.
+        out (npt.NDArray[np.floating], optional): The array of shape (n_series, n_points) to
+            write the predictions to.
+        dtype (npt.DTypeLike, optional): The type the points and parameters are converted to
+            before evaluating, e.g. ``np.float32`` for half the memory traffic. Defaults to the
+            type of ``out``, or float64.
+        chunk_size (int): The maximum number of series evaluated at a time, which bounds the
+            temporaries to a few arrays of shape (chunk_size, n_points).
+
+    Returns:
+        npt.NDArray[np.floating]: The predictions, of shape (n_series, n_points); ``out`` if
+            it was given.
+
+    Raises:
+        ValueError: If the shapes of the arguments do not match.
+    """
+    form_ids = np.asarray(form_ids, dtype=np.intp)
+    params = np.asarray(params)
+    if dtype is None:
+        dtype = float if out is None else out.dtype
+    x = np.asarray(x, dtype=dtype)
+    n_series = len(form_ids)
+    if params.ndim != 2 or len(params) != n_series:
+        raise ValueError(f"params must have shape ({n_series}, max_params).")
+    if x.ndim == 2 and len(x) != n_series:
+        raise ValueError(f"x must have shape (n_points,) or ({n_series}, n_points).")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+    shape = (n_series, x.shape[-1])
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out must have shape {shape}, not {out.shape}.")
+
+    # A stable sort groups the series by form while keeping runs of one form contiguous.
+    order = np.argsort(form_ids, kind="stable")
+    ids, starts = np.unique(form_ids[order], return_index=True)
+    bounds = [*starts, n_series]
+    for form_id, lo, hi in zip(ids, bounds[:-1], bounds[1:]):
+        group = order[lo:hi]
+        if form_id < 0:
+            out[group] = np.nan
+            continue
+        functional_form = functional_forms[forms[form_id]]
+        n_params = functional_form.num_params
+        for start in range(0, len(group), chunk_size):
+            rows = group[start : start + chunk_size]
+            # Contiguous rows are read and written through views rather than copies.
+            if rows[-1] - rows[0] == len(rows) - 1:
+                rows = slice(rows[0], rows[-1] + 1)
+            chunk_params = params[rows, :n_params].astype(dtype, copy=False)
+            chunk_x = x if x.ndim == 1 else x[rows]
+            with np.errstate(over="ignore", invalid="ignore"):
+                out[rows] = functional_form.func(chunk_x, *chunk_params.T[:, :, None])
+    return out
@@ -0,0 +1,345 @@
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.core.prediction import predict_batch
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+
+@dataclass(slots=True, eq=False)
+class FitResult(Mapping):
+    """
+    The result of fitting one functional form to one series.
+
+    Only the parameters and criteria are stored. Fitted values and residuals are computed from
+    the form and the referenced data each time they are accessed, so keeping many results does
+    not keep a prediction array per result alive.
+
+    Results can also be read like the dictionaries returned by earlier versions, e.g.
+    ``result["form"]``, ``result["y_pred"]`` or ``result["r_squared"]``.
+
+    Attributes:
+        form (str): The name of the functional form.
+        params (npt.NDArray[np.floating]): The fitted parameters.
+        criteria (dict[str, np.floating]): The value of each evaluated criterion.
+        functional_form (FunctionalFormStrategy | None): The form used to compute predictions.
+        x (npt.NDArray | None): The x data of the fit, used for `y_pred`.
+        y (npt.NDArray | None): The y data of the fit, used for `residuals`.
+        elapsed (float): The wall time of the fit and its evaluation, in seconds.
+        nfev (int): The number of model evaluations made by the solver.
+        converged (bool): Whether the solver converged.
+        message (str): The solver's termination message.
+        p0 (npt.NDArray[np.floating] | None): The starting point that won a multi-start fit.
+    """
+
+    form: str
+    params: npt.NDArray[np.floating]
+    criteria: dict[str, np.floating] = field(default_factory=dict)
+    functional_form: FunctionalFormStrategy | None = field(default=None, repr=False)
+    x: npt.NDArray[np.floating | np.integer] | None = field(default=None, repr=False)
+    y: npt.NDArray[np.floating | np.integer] | None = field(default=None, repr=False)
+    elapsed: float = 0.0
+    nfev: int = 0
+    converged: bool = True
+    message: str = ""
+    p0: npt.NDArray[np.floating] | None = field(default=None, repr=False)
+
+    @property
+    def y_pred(self) -> npt.NDArray[np.floating]:
+        """
+        The fitted values at the x data of the fit.
+        """
+        if self.x is None:
+            raise AttributeError(f"The {self.form} result does not reference its x data.")
+        return self.predict(self.x)
+
+    @property
+    def residuals(self) -> npt.NDArray[np.floating]:
+        """
+        The residuals of the fit, ``y - y_pred``.
+        """
+        if self.y is None:
+            raise AttributeError(f"The {self.form} result does not reference its y data.")
+        return self.y - self.y_pred
+
+    def predict(self, x: npt.NDArray[np.floating | np.integer]) -> npt.NDArray[np.floating]:
+        """
+        Evaluate the fitted model.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The points to evaluate the model at.
+
+        Returns:
+            npt.NDArray[np.floating]: The model values.
+        """
+        if self.functional_form is None:
+            raise AttributeError(f"The {self.form} result does not reference its form.")
+        return self.functional_form.func(x, *self.params)
+
+    def _keys(self) -> tuple[str, ...]:
+        lazy = ("y_pred",) if self.x is not None else ()
+        lazy += ("residuals",) if self.y is not None else ()
+        return (
+            "form",
+            "params",
+            *lazy,
+            *self.criteria,
+            "elapsed",
+            "nfev",
+            "converged",
+            "message",
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.criteria:
+            return self.criteria[key]
+        if key in self._keys():
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+
+def r_squared_key(result: FitResult) -> float:
+    """
+    Sort key ranking results by R^2, with failed fits last.
+    """
+    value = result["r_squared"]
+    return -np.inf if np.isnan(value) else value
+
+
+@dataclass
+class BootstrapResult:
+    """
+    Bootstrap distribution of the parameters and criteria of one fit.
+
+    Attributes:
+        result (FitResult): The fit to the original data.
+        params (npt.NDArray[np.floating]): The parameters fitted to each resample, of shape
+            ``(n_resamples, n_params)``. Rows of failed fits are NaN.
+        criteria (dict[str, npt.NDArray[np.floating]]): The value of each criterion on each
+            resample, of shape ``(n_resamples,)``.
+        confidence (float): The coverage of the percentile intervals, e.g. 0.95.
+    """
+
+    result: FitResult
+    params: npt.NDArray[np.floating]
+    criteria: dict[str, npt.NDArray[np.floating]]
+    confidence: float = 0.95
+
+    @property
+    def n_failed(self) -> int:
+        """
+        The number of resamples whose fit failed.
+        """
+        return int(np.isnan(self.params).any(axis=1).sum())
+
+    @property
+    def param_intervals(self) -> npt.NDArray[np.floating]:
+        """
+        The percentile interval of every parameter, of shape ``(n_params, 2)``.
+        """
+        return self._percentiles(self.params)
+
+    @property
+    def criteria_intervals(self) -> dict[str, npt.NDArray[np.floating]]:
+        """
+        The percentile interval of every criterion, as ``[low, high]`` arrays.
+        """
+        return {name: self._percentiles(values) for name, values in self.criteria.items()}
+
+    def _percentiles(self, samples: npt.NDArray[np.floating]) -> npt.NDArray[np.floating]:
+        tail = 50 * (1 - self.confidence)
+        return np.nanpercentile(samples, [tail, 100 - tail], axis=0).T
+
+
+@dataclass
+class MultiResolutionResult:
+    """
+    Results of a coarse-to-fine search.
+
+    Attributes:
+        results (list[FitResult]): The forms refitted on the full data, sorted by R^2 value.
+        coarse_results (list[FitResult]): Every form fitted on the subsample, sorted by R^2 value.
+        coarse_ranking (tuple[str, ...]): The forms in their subsample order.
+        refined_ranking (tuple[str, ...]): The refitted forms in their full-data order.
+        subsample_size (int): The number of points of the coarse fits.
+    """
+
+    results: list[FitResult]
+    coarse_results: list[FitResult]
+    coarse_ranking: tuple[str, ...]
+    refined_ranking: tuple[str, ...]
+    subsample_size: int
+
+    @property
+    def ranking_disagrees(self) -> bool:
+        """
+        Whether the full data ordered the refitted forms differently from the subsample.
+        """
+        coarse = tuple(form for form in self.coarse_ranking if form in self.refined_ranking)
+        return coarse != self.refined_ranking
+
+
+@dataclass
+class BatchSearchResult:
+    """
+    Columnar results of a batched search over many series.
+
+    Every per-series quantity is stored as an array whose first axis is the series index, so
+    results for hundreds of thousands of series stay compact and can be sliced or masked directly.
+
+    Attributes:
+        forms (tuple[str, ...]): The functional forms that were fitted, in column order.
+        params (dict[str, npt.NDArray[np.floating]]): Maps each form to its fitted parameters,
+            an array of shape ``(n_series, n_params)``. Rows of failed fits are NaN.
+        criteria (dict[str, npt.NDArray[np.floating]]): Maps each criterion to an array of shape
+            ``(n_series, n_forms)``. Entries of failed fits are NaN.
+        success (npt.NDArray[np.bool_]): Whether each fit converged, shape ``(n_series, n_forms)``.
+        elapsed (npt.NDArray[np.floating]): The wall time of each fit in seconds, shape
+            ``(n_series, n_forms)``.
+        nfev (npt.NDArray[np.integer]): The number of model evaluations of each fit, shape
+            ``(n_series, n_forms)``.
+    """
+
+    forms: tuple[str, ...]
+    params: dict[str, npt.NDArray[np.floating]]
+    criteria: dict[str, npt.NDArray[np.floating]]
+    success: npt.NDArray[np.bool_]
+    elapsed: npt.NDArray[np.floating]
+    nfev: npt.NDArray[np.integer]
+
+    def __len__(self) -> int:
+        return self.success.shape[0]
+
+    @classmethod
+    def concatenate(cls, chunks: "list[BatchSearchResult]") -> "BatchSearchResult":
+        """
+        Join the results of consecutive chunks of series into one batch.
+
+        Args:
+            chunks (list[BatchSearchResult]): Results for the same forms and criteria.
+
+        Returns:
+            BatchSearchResult: The results of all series, in chunk order.
+        """
+        first = chunks[0]
+        return cls(
+            forms=first.forms,
+            params={
+                form: np.concatenate([chunk.params[form] for chunk in chunks])
+                for form in first.forms
+            },
+            criteria={
+                name: np.concatenate([chunk.criteria[name] for chunk in chunks])
+                for name in first.criteria
+            },
+            success=np.concatenate([chunk.success for chunk in chunks]),
+            elapsed=np.concatenate([chunk.elapsed for chunk in chunks]),
+            nfev=np.concatenate([chunk.nfev for chunk in chunks]),
+        )
+
+    def best_forms(self, criterion: str = "r_squared") -> npt.NDArray[np.str_]:
+        """
+        Return the best functional form of every series.
+
+        Args:
+            criterion (str): The criterion to rank by. R^2 is maximised, AIC and BIC are minimised.
+
+        Returns:
+            npt.NDArray[np.str_]: The name of the best form for each series, or an empty string if
+                every fit of that series failed.
+        """
+        values = self.criteria[criterion]
+        if criterion != "r_squared":
+            values = -values
+        values = np.where(np.isnan(values), -np.inf, values)
+        best = np.argmax(values, axis=1)
+        names = np.array(self.forms)[best]
+        return np.where(self.success.any(axis=1), names, "")
+
+    def predict(
+        self,
+        x: npt.ArrayLike,
+        functional_forms: Mapping[str, FunctionalFormStrategy],
+        criterion: str = "r_squared",
+        out: npt.NDArray[np.floating] | None = None,
+        dtype: npt.DTypeLike | None = None,
+        chunk_size: int = 1024,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Evaluate the best form of every series, as chosen by `best_forms`, with `predict_batch`.
+
+        Args:
+            x (npt.ArrayLike): The points to evaluate at, of shape (n_points,) or
+                (n_series, n_points).
+            functional_forms (Mapping[str, FunctionalFormStrategy]): The forms by name, e.g.
+                ``tool.form_factory.functional_forms``.
+            criterion (str): The criterion that picks the best form.
+            out (npt.NDArray[np.floating], optional): The array of shape (n_series, n_points)
+                to write the predictions to.
+            dtype (npt.DTypeLike, optional): The type to evaluate in, e.g. ``np.float32``.
+            chunk_size (int): The maximum number of series evaluated at a time.
+
+        Returns:
+            npt.NDArray[np.floating]: The predictions, of shape (n_series, n_points). Rows of
+                series whose fits all failed are NaN.
+        """
+        best = self.best_forms(criterion)
+        form_ids = np.full(len(self), -1, dtype=np.intp)
+        params = np.full((len(self), max(p.shape[1] for p in self.params.values())), np.nan)
+        for j, form in enumerate(self.forms):
+            rows = best == form
+            form_ids[rows] = j
+            params[rows, : self.params[form].shape[1]] = self.params[form][rows]
+        return predict_batch(
+            x, form_ids, params, self.forms, functional_forms, out, dtype, chunk_size
+        )
+
+    def results(
+        self,
+        series: int,
+        functional_forms: Mapping[str, FunctionalFormStrategy] | None = None,
+        x: npt.NDArray[np.floating | np.integer] | None = None,
+        y: npt.NDArray[np.floating | np.integer] | None = None,
+    ) -> list[FitResult]:
+        """
+        Return the results of one series in the shape produced by `search_and_evaluate`.
+
+        Args:
+            series (int): The index of the series.
+            functional_forms (Mapping[str, FunctionalFormStrategy], optional): The forms by name,
+                needed for lazy predictions, e.g. ``tool.form_factory.functional_forms``.
+            x (npt.NDArray, optional): The x data of the series, needed for `y_pred`.
+            y (npt.NDArray, optional): The y data of the series, needed for `residuals`.
+
+        Returns:
+            list[FitResult]: The successful fits of the series, sorted by R^2 value.
+        """
+        results = [
+            FitResult(
+                form=form,
+                params=self.params[form][series],
+                criteria={name: values[series, j] for name, values in self.criteria.items()},
+                functional_form=None if functional_forms is None else functional_forms[form],
+                x=x,
+                y=y,
+                elapsed=self.elapsed[series, j],
+                nfev=self.nfev[series, j],
+            )
+            for j, form in enumerate(self.forms)
+            if self.success[series, j]
+        ]
+        if "r_squared" in self.criteria:
+            results.sort(key=lambda result: result["r_squared"], reverse=True)
+        return results
@@ -0,0 +1,393 @@
+import json
+import os
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from fitmaster.core.prediction import predict_batch
+from fitmaster.core.results import BatchSearchResult, FitResult
+from fitmaster.forms.interface import FunctionalFormStrategy
+
+_MANIFEST = "manifest.json"
+_FORMAT_VERSION = 1
+
+
+class ResultStore:
+    """
+    Columnar on-disk store of fit results, written incrementally and read through memory maps.
+
+    A store is a directory holding one raw binary file per column and a ``manifest.json``
+    describing their types, widths and the number of rows. Every row is one fit of one form to
+    one series, with the columns:
+
+    - ``series`` (int64): The index of the series.
+    - ``form_id`` (int16): The position of the form in `forms`.
+    - ``params`` (float64, ``max_params`` wide): The parameters, NaN-padded for shorter forms.
+    - one float64 column per criterion.
+    - ``converged`` (bool), ``elapsed`` (float64) and ``nfev`` (int64).
+    - ``y_pred`` (``n_points`` wide), if the store was created with ``n_points``.
+
+    Appending writes only the new rows and then atomically replaces the manifest, so a reader,
+    or a writer recovering from a crash, only ever sees complete rows. Reads and filters work
+    on memory maps, chunk by chunk, so a store need not fit in memory.
+
+    Attributes:
+        path (Path): The directory of the store.
+        forms (list[str]): The names of the forms, indexed by ``form_id``.
+        criteria (list[str]): The names of the criterion columns.
+        max_params (int): The width of the ``params`` column.
+        n_points (int | None): The width of the ``y_pred`` column, if predictions are stored.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        """
+        Open an existing store.
+
+        Args:
+            path (str | os.PathLike): The directory of the store.
+        """
+        self.path = Path(path)
+        with open(self.path / _MANIFEST) as f:
+            manifest = json.load(f)
+        if manifest["version"] != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported result store version {manifest['version']}.")
+        self._manifest = manifest
+        self.forms = manifest["forms"]
+        self.criteria = manifest["criteria"]
+        self.max_params = manifest["max_params"]
+        self.n_points = manifest["n_points"]
+
+    @classmethod
+    def create(
+        cls,
+        path: str | os.PathLike,
+        forms: Sequence[str],
+        criteria: Sequence[str],
+        max_params: int,
+        n_points: int | None = None,
+        prediction_dtype: npt.DTypeLike = np.float32,
+    ) -> "ResultStore":
+        """
+        Create an empty store.
+
+        Args:
+            path (str | os.PathLike): The directory of the store; it must not contain a store.
+            forms (Sequence[str]): The names of the forms, e.g. ``list(tool.form_factory
+                .functional_forms)``. Forms first seen when appending are added to the end.
+            criteria (Sequence[str]): The names of the criteria to store.
+            max_params (int): The largest number of parameters of any form.
+            n_points (int, optional): The length of every series, to store predictions.
+            prediction_dtype (npt.DTypeLike): The type of the stored predictions.
+
+        Returns:
+            ResultStore: The opened store.
+        """
+        path = Path(path)
+        if (path / _MANIFEST).exists():
+            raise FileExistsError(f"A result store already exists at {path}.")
+        path.mkdir(parents=True, exist_ok=True)
+
+        columns = {
+            "series": ("<i8", 1),
+            "form_id": ("<i2", 1),
+            "params": ("<f8", max_params),
+            **{f"criteria.{name}": ("<f8", 1) for name in criteria},
+            "converged": ("|b1", 1),
+            "elapsed": ("<f8", 1),
+            "nfev": ("<i8", 1),
+        }
+        if n_points is not None:
+            columns["y_pred"] = (np.dtype(prediction_dtype).str, n_points)
+        for name in columns:
+            (path / f"{name}.bin").touch()
+
+        manifest = {
+            "version": _FORMAT_VERSION,
+            "forms": list(forms),
+            "criteria": list(criteria),
+            "max_params": max_params,
+            "n_points": n_points,
+            "rows": 0,
+            "n_series": 0,
+            "columns": {
+                name: {"dtype": dtype, "width": width} for name, (dtype, width) in columns.items()
+            },
+        }
+        _write_manifest(path, manifest)
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self._manifest["rows"]
+
+    @property
+    def n_series(self) -> int:
+        """
+        The number of series appended so far.
+        """
+        return self._manifest["n_series"]
+
+    def append_batch(
+        self,
+        batch: BatchSearchResult,
+        y_pred: Mapping[str, npt.NDArray[np.floating]] | None = None,
+    ) -> None:
+        """
+        Append the results of a batched search, one row per series and form.
+
+        Args:
+            batch (BatchSearchResult): The results of consecutive new series.
+            y_pred (Mapping[str, npt.NDArray[np.floating]], optional): The predictions of each
+                form, of shape ``(n_series, n_points)``, if the store holds predictions.
+        """
+        n_series = len(batch)
+        n_forms = len(batch.forms)
+        series = self.n_series + np.repeat(np.arange(n_series), n_forms)
+        params = np.full((n_series, n_forms, self.max_params), np.nan)
+        for j, form in enumerate(batch.forms):
+            params[:, j, : batch.params[form].shape[1]] = batch.params[form]
+
+        form_ids, forms = self._form_ids(batch.forms)
+        columns = {
+            "series": series,
+            "form_id": np.tile(form_ids, n_series),
+            "params": params.reshape(-1, self.max_params),
+            **{
+                f"criteria.{name}": batch.criteria.get(name, np.full((n_series, n_forms), np.nan))
+                for name in self.criteria
+            },
+            "converged": batch.success,
+            "elapsed": batch.elapsed,
+            "nfev": batch.nfev,
+        }
+        if self.n_points is not None:
+            if y_pred is None:
+                predictions = np.full((n_series, n_forms, self.n_points), np.nan)
+            else:
+                predictions = np.stack([y_pred[form] for form in batch.forms], axis=1)
+            columns["y_pred"] = predictions.reshape(-1, self.n_points)
+        self._append(columns, n_series, forms)
+
+    def append(self, results: Sequence[FitResult]) -> None:
+        """
+        Append the results of one new series, e.g. the output of `search_and_evaluate`.
+
+        Args:
+            results (Sequence[FitResult]): The fits of the series. Their predictions are stored
+                if the store holds predictions and the results reference their data.
+        """
+        params = np.full((len(results), self.max_params), np.nan)
+        for i, result in enumerate(results):
+            params[i, : len(result.params)] = result.params
+
+        form_ids, forms = self._form_ids([result.form for result in results])
+        columns = {
+            "series": np.full(len(results), self.n_series),
+            "form_id": form_ids,
+            "params": params,
+            **{
+                f"criteria.{name}": [result.criteria.get(name, np.nan) for result in results]
+                for name in self.criteria
+            },
+            "converged": [result.converged for result in results],
+            "elapsed": [result.elapsed for result in results],
+            "nfev": [result.nfev for result in results],
+        }
+        if self.n_points is not None:
+            columns["y_pred"] = [
+                result.y_pred if result.x is not None else np.full(self.n_points, np.nan)
+                for result in results
+            ]
+        self._append(columns, 1, forms)
+
+    def column(self, name: str) -> npt.NDArray:
+        """
+        Memory-map a column.
+
+        Args:
+            name (str): The column name: "series", "form_id", "params", "converged", "elapsed",
+                "nfev", "y_pred", or the name of a criterion.
+
+        Returns:
+            npt.NDArray: A read-only array of shape ``(rows,)``, or ``(rows, width)`` for
+                ``params`` and ``y_pred``.
+        """
+        if name in self.criteria:
+            name = f"criteria.{name}"
+        if name not in self._manifest["columns"]:
+            raise KeyError(name)
+        spec = self._manifest["columns"][name]
+        shape = (len(self),) if name not in ("params", "y_pred") else (len(self), spec["width"])
+        if len(self) == 0:
+            return np.empty(shape, dtype=spec["dtype"])
+        return np.memmap(self.path / f"{name}.bin", dtype=spec["dtype"], mode="r", shape=shape)
+
+    def select(
+        self,
+        forms: Sequence[str] | None = None,
+        where: Mapping[str, tuple[float | None, float | None]] | None = None,
+        converged: bool | None = None,
+        chunk_rows: int = 1 << 20,
+    ) -> npt.NDArray[np.intp]:
+        """
+        Find the rows matching a filter, scanning the columns in chunks.
+
+        Args:
+            forms (Sequence[str], optional): Keep only these forms.
+            where (Mapping[str, tuple], optional): Maps criterion names to inclusive
+                ``(low, high)`` bounds, either of which may be None. Rows with NaN values fail.
+            converged (bool, optional): Keep only converged (or only failed) fits.
+            chunk_rows (int): The number of rows read at a time.
+
+        Returns:
+            npt.NDArray[np.intp]: The indices of the matching rows.
+        """
+        form_ids = None
+        if forms is not None:
+            form_ids = [self.forms.index(form) for form in forms if form in self.forms]
+        filters = [(self.column(name), bounds) for name, bounds in (where or {}).items()]
+        form_column = self.column("form_id")
+        converged_column = self.column("converged")
+
+        matches = []
+        for start in range(0, len(self), chunk_rows):
+            stop = min(start + chunk_rows, len(self))
+            mask = np.ones(stop - start, dtype=bool)
+            if form_ids is not None:
+                mask &= np.isin(form_column[start:stop], form_ids)
+            if converged is not None:
+                mask &= converged_column[start:stop] == converged
+            for values, (low, high) in filters:
+                chunk = values[start:stop]
+                if low is not None:
+                    mask &= chunk >= low
+                if high is not None:
+                    mask &= chunk <= high
+            matches.append(start + np.flatnonzero(mask))
+        return np.concatenate(matches) if matches else np.empty(0, dtype=np.intp)
+
+    def results(
+        self,
+        rows: npt.ArrayLike,
+        functional_forms: Mapping[str, FunctionalFormStrategy] | None = None,
+    ) -> list[FitResult]:
+        """
+        Load rows as FitResult objects.
+
+        Args:
+            rows (npt.ArrayLike): The row indices, e.g. from `select`.
+            functional_forms (Mapping[str, FunctionalFormStrategy], optional): The forms by name,
+                e.g. ``tool.form_factory.functional_forms``, to trim the padded parameters and
+                allow `FitResult.predict`.
+
+        Returns:
+            list[FitResult]: The results, in the order of ``rows``.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        form_ids = self.column("form_id")[rows]
+        params = self.column("params")[rows]
+        criteria = {name: self.column(name)[rows] for name in self.criteria}
+        converged = self.column("converged")[rows]
+        elapsed = self.column("elapsed")[rows]
+        nfev = self.column("nfev")[rows]
+
+        results = []
+        for i, form_id in enumerate(form_ids):
+            form = self.forms[form_id]
+            functional_form = None if functional_forms is None else functional_forms.get(form)
+            n_params = self.max_params if functional_form is None else functional_form.num_params
+            results.append(
+                FitResult(
+                    form=form,
+                    params=params[i, :n_params],
+                    criteria={name: values[i] for name, values in criteria.items()},
+                    functional_form=functional_form,
+                    elapsed=float(elapsed[i]),
+                    nfev=int(nfev[i]),
+                    converged=bool(converged[i]),
+                )
+            )
+        return results
+
+    def predict(
+        self,
+        rows: npt.ArrayLike,
+        x: npt.ArrayLike,
+        functional_forms: Mapping[str, FunctionalFormStrategy],
+        out: npt.NDArray[np.floating] | None = None,
+        dtype: npt.DTypeLike | None = None,
+        chunk_size: int = 1024,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Evaluate the stored fits of some rows on new points, with `predict_batch`.
+
+        Args:
+            rows (npt.ArrayLike): The row indices, e.g. from `select`.
+            x (npt.ArrayLike): The points to evaluate at, of shape (n_points,) or
+                (len(rows), n_points).
+            functional_forms (Mapping[str, FunctionalFormStrategy]): The forms by name, e.g.
+                ``tool.form_factory.functional_forms``.
+            out (npt.NDArray[np.floating], optional): The array of shape (len(rows), n_points)
+                to write the predictions to.
+            dtype (npt.DTypeLike, optional): The type to evaluate in, e.g. ``np.float32``.
+            chunk_size (int): The maximum number of rows evaluated at a time.
+
+        Returns:
+            npt.NDArray[np.floating]: The predictions, of shape (len(rows), n_points).
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        return predict_batch(
+            x,
+            self.column("form_id")[rows],
+            self.column("params")[rows],
+            self.forms,
+            functional_forms,
+            out,
+            dtype,
+            chunk_size,
+        )
+
+    def _form_ids(self, forms: Sequence[str]) -> tuple[list[int], list[str]]:
+        """
+        The ids of some forms, and the forms of the store once the new ones are registered.
+        """
+        known = list(self.forms)
+        for form in forms:
+            if form not in known:
+                known.append(form)
+        return [known.index(form) for form in forms], known
+
+    def _append(self, columns: dict[str, npt.ArrayLike], n_series: int, forms: list[str]) -> None:
+        rows = len(self)
+        arrays = {}
+        for name, values in columns.items():
+            spec = self._manifest["columns"][name]
+            values = np.ascontiguousarray(values, dtype=spec["dtype"])
+            shape = (-1,) if name not in ("params", "y_pred") else (-1, spec["width"])
+            arrays[name] = values.reshape(shape)
+        new_rows = len(arrays["series"])
+        for name, values in arrays.items():
+            if len(values) != new_rows:
+                raise ValueError(f"Column {name} has {len(values)} rows, expected {new_rows}.")
+
+        for name, values in arrays.items():
+            width = self._manifest["columns"][name]["width"]
+            with open(self.path / f"{name}.bin", "r+b") as f:
+                # Drop rows of an interrupted append that never made it into the manifest.
+                f.truncate(rows * width * values.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(values.tobytes())
+
+        self._manifest["rows"] = rows + new_rows
+        self._manifest["n_series"] += n_series
+        # New forms are only registered once their rows are written.
+        self.forms = self._manifest["forms"] = forms
+        _write_manifest(self.path, self._manifest)
+
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    tmp = path / f"{_MANIFEST}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path / _MANIFEST)
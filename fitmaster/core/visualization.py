@@ -0,0 +1,241 @@
+import os
+from collections.abc import Sequence
+
+import matplotlib.pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+import numpy.typing as npt
+import scipy.stats as stats
+
+from fitmaster.core.results import FitResult
+
+
+class CurveFittingVisualizer:
+    @staticmethod
+    def plot_fits(
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        results: list[FitResult],
+        save_path: str = "./image/",
+        save_fig: bool = True,
+    ) -> tuple[Figure, Axes]:
+        """
+        Plot the fits to the data.
+
+        Parameters:
+        x (npt.NDArray): The x data.
+        y (npt.NDArray): The y data.
+        results (list[FitResult]): The results of the fits.
+        save_path (str): The path to save the figure.
+        save_fig (bool): Whether to save the figure.
+
+        Returns:
+        tuple[Figure, Axes]: The figure and axes of the plot.
+        """
+        fig, ax = plt.subplots()
+        ax.scatter(x, y, label="Data")
+        for result in results:
+            ax.plot(
+                x,
+                result["y_pred"],
+                label=f"{result['form']} (R^2={result['r_squared']:.3f})",
+            )
+        ax.legend()
+        if save_fig:
+            fig.savefig(f"{save_path}/fit_results.png")
+        return fig, ax
+
+    @staticmethod
+    def plot_residuals(
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        results: list[FitResult],
+        save_path: str = "./image/",
+        save_fig: bool = True,
+    ) -> list[tuple[Figure, Axes]]:
+        """
+        Plot the residuals of the fits.
+
+        Parameters:
+        x (npt.NDArray): The x data.
+        y (npt.NDArray): The y data.
+        results (list[FitResult]): The results of the fits.
+        save_path (str): The path to save the figures.
+        save_fig (bool): Whether to save the figure.
+
+        Returns:
+        list[tuple[Figure, Axes]]: A list of figures and axes of the plots.
+        """
+        figs_axes = []
+        for result in results:
+            residuals = y - result["y_pred"]
+
+            fig, ax = plt.subplots()
+            _draw_residuals(ax, x, residuals, result["form"])
+            if save_fig:
+                fig.savefig(f"{save_path}/residuals_{result['form']}.png")
+            figs_axes.append((fig, ax))
+
+            fig_qq, ax_qq = plt.subplots()
+            _draw_qq(ax_qq, residuals, result["form"])
+            if save_fig:
+                fig_qq.savefig(f"{save_path}/qqplot_{result['form']}.png")
+            figs_axes.append((fig_qq, ax_qq))
+
+        return figs_axes
+
+    @staticmethod
+    def render_batch(
+        series: Sequence[tuple[npt.NDArray, npt.NDArray, list[FitResult]]],
+        save_path: str = "./image/",
+        names: Sequence[str] | None = None,
+        kinds: tuple[str, ...] = ("fits", "residuals", "qqplot"),
+        max_points: int | None = None,
+        figsize: tuple[float, float] = (6.4, 4.8),
+        dpi: int = 100,
+        fmt: str = "png",
+        n_jobs: int | None = None,
+        chunk_size: int = 64,
+    ) -> list[str]:
+        """
+        Render the plots of many series to files, without a display.
+
+        Figures are drawn on the non-interactive Agg canvas without pyplot, and each worker reuses
+        a single figure for all of its plots, so nothing accumulates however many series are
+        rendered. Scatter plots are decimated to the pixel budget of the figure: the points with
+        the smallest and largest value in each pixel column are kept, which preserves the look of
+        the plot. Chunks of ``chunk_size`` series are rendered by a joblib process pool.
+
+        Parameters:
+        series (Sequence[tuple]): The ``(x, y, results)`` of every series. Results must reference
+            their functional form, as those of `search_and_evaluate` do.
+        save_path (str): The directory to write the files to.
+        names (Sequence[str], optional): A file name prefix per series; defaults to its index.
+        kinds (tuple[str, ...]): The plots to render, among "fits", "residuals" and "qqplot".
+        max_points (int, optional): The maximum number of points per scatter plot; defaults to
+            two per pixel column.
+        figsize (tuple[float, float]): The figure size in inches.
+        dpi (int): The resolution of the files.
+        fmt (str): The file format, e.g. "png" or "svg".
+        n_jobs (int, optional): The number of workers, following joblib semantics.
+        chunk_size (int): The number of series rendered by each task.
+
+        Returns:
+        list[str]: The paths of the written files, in series order.
+        """
+        from joblib import Parallel, delayed
+
+        unknown = set(kinds) - {"fits", "residuals", "qqplot"}
+        if unknown:
+            raise ValueError(f"Unknown plot kinds {sorted(unknown)}.")
+        if names is None:
+            names = [str(i) for i in range(len(series))]
+        if len(names) != len(series):
+            raise ValueError("names must have one entry per series.")
+        if max_points is None:
+            max_points = 2 * int(figsize[0] * dpi)
+
+        os.makedirs(save_path, exist_ok=True)
+        options = (save_path, kinds, max_points, figsize, dpi, fmt)
+        chunks = Parallel(n_jobs=n_jobs)(
+            delayed(_render_chunk)(
+                series[i : i + chunk_size], names[i : i + chunk_size], *options
+            )
+            for i in range(0, len(series), chunk_size)
+        )
+        return [path for chunk in chunks for path in chunk]
+
+
+def _render_chunk(series, names, save_path, kinds, max_points, figsize, dpi, fmt) -> list[str]:
+    """
+    Render the plots of consecutive series on one reused Agg figure.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    paths = []
+
+    def save(name: str) -> None:
+        path = os.path.join(save_path, f"{name}.{fmt}")
+        fig.savefig(path)
+        fig.clear()
+        paths.append(path)
+
+    for (x, y, results), name in zip(series, names):
+        x = np.asarray(x)
+        y = np.asarray(y)
+        if "fits" in kinds:
+            ax = fig.add_subplot()
+            keep = _decimate(x, y, max_points)
+            ax.scatter(x[keep], y[keep], s=4, label="Data")
+            grid = np.linspace(x.min(), x.max(), max_points // 2)
+            for result in results:
+                ax.plot(
+                    grid,
+                    result.predict(grid),
+                    label=f"{result['form']} (R^2={result['r_squared']:.3f})",
+                )
+            ax.legend()
+            save(f"{name}_fit_results")
+
+        for result in results:
+            if "residuals" not in kinds and "qqplot" not in kinds:
+                break
+            residuals = y - result.predict(x)
+            if "residuals" in kinds:
+                keep = _decimate(x, residuals, max_points)
+                _draw_residuals(fig.add_subplot(), x[keep], residuals[keep], result["form"], s=4)
+                save(f"{name}_residuals_{result['form']}")
+            if "qqplot" in kinds:
+                _draw_qq(fig.add_subplot(), residuals, result["form"], max_points)
+                save(f"{name}_qqplot_{result['form']}")
+    return paths
+
+
+def _draw_residuals(ax: Axes, x, residuals, form: str, **scatter_kwargs) -> None:
+    ax.scatter(x, residuals, **scatter_kwargs)
+    ax.hlines(0, min(x), max(x), colors="r", linestyles="dashed")
+    ax.set_title(f"Residuals for {form}")
+
+
+def _draw_qq(ax: Axes, residuals, form: str, max_points: int | None = None) -> None:
+    if max_points is None or len(residuals) <= max_points:
+        stats.probplot(residuals, dist="norm", plot=ax)
+    else:
+        # Draw evenly spaced order statistics, always including both tails, and the full fit line.
+        (osm, osr), (slope, intercept, _) = stats.probplot(residuals, dist="norm")
+        keep = np.linspace(0, len(osm) - 1, max_points).astype(int)
+        ax.plot(osm[keep], osr[keep], "bo")
+        ends = osm[[0, -1]]
+        ax.plot(ends, slope * ends + intercept, "r-")
+        ax.set_xlabel("Theoretical quantiles")
+        ax.set_ylabel("Ordered Values")
+    ax.set_title(f"QQ Plot for {form}")
+
+
+def _decimate(
+    x: npt.NDArray[np.floating | np.integer],
+    y: npt.NDArray[np.floating | np.integer],
+    max_points: int,
+) -> npt.NDArray[np.intp]:
+    """
+    Select the points with the smallest and largest ``y`` in each of ``max_points // 2`` equal
+    columns of ``x``.
+
+    Returns:
+        npt.NDArray[np.intp]: The indices of the kept points, or of all points if there are no
+            more than ``max_points``.
+    """
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    n_bins = max(max_points // 2, 1)
+    span = x.max() - x.min()
+    column = np.zeros(len(x), dtype=np.intp)
+    if span > 0:
+        column = np.minimum(((x - x.min()) / span * n_bins).astype(np.intp), n_bins - 1)
+
+    order = np.lexsort((y, column))
+    starts = np.flatnonzero(np.diff(column[order], prepend=-1))
+    ends = np.append(starts[1:], len(order)) - 1
+    return np.unique(order[np.concatenate([starts, ends])])
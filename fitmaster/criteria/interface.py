@@ -1,25 +1,30 @@
-from abc import ABC, abstractmethod
+from abc import ABC
 import numpy.typing as npt
 import numpy as np
 from typing import Any
 
+from .statistics import FitStatistics
+
 
 class ModelSelectionCriterionStrategy(ABC):
     """
     Interface for model selection criterion strategies.
 
     This interface defines the methods that should be implemented by any model selection criterion strategy.
-    Subclasses should implement the `evaluate` method to evaluate the model selection criterion.
+    Subclasses should implement the `evaluate_statistics` method, which computes the criterion from
+    precomputed fit statistics; `evaluate` derives those statistics from a set of predictions.
+    Subclasses implementing only `evaluate` still work wherever the predictions are at hand, but
+    not in batched or streaming searches, which only keep the statistics.
 
     Attributes:
         None
 
     Methods:
         evaluate: Evaluates the model selection criterion for a given set of predictions.
+        evaluate_statistics: Evaluates the model selection criterion from precomputed fit statistics.
 
     """
 
-    @abstractmethod
     def evaluate(
         self,
         y: npt.NDArray[np.floating | np.integer],
@@ -38,4 +43,33 @@ class ModelSelectionCriterionStrategy(ABC):
             np.floating[Any]: The value of the model selection criterion.
 
         """
-        pass
+        return self.evaluate_statistics(
+            FitStatistics.from_predictions(y, y_pred), num_params
+        )
+
+    def evaluate_statistics(
+        self,
+        stats: FitStatistics,
+        num_params: npt.ArrayLike,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Evaluates the model selection criterion from precomputed fit statistics.
+
+        The statistics and the number of parameters broadcast against each other, so many models
+        and many series can be evaluated in a single call.
+
+        Args:
+            stats (FitStatistics): The sufficient statistics of the fits.
+            num_params (npt.ArrayLike): The number of parameters of each model.
+
+        Returns:
+            npt.NDArray[np.floating]: The value of the model selection criterion for each fit.
+
+        Raises:
+            NotImplementedError: If the subclass only implements `evaluate`.
+
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} only implements evaluate, so it can only be evaluated from "
+            "predictions; implement evaluate_statistics to use it in batched and streaming fits."
+        )
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+
+@dataclass(frozen=True, slots=True)
+class FitStatistics:
+    """
+    Sufficient statistics of one or many fits, from which model selection criteria are computed.
+
+    Every attribute may be a scalar or an array; arrays broadcast against each other, so a single
+    instance can describe many models fitted to many series.
+
+    Attributes:
+        sse (npt.ArrayLike): The sum of squared residuals.
+        n (npt.ArrayLike): The number of observations.
+        sst (npt.ArrayLike): The total sum of squares of the observations about their mean. It
+            depends only on the observations, so it is shared by every model fitted to a series.
+    """
+
+    sse: npt.ArrayLike
+    n: npt.ArrayLike
+    sst: npt.ArrayLike
+
+    @staticmethod
+    def total_sum_of_squares(
+        y: npt.NDArray[np.floating | np.integer],
+    ) -> npt.NDArray[np.floating]:
+        """
+        Compute the total sum of squares of each series.
+
+        Args:
+            y (npt.NDArray[np.floating | np.integer]): The observations, of shape (..., n_points).
+
+        Returns:
+            npt.NDArray[np.floating]: The total sum of squares, of shape (...).
+        """
+        return np.sum((y - np.mean(y, axis=-1, keepdims=True)) ** 2, axis=-1)
+
+    @classmethod
+    def from_predictions(
+        cls,
+        y: npt.NDArray[np.floating | np.integer],
+        y_pred: npt.NDArray[np.floating | np.integer],
+        sst: npt.ArrayLike | None = None,
+    ) -> "FitStatistics":
+        """
+        Compute the statistics of fitted values.
+
+        Args:
+            y (npt.NDArray[np.floating | np.integer]): The observations, of shape (..., n_points).
+            y_pred (npt.NDArray[np.floating | np.integer]): The fitted values, broadcastable
+                against ``y``.
+            sst (npt.ArrayLike, optional): A precomputed total sum of squares of ``y``.
+
+        Returns:
+            FitStatistics: The statistics of the fit.
+        """
+        y = np.asarray(y)
+        if sst is None:
+            sst = cls.total_sum_of_squares(y)
+        return cls(
+            sse=np.sum((y - y_pred) ** 2, axis=-1),
+            n=y.shape[-1],
+            sst=sst,
+        )
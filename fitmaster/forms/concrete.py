@@ -1,23 +1,82 @@
+import itertools
+
 import numpy as np
 from .interface import FunctionalFormStrategy
 
 import numpy.typing as npt
 
 
+def _endpoint_line(
+    u: npt.NDArray[np.floating | np.integer],
+    y: npt.NDArray[np.floating | np.integer],
+) -> npt.NDArray[np.floating]:
+    """
+    Estimate the intercept and slope of the line through the points with the smallest and
+    largest ``u`` of each series.
+
+    Args:
+        u (npt.NDArray[np.floating | np.integer]): The regressor, of shape (n_points,) or
+            (n_series, n_points).
+        y (npt.NDArray[np.floating | np.integer]): The output array, of shape (n_points,) or
+            (n_series, n_points).
+
+    Returns:
+        npt.NDArray[np.floating]: The intercept and slope of each series, with shape (2,) or
+            (n_series, 2).
+
+    """
+    u, y = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(y, dtype=float))
+    lo = np.take_along_axis(u, np.argmin(u, axis=-1)[..., None], axis=-1)
+    hi = np.take_along_axis(u, np.argmax(u, axis=-1)[..., None], axis=-1)
+    y_lo = np.take_along_axis(y, np.argmin(u, axis=-1)[..., None], axis=-1)
+    y_hi = np.take_along_axis(y, np.argmax(u, axis=-1)[..., None], axis=-1)
+
+    span = hi - lo
+    slope = np.divide(y_hi - y_lo, span, out=np.zeros_like(span), where=span != 0)
+    return np.concatenate([y_lo - slope * lo, slope], axis=-1)
+
+
+def _log_linear_fit(
+    x: npt.NDArray[np.floating],
+    z: npt.NDArray[np.floating],
+) -> tuple[npt.NDArray[np.floating], npt.NDArray[np.floating]]:
+    """
+    Regress ``z`` on ``x`` by ordinary least squares, independently for every series.
+
+    Args:
+        x (npt.NDArray[np.floating]): The regressor, broadcastable against ``z``.
+        z (npt.NDArray[np.floating]): The response, of shape (..., n_points).
+
+    Returns:
+        tuple[npt.NDArray[np.floating], npt.NDArray[np.floating]]: The intercept and slope,
+            each of shape (...).
+
+    """
+    x, z = np.broadcast_arrays(x, z)
+    x_mean = x.mean(axis=-1, keepdims=True)
+    z_mean = z.mean(axis=-1, keepdims=True)
+    sxx = ((x - x_mean) ** 2).sum(axis=-1)
+    sxz = ((x - x_mean) * (z - z_mean)).sum(axis=-1)
+    slope = np.divide(sxz, sxx, out=np.zeros_like(sxx), where=sxx != 0)
+    return z_mean[..., 0] - slope * x_mean[..., 0], slope
+
+
 class LinearForm(FunctionalFormStrategy):
     """
     Represents a linear functional form.
 
     Args:
         x (npt.NDArray[np.floating | np.integer]): The input array.
-        a (float): The coefficient of the linear term.
-        b (float): The coefficient of the constant term.
+        a (float): The constant term.
+        b (float): The coefficient of the linear term.
 
     Returns:
         npt.NDArray[np.floating | np.integer]: The output array.
 
     """
 
+    linear_params = (0, 1)
+
     def func(
         self,
         x: npt.NDArray[np.floating | np.integer],
@@ -32,17 +91,56 @@ class LinearForm(FunctionalFormStrategy):
         y: npt.NDArray[np.floating | np.integer],
     ):
         """
-        Provides an initial guess for the linear form parameters.
+        Provides an initial guess for the linear form parameters from the line through the
+        endpoints of the data.
 
         Args:
             x (npt.NDArray[np.floating | np.integer]): The input array.
             y (npt.NDArray[np.floating | np.integer]): The output array.
 
         Returns:
-            List[Any]: The initial guess for the parameters.
+            npt.NDArray[np.floating]: The initial guess for the parameters, of shape (2,) or
+                (n_series, 2).
+
+        """
+        return _endpoint_line(x, y)
+
+    def basis(
+        self, x: npt.NDArray[np.floating | np.integer]
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the basis matrix of the linear form, with columns for ``a`` and ``b``.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+
+        Returns:
+            npt.NDArray[np.floating]: The basis matrix of shape (n_points, 2).
+
+        """
+        x = np.asarray(x, dtype=float)
+        return np.column_stack([np.ones_like(x), x])
+
+    def jacobian(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        a: float,
+        b: float,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the derivatives of the linear form with respect to ``a`` and ``b``.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            a (float): The constant term.
+            b (float): The coefficient of the linear term.
+
+        Returns:
+            npt.NDArray[np.floating]: The Jacobian matrix of shape (n_points, 2).
 
         """
-        return [1, 1]
+        x = np.asarray(x, dtype=float)
+        return np.column_stack([np.ones_like(x), x])
 
 
 class ExponentialForm(FunctionalFormStrategy):
@@ -60,6 +158,8 @@ class ExponentialForm(FunctionalFormStrategy):
 
     """
 
+    linear_params = (0, 2)
+
     def func(
         self,
         x: npt.NDArray[np.floating | np.integer],
@@ -77,15 +177,81 @@ class ExponentialForm(FunctionalFormStrategy):
         """
         Provides an initial guess for the exponential form parameters.
 
+        The data are shifted just below their minimum (for a positive ``a``) and just above
+        their maximum (for a negative ``a``), a log-linear regression on each shifted copy gives
+        ``a`` and ``b``, and the candidate with the smaller sum of squared errors is kept.
+
         Args:
             x (npt.NDArray[np.floating | np.integer]): The input array.
             y (npt.NDArray[np.floating | np.integer]): The output array.
 
         Returns:
-            List[Any]: The initial guess for the parameters.
+            npt.NDArray[np.floating]: The initial guess for the parameters, of shape (3,) or
+                (n_series, 3).
+
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        y_min = y.min(axis=-1, keepdims=True)
+        y_max = y.max(axis=-1, keepdims=True)
+        margin = 0.1 * (y_max - y_min) + np.finfo(float).eps * (1 + np.abs(y_max))
+
+        candidates = []
+        for sign, c in ((1.0, y_min - margin), (-1.0, y_max + margin)):
+            log_a, b = _log_linear_fit(x, np.log(sign * (y - c)))
+            candidates.append(np.stack([sign * np.exp(log_a), b, c[..., 0]], axis=-1))
+        candidates = np.stack(candidates)
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            y_pred = self.func(
+                x, *(candidates[..., i, None] for i in range(3))
+            )
+            sse = np.nan_to_num(((y - y_pred) ** 2).sum(axis=-1), nan=np.inf)
+        return np.where(
+            (sse[0] <= sse[1])[..., None], candidates[0], candidates[1]
+        )
+
+    def basis(
+        self, x: npt.NDArray[np.floating | np.integer], b: float
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the basis matrix of the exponential form for a fixed exponent ``b``, with
+        columns for ``a`` and ``c``.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            b (float): The exponent of the exponential term.
+
+        Returns:
+            npt.NDArray[np.floating]: The basis matrix of shape (n_points, 2).
 
         """
-        return [1, 1, 1]
+        x = np.asarray(x, dtype=float)
+        return np.column_stack([np.exp(b * x), np.ones_like(x)])
+
+    def jacobian(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        a: float,
+        b: float,
+        c: float,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the derivatives of the exponential form with respect to ``a``, ``b`` and ``c``.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            a (float): The coefficient of the exponential term.
+            b (float): The exponent of the exponential term.
+            c (float): The constant term.
+
+        Returns:
+            npt.NDArray[np.floating]: The Jacobian matrix of shape (n_points, 3).
+
+        """
+        x = np.asarray(x, dtype=float)
+        exp_bx = np.exp(b * x)
+        return np.column_stack([exp_bx, a * x * exp_bx, np.ones_like(x)])
 
 
 class LogarithmicForm(FunctionalFormStrategy):
@@ -94,14 +260,16 @@ class LogarithmicForm(FunctionalFormStrategy):
 
     Args:
         x (npt.NDArray[np.floating | np.integer]): The input array.
-        a (float): The coefficient of the logarithmic term.
-        b (float): The constant term.
+        a (float): The constant term.
+        b (float): The coefficient of the logarithmic term.
 
     Returns:
         npt.NDArray[np.floating | np.integer]: The output array.
 
     """
 
+    linear_params = (0, 1)
+
     def func(
         self,
         x: npt.NDArray[np.floating | np.integer],
@@ -116,14 +284,321 @@ class LogarithmicForm(FunctionalFormStrategy):
         y: npt.NDArray[np.floating | np.integer],
     ):
         """
-        Provides an initial guess for the logarithmic form parameters.
+        Provides an initial guess for the logarithmic form parameters from the line through the
+        endpoints of the data on a logarithmic x axis.
 
         Args:
             x (npt.NDArray[np.floating | np.integer]): The input array.
             y (npt.NDArray[np.floating | np.integer]): The output array.
 
         Returns:
-            List[Any]: The initial guess for the parameters.
+            npt.NDArray[np.floating]: The initial guess for the parameters, of shape (2,) or
+                (n_series, 2).
 
         """
-        return [1, 1]
+        return _endpoint_line(np.log(x), y)
+
+    def basis(
+        self, x: npt.NDArray[np.floating | np.integer]
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the basis matrix of the logarithmic form, with columns for ``a`` and ``b``.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+
+        Returns:
+            npt.NDArray[np.floating]: The basis matrix of shape (n_points, 2).
+
+        """
+        x = np.asarray(x, dtype=float)
+        return np.column_stack([np.ones_like(x), np.log(x)])
+
+    def jacobian(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        a: float,
+        b: float,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the derivatives of the logarithmic form with respect to ``a`` and ``b``.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            a (float): The constant term.
+            b (float): The coefficient of the logarithmic term.
+
+        Returns:
+            npt.NDArray[np.floating]: The Jacobian matrix of shape (n_points, 2).
+
+        """
+        x = np.asarray(x, dtype=float)
+        return np.column_stack([np.ones_like(x), np.log(x)])
+
+
+class SegmentedForm(FunctionalFormStrategy):
+    """
+    Represents a piecewise form with a separate line in ``x`` (or ``log x``) on each segment.
+
+    The parameters are the ``n_segments - 1`` increasing breakpoints followed by the intercept
+    and slope of every segment, so AIC and BIC charge for the breakpoints as well. A point at a
+    breakpoint belongs to the segment on its right.
+
+    The form is fitted by `fit`, which searches the breakpoints over cumulative sums of the
+    sorted data: the sum of squared residuals of a line on any range of points is then O(1),
+    all single breakpoints are tested in one O(n) pass, and several breakpoints are placed by
+    dynamic programming over ``max_candidates`` candidates and refined by exact O(n) scans.
+
+    Args:
+        n_segments (int): The number of segments.
+        transform (str): "linear" for lines in ``x``, or "logarithmic" for lines in ``log x``.
+        min_segment_size (int): The minimum number of points of a segment.
+        max_candidates (int): The number of candidate breakpoints of the dynamic program.
+
+    """
+
+    def __init__(
+        self,
+        n_segments: int = 2,
+        transform: str = "linear",
+        min_segment_size: int = 2,
+        max_candidates: int = 256,
+    ):
+        if n_segments < 1:
+            raise ValueError("n_segments must be a positive integer.")
+        if transform not in ("linear", "logarithmic"):
+            raise ValueError(f"Unknown transform '{transform}'.")
+        if min_segment_size < 1:
+            raise ValueError("min_segment_size must be a positive integer.")
+        self.n_segments = n_segments
+        self.transform = transform
+        self.min_segment_size = min_segment_size
+        self.max_candidates = max_candidates
+
+    @property
+    def num_params(self) -> int:
+        return 3 * self.n_segments - 1
+
+    @property
+    def linear_params(self) -> tuple[int, ...]:
+        return tuple(range(self.n_segments - 1, self.num_params))
+
+    def _u(self, x: npt.NDArray[np.floating | np.integer]) -> npt.NDArray[np.floating]:
+        x = np.asarray(x)
+        x = x if np.issubdtype(x.dtype, np.floating) else x.astype(float)
+        return np.log(x) if self.transform == "logarithmic" else x
+
+    def func(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        *params: float,
+    ) -> npt.NDArray[np.floating | np.integer]:
+        k = self.n_segments
+        # Later segments overwrite earlier ones right of their breakpoint, which keeps the
+        # parameters broadcastable like those of the other forms.
+        intercept, slope = params[k - 1], params[k]
+        for i in range(1, k):
+            right = x >= params[i - 1]
+            intercept = np.where(right, params[k - 1 + 2 * i], intercept)
+            slope = np.where(right, params[k + 2 * i], slope)
+        return intercept + slope * self._u(x)
+
+    def initial_guess(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+    ):
+        """
+        Provides an initial guess with breakpoints at equal-count quantiles of ``x`` and a flat
+        line at the mean of ``y`` on every segment.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            y (npt.NDArray[np.floating | np.integer]): The output array.
+
+        Returns:
+            npt.NDArray[np.floating]: The initial guess for the parameters, of shape
+                (num_params,) or (n_series, num_params).
+
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        levels = np.linspace(0, 1, self.n_segments + 1)[1:-1]
+        breakpoints = np.moveaxis(np.quantile(x, levels, axis=-1), 0, -1)
+        segment = (x[..., None] >= breakpoints[..., None, :]).sum(axis=-1)
+
+        coef = []
+        for i in range(self.n_segments):
+            mask = segment == i
+            mean = np.where(mask, y, 0).sum(axis=-1) / np.maximum(mask.sum(axis=-1), 1)
+            coef += [mean, np.zeros_like(mean)]
+        return np.concatenate([breakpoints, np.stack(coef, axis=-1)], axis=-1)
+
+    def basis(
+        self, x: npt.NDArray[np.floating | np.integer], *breakpoints: float
+    ) -> npt.NDArray[np.floating]:
+        """
+        Provides the basis matrix for fixed breakpoints, with an intercept and a slope column
+        for every segment.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            breakpoints (float): The increasing breakpoints.
+
+        Returns:
+            npt.NDArray[np.floating]: The basis matrix of shape (n_points, 2 * n_segments).
+
+        """
+        u = self._u(x)
+        segment = np.searchsorted(breakpoints, x, side="right")
+        columns = []
+        for i in range(self.n_segments):
+            mask = (segment == i).astype(float)
+            columns += [mask, mask * u]
+        return np.column_stack(columns)
+
+    def fit(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        sigma: npt.NDArray[np.floating] | None = None,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Fits the breakpoints and the lines of every segment by least squares.
+
+        Args:
+            x (npt.NDArray[np.floating | np.integer]): The input array.
+            y (npt.NDArray[np.floating | np.integer]): The output array.
+            sigma (npt.NDArray[np.floating], optional): The uncertainty of each point.
+
+        Returns:
+            npt.NDArray[np.floating]: The breakpoints followed by the intercept and slope of
+                every segment.
+
+        Raises:
+            ValueError: If the data are not finite or too short for the segments.
+
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        weights = np.ones_like(y) if sigma is None else np.asarray(sigma, dtype=float) ** -2.0
+        if x.ndim != 1 or x.shape != y.shape or weights.shape != y.shape:
+            raise ValueError("Segmented fits need 1-D x, y and sigma of the same length.")
+        order = np.argsort(x, kind="stable")
+        x, y, weights = x[order], y[order], weights[order]
+        u = self._u(x)
+        if not (np.isfinite(u).all() and np.isfinite(y).all() and np.isfinite(weights).all()):
+            raise ValueError("Data for a segmented fit must be finite.")
+
+        n = len(x)
+        size = self.min_segment_size
+        # A breakpoint may fall before point i only if it separates distinct x values.
+        splittable = np.zeros(n + 1, dtype=bool)
+        splittable[1:n] = x[1:] > x[:-1]
+        sums = _SegmentSums(u, y, weights)
+
+        splits = self._place_breakpoints(sums, splittable, n, size)
+        if splits is None:
+            raise ValueError(
+                f"Not enough distinct points for {self.n_segments} segments of at least "
+                f"{size} points."
+            )
+
+        # Coordinate descent: move every breakpoint to its exact best position between its
+        # neighbours, until none moves.
+        for _ in range(self.n_segments):
+            moved = False
+            for t in range(len(splits)):
+                lo = splits[t - 1] if t > 0 else 0
+                hi = splits[t + 1] if t + 1 < len(splits) else n
+                best = sums.best_split(lo, hi, splittable, size)
+                if best is not None and best != splits[t]:
+                    splits[t], moved = best, True
+            if not moved:
+                break
+
+        bounds = [0, *splits, n]
+        coef = []
+        for lo, hi in itertools.pairwise(bounds):
+            root = np.sqrt(weights[lo:hi])
+            design = np.column_stack([np.ones(hi - lo), u[lo:hi]]) * root[:, None]
+            coef.append(np.linalg.lstsq(design, y[lo:hi] * root, rcond=None)[0])
+        breakpoints = [(x[i - 1] + x[i]) / 2 for i in splits]
+        return np.concatenate([breakpoints, np.ravel(coef)])
+
+    def _place_breakpoints(self, sums, splittable, n, size) -> list[int] | None:
+        """
+        Place the breakpoints, as point indices, by dynamic programming over candidates.
+        """
+        k = self.n_segments
+        if k == 1:
+            return [] if n >= size else None
+        candidates = np.flatnonzero(splittable)
+        candidates = candidates[(candidates >= size) & (candidates <= n - size)]
+        if len(candidates) < k - 1:
+            return None
+        if k == 2:
+            return [sums.best_split(0, n, splittable, size)]
+
+        if len(candidates) > self.max_candidates:
+            keep = np.linspace(0, len(candidates) - 1, self.max_candidates).round().astype(int)
+            candidates = candidates[np.unique(keep)]
+        nodes = np.concatenate([[0], candidates, [n]])
+        start, end = np.meshgrid(nodes, nodes, indexing="ij")
+        cost = np.where(end - start >= size, sums.sse(start, np.maximum(end, start)), np.inf)
+
+        # best[s][j]: the cost of covering the points before node j with s + 1 segments.
+        best = cost[0].copy()
+        previous = []
+        for _ in range(k - 1):
+            total = best[:, None] + cost
+            previous.append(np.argmin(total, axis=0))
+            best = total[previous[-1], np.arange(len(nodes))]
+        if not np.isfinite(best[-1]):
+            return None
+
+        splits, j = [], len(nodes) - 1
+        for back in reversed(previous):
+            j = back[j]
+            splits.append(int(nodes[j]))
+        return splits[::-1]
+
+
+class _SegmentSums:
+    """
+    Cumulative weighted sums of sorted data, giving the least-squares line of any range of
+    points in O(1).
+    """
+
+    def __init__(self, u, y, weights):
+        # Centring keeps the differences of cumulative sums accurate for long series.
+        u = u - np.average(u, weights=weights)
+        y = y - np.average(y, weights=weights)
+        terms = np.stack([weights, weights * u, weights * u * u, weights * y, weights * u * y])
+        self.cumulative = np.zeros((6, len(u) + 1))
+        self.cumulative[:5, 1:] = np.cumsum(terms, axis=1)
+        self.cumulative[5, 1:] = np.cumsum(weights * y * y)
+
+    def sse(self, lo, hi):
+        """
+        The sum of squared residuals of the line fitted to the points ``lo:hi``.
+        """
+        lo, hi = np.broadcast_arrays(lo, hi)
+        w, su, suu, sy, suy, syy = self.cumulative[:, hi] - self.cumulative[:, lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var_u = suu - su**2 / w
+            cov = suy - su * sy / w
+            explained = np.where(var_u > 1e-12 * np.abs(suu), cov**2 / var_u, 0.0)
+            sse = syy - sy**2 / w - explained
+        return np.where(w > 0, np.maximum(sse, 0.0), 0.0)
+
+    def best_split(self, lo, hi, splittable, size) -> int | None:
+        """
+        The breakpoint between ``lo`` and ``hi`` minimizing the total error of both sides, or
+        None if no breakpoint leaves ``size`` points on each side.
+        """
+        candidates = np.arange(lo + size, hi - size + 1)
+        candidates = candidates[splittable[candidates]]
+        if not len(candidates):
+            return None
+        cost = self.sse(lo, candidates) + self.sse(candidates, hi)
+        return int(candidates[np.argmin(cost)])
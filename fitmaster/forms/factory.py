@@ -1,4 +1,4 @@
-from .concrete import LinearForm, ExponentialForm, LogarithmicForm
+from .concrete import LinearForm, ExponentialForm, LogarithmicForm, SegmentedForm
 from .interface import FunctionalFormStrategy
 
 
@@ -8,6 +8,7 @@ class FunctionalFormFactory:
 
     Attributes:
         functional_forms (dict[str, FunctionalFormStrategy]): A dictionary mapping functional form names to their corresponding strategies.
+        default_forms (tuple[str, ...]): The forms searched when no forms are named. The piecewise forms nest the linear and logarithmic ones, so they never fit worse and are only searched when named.
     """
 
     def __init__(self) -> None:
@@ -15,7 +16,26 @@ class FunctionalFormFactory:
             "linear": LinearForm(),
             "exponential": ExponentialForm(),
             "logarithmic": LogarithmicForm(),
+            "piecewise_linear": SegmentedForm(2, "linear"),
+            "piecewise_logarithmic": SegmentedForm(2, "logarithmic"),
         }
+        self.default_forms: tuple[str, ...] = ("linear", "exponential", "logarithmic")
+
+    def select(
+        self, functional_forms: list[str] | tuple[str, ...] | None = None
+    ) -> dict[str, FunctionalFormStrategy]:
+        """
+        Returns the named functional forms, or the default forms if none are named.
+
+        Args:
+            functional_forms (list[str] | tuple[str, ...], optional): The names of the forms.
+
+        Returns:
+            dict[str, FunctionalFormStrategy]: The selected forms, in registration order.
+
+        """
+        names = self.default_forms if functional_forms is None else functional_forms
+        return {form: f for form, f in self.functional_forms.items() if form in names}
 
     def get_functional_form(self, functional_form: str) -> FunctionalFormStrategy:
         """
@@ -1,4 +1,6 @@
+import inspect
 from abc import ABC, abstractmethod
+
 import numpy as np
 
 import numpy.typing as npt
@@ -9,9 +11,19 @@ class FunctionalFormStrategy(ABC):
     Abstract base class for functional form strategies.
 
     This class defines the interface for functional form strategies used.
-    Subclasses must implement the `func` and `initial_guess` methods.
+    Subclasses must implement the `func` and `initial_guess` methods. Forms in which some or all
+    parameters enter linearly may declare them in `linear_params` and implement `basis`, which
+    lets those parameters be solved in closed form. Forms may also implement `jacobian`, which
+    spares the optimizer from estimating derivatives by finite differences, or `fit`, which
+    replaces the generic solvers altogether for forms with a dedicated estimation method.
+
+    Attributes:
+        linear_params (tuple[int, ...]): The positions, within the parameters of `func`, of the
+            parameters that enter the form linearly. Empty for forms without a `basis`.
     """
 
+    linear_params: tuple[int, ...] = ()
+
     @abstractmethod
     def func(
         self, x: npt.NDArray[np.floating | np.integer], *params
@@ -34,16 +46,119 @@ class FunctionalFormStrategy(ABC):
         self,
         x: npt.NDArray[np.floating | np.integer],
         y: npt.NDArray[np.floating | np.integer],
-    ) -> list[np.floating | np.integer]:
+    ) -> npt.NDArray[np.floating]:
         """
-        Return the initial guess for the model parameters.
+        Return the initial guess for the model parameters, estimated from the data.
+
+        Guesses are computed for a single series or for a batch of series in one pass.
+
+        Parameters:
+            x (numpy.ndarray): The input data, of shape (n_points,) or (n_series, n_points).
+            y (numpy.ndarray): The target data, of shape (n_points,) or (n_series, n_points).
+
+        Returns:
+            numpy.ndarray: The initial guess for the model parameters, of shape (n_params,) for
+                a single series or (n_series, n_params) for a batch.
+        """
+
+        pass
+
+    @property
+    def num_params(self) -> int:
+        """
+        The number of parameters of the model, taken from the signature of `func`.
+        """
+
+        return len(inspect.signature(self.func).parameters) - 1
+
+    @property
+    def nonlinear_params(self) -> tuple[int, ...]:
+        """
+        The positions of the parameters that do not enter the form linearly.
+        """
+
+        return tuple(i for i in range(self.num_params) if i not in self.linear_params)
+
+    def basis(
+        self, x: npt.NDArray[np.floating | np.integer], *nonlinear_params
+    ) -> npt.NDArray[np.floating] | None:
+        """
+        Return the basis matrix of the linear parameters for fixed nonlinear parameters.
+
+        If the form can be written as ``func(x, *params) == basis(x, *nonlinear) @ linear``, where
+        ``linear`` and ``nonlinear`` are the parameters at `linear_params` and `nonlinear_params`,
+        the linear parameters can be found with a linear least-squares solve. Forms that are
+        entirely linear take no nonlinear parameters and are solved without any iteration.
+
+        Parameters:
+            x (numpy.ndarray): The input data.
+            nonlinear_params (tuple): The values of the nonlinear parameters, in order.
+
+        Returns:
+            numpy.ndarray | None: The basis matrix of shape (n_points, len(linear_params)), with
+                columns in the order of `linear_params`, or None if the form does not declare
+                any linear parameters.
+        """
+
+        return None
+
+    @property
+    def has_jacobian(self) -> bool:
+        """
+        Whether the form provides an analytic `jacobian`.
+        """
+
+        return type(self).jacobian is not FunctionalFormStrategy.jacobian
+
+    def jacobian(
+        self, x: npt.NDArray[np.floating | np.integer], *params
+    ) -> npt.NDArray[np.floating]:
+        """
+        Calculate the derivatives of `func` with respect to each parameter.
+
+        Parameters:
+            x (numpy.ndarray): The input data.
+            params (tuple): The parameters of the model.
+
+        Returns:
+            numpy.ndarray: The Jacobian matrix of shape (n_points, n_params).
+
+        Raises:
+            NotImplementedError: If the form does not provide an analytic Jacobian.
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} has no analytic Jacobian.")
+
+    @property
+    def has_fit(self) -> bool:
+        """
+        Whether the form provides its own `fit` method.
+        """
+
+        return type(self).fit is not FunctionalFormStrategy.fit
+
+    def fit(
+        self,
+        x: npt.NDArray[np.floating | np.integer],
+        y: npt.NDArray[np.floating | np.integer],
+        sigma: npt.NDArray[np.floating] | None = None,
+    ) -> npt.NDArray[np.floating]:
+        """
+        Estimate the parameters of the form by a dedicated method.
+
+        Forms that implement it are fitted by it instead of the linear, variable-projection and
+        ``curve_fit`` solvers; of the fitting options only ``sigma`` is passed on.
 
         Parameters:
             x (numpy.ndarray): The input data.
             y (numpy.ndarray): The target data.
+            sigma (numpy.ndarray, optional): The uncertainty of each point.
 
         Returns:
-            list[np.floating | np.integer]: The initial guess for the model parameters.
+            numpy.ndarray: The fitted parameters.
+
+        Raises:
+            NotImplementedError: If the form has no dedicated fitting method.
         """
 
-        pass
+        raise NotImplementedError(f"{type(self).__name__} has no dedicated fitting method.")
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from fitmaster.core.async_tool import AsyncCurveFittingTool
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.hooks import FitHook
+from fitmaster.forms.concrete import ExponentialForm
+
+
+class SlowHook(FitHook):
+    """
+    Hook that slows every fit down and records how many run at once.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.fits = 0
+
+    def on_fit(self, result):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        self.fits += 1
+        self.running -= 1
+
+
+def _data():
+    x = np.linspace(1, 10, 200)
+    return x, 2 * np.exp(0.3 * x) + 1 + np.random.normal(0, 0.1, len(x))
+
+
+def test_async_calls_match_the_tool():
+    x, y = _data()
+
+    async def main():
+        async with AsyncCurveFittingTool(max_concurrency=2) as tool:
+            results, fit = await asyncio.gather(
+                tool.search_and_evaluate(x, y, ["linear", "exponential"]),
+                tool.fit_and_evaluate(x, y, "exponential", ExponentialForm()),
+            )
+        return results, fit
+
+    results, fit = asyncio.run(main())
+    expected = CurveFittingTool().search_and_evaluate(x, y, ["linear", "exponential"])
+    assert [r.form for r in results] == [r.form for r in expected]
+    np.testing.assert_allclose(fit.params, expected[0].params)
+
+
+def test_async_calls_are_bounded_coalesced_and_time_out():
+    x, y = _data()
+    hook = SlowHook(0.05)
+
+    async def main():
+        async with AsyncCurveFittingTool(
+            CurveFittingTool(hooks=[hook]), max_concurrency=2, coalesce=True
+        ) as tool:
+            # Identical calls share one fit; different data are fitted separately.
+            calls = [tool.fit_and_evaluate(x, y, "exponential", ExponentialForm())] * 3
+            calls += [
+                tool.fit_and_evaluate(x, y + i, "exponential", ExponentialForm())
+                for i in range(1, 5)
+            ]
+            results = await asyncio.gather(*calls)
+            assert results[0] is results[1] is results[2]
+            assert hook.fits == 5
+            assert hook.peak <= 2
+
+            with pytest.raises(TimeoutError):
+                await tool.search_and_evaluate(x, y, timeout=0.01)
+
+            task = asyncio.create_task(tool.search_and_evaluate(x, y + 10))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert not tool._in_flight
+
+            # The slots of abandoned fits are released once they end.
+            await asyncio.sleep(0.5)
+            assert tool._semaphore._value == 2
+
+    asyncio.run(main())
+
+
+def test_timed_calls_keep_the_hooks_and_budget_of_the_tool():
+    x, y = _data()
+    hook = SlowHook(0)
+    fitting_tool = CurveFittingTool(hooks=[hook])
+
+    async def main():
+        async with AsyncCurveFittingTool(fitting_tool, timeout=10) as tool:
+            return await tool.search_and_evaluate(x, y, ["linear", "exponential"])
+
+    assert len(asyncio.run(main())) == 2
+    assert hook.fits == 2
+    assert fitting_tool.budget.search_timeout is None
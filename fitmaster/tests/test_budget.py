@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from fitmaster.core.budget import BudgetExceededError, FitBudget
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.forms.concrete import ExponentialForm
+
+
+@pytest.fixture
+def data():
+    x = np.linspace(1, 10, 100)
+    return x, 2 * np.exp(0.3 * x) + 1 + np.random.normal(0, 0.1, len(x))
+
+
+def _by_form(results):
+    return {result.form: result for result in results}
+
+
+def test_forms_over_budget_fail_without_aborting_the_search(data):
+    x, y = data
+    tool = CurveFittingTool(budget=FitBudget(max_nfev=2))
+
+    results = _by_form(tool.search_and_evaluate(x, y))
+    assert not results["exponential"].converged
+    assert "Evaluation budget" in results["exponential"].message
+    assert np.isnan(results["exponential"]["r_squared"])
+    assert results["linear"].converged
+    assert results["logarithmic"].converged
+
+    with pytest.raises(BudgetExceededError):
+        tool.fit_and_evaluate(x, y, "exponential", ExponentialForm())
+
+
+def test_failed_fits_sort_last(data):
+    x, y = data
+    tool = CurveFittingTool(budget=FitBudget(timeout=0))
+
+    results = tool.search_and_evaluate(x, y)
+    assert len(results) == 3
+    assert all(not r.converged and "Time budget" in r.message for r in results)
+
+
+def test_search_budget_and_early_stop(data):
+    x, y = data
+
+    tool = CurveFittingTool(budget=FitBudget(search_max_nfev=1))
+    results = _by_form(tool.search_and_evaluate(x, y))
+    assert results["linear"].converged
+    assert "search budget" in results["logarithmic"].message
+
+    tool = CurveFittingTool(budget=FitBudget(stop_r_squared=0.5))
+    results = tool.search_and_evaluate(x, y)
+    assert results[0].form == "linear"
+    assert all("threshold" in r.message for r in results[1:])
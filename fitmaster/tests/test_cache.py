@@ -0,0 +1,118 @@
+import numpy as np
+from fitmaster.core.cache import FitCache
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.forms.concrete import SegmentedForm
+
+
+def test_cache_hits_and_misses():
+    cache = FitCache(maxsize=8)
+    tool = CurveFittingTool(cache=cache)
+
+    x = np.linspace(1, 10, 50)
+    y = 3 * x + 2 + np.random.normal(0, 1, len(x))
+
+    first = tool.search_and_evaluate(x, y)
+    assert cache.info.misses == 3
+    assert cache.info.hits == 0
+
+    second = tool.search_and_evaluate(x, y)
+    assert cache.info.hits == 3
+    assert [r["form"] for r in first] == [r["form"] for r in second]
+    np.testing.assert_array_equal(first[0]["params"], second[0]["params"])
+
+    # Different data or options are different entries
+    tool.search_and_evaluate(x, y + 1)
+    tool.search_and_evaluate(x, y, maxfev=500)
+    assert cache.info.misses == 9
+
+
+def test_cache_keys_depend_on_the_configuration_of_a_form():
+    cache = FitCache()
+    tool = CurveFittingTool(cache=cache)
+    x = np.linspace(1, 10, 60)
+    y = np.abs(x - 5)
+
+    two = tool.fit_and_evaluate(x, y, "piecewise", SegmentedForm(2))
+    three = tool.fit_and_evaluate(x, y, "piecewise", SegmentedForm(3))
+    assert cache.info.misses == 2
+    assert (len(two.params), len(three.params)) == (5, 8)
+    assert len(three.y_pred) == len(x)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FitCache(maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        cache.set(key, {"form": key})
+
+    assert cache.info.currsize == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"form": "a"}
+    assert cache.get("c") == {"form": "c"}
+
+
+def test_cache_persists_on_disk(tmp_path):
+    x = np.linspace(1, 10, 50)
+    y = 2 * np.log(x) + 1
+
+    CurveFittingTool(cache=FitCache(location=tmp_path)).search_and_evaluate(x, y)
+
+    cache = FitCache(location=tmp_path)
+    results = CurveFittingTool(cache=cache).search_and_evaluate(x, y)
+    assert cache.info.disk_hits == 3
+    assert cache.info.misses == 0
+    assert results[0]["form"] == "logarithmic"
+
+
+def test_design_cache_reuses_the_factorization_of_a_shared_x():
+    from fitmaster.core.cache import DesignCache
+    from fitmaster.core.least_squares import solve_linear
+
+    design_cache = DesignCache()
+    tool = CurveFittingTool(design_cache=design_cache)
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 200)
+    linear = tool.form_factory.get_functional_form("linear")
+    logarithmic = tool.form_factory.get_functional_form("logarithmic")
+
+    for i in range(5):
+        y = 3 * x + i + rng.normal(0, 1, len(x))
+        for f in (linear, logarithmic):
+            np.testing.assert_allclose(
+                tool._fit_params(x, y, f).x, solve_linear(f.basis(x), y), rtol=1e-10
+            )
+    assert design_cache.info.misses == 2
+    assert design_cache.info.hits == 8
+
+    batch = tool.search_and_evaluate_batch(x, rng.normal(size=(3, len(x))), n_jobs=1)
+    assert design_cache.info.hits == 10
+    assert batch.success[:, list(batch.forms).index("linear")].all()
+
+    # A new array with the same values is a different key, and dead arrays are released.
+    copy = x.copy()
+    tool._fit_params(copy, y, linear)
+    assert design_cache.info.misses == 3
+    size = design_cache.info.currsize
+    del copy
+    assert design_cache.info.currsize < size
+    del x
+    assert design_cache.info.currsize == 0
+
+
+def test_design_cache_detects_an_x_modified_in_place():
+    tool = CurveFittingTool()
+    linear = tool.form_factory.get_functional_form("linear")
+    x = np.linspace(1, 10, 100)
+    tool.fit_and_evaluate(x, 3 * x + 2, "linear", linear)
+
+    x[:] = np.linspace(1, 20, 100)
+    result = tool.fit_and_evaluate(x, 3 * x + 2, "linear", linear)
+    np.testing.assert_allclose(result.params, [2, 3])
+    assert tool.design_cache.info.misses == 2
+
+    # Only a sample of a large x is hashed, which includes its endpoints.
+    x = np.linspace(1, 10, 1_000_000)
+    tool.fit_and_evaluate(x, 3 * x + 2, "linear", linear)
+    x[-1] = 20
+    result = tool.fit_and_evaluate(x, 3 * x + 2, "linear", linear)
+    np.testing.assert_allclose(result.params, [2, 3])
+    assert tool.design_cache.info.misses == 4
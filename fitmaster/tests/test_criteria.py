@@ -1,4 +1,9 @@
+import numpy as np
+import pytest
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
 from fitmaster.criteria.concrete import AICCriterion, BICCriterion, RSquaredCriterion
+from fitmaster.criteria.interface import ModelSelectionCriterionStrategy
+from fitmaster.criteria.statistics import FitStatistics
 from numpy.testing import assert_almost_equal
 
 
@@ -22,3 +27,30 @@ def test_r_squared_criterion(y_data, matching_y_pred):
     r_squared = RSquaredCriterion()
     num_params = 2
     assert_almost_equal(r_squared.evaluate(y_data, matching_y_pred, num_params), 1.0)
+
+
+def test_criteria_from_statistics_are_vectorized(y_data, matching_y_pred, non_matching_y_pred):
+    # Two models (rows) fitted to the same series, with different numbers of parameters
+    y_pred = np.stack([non_matching_y_pred, matching_y_pred + 0.05])
+    stats = FitStatistics.from_predictions(y_data, y_pred)
+    num_params = np.array([2, 3])
+
+    for criterion in (AICCriterion(), BICCriterion(), RSquaredCriterion()):
+        expected = [criterion.evaluate(y_data, p, k) for p, k in zip(y_pred, num_params)]
+        assert_almost_equal(criterion.evaluate_statistics(stats, num_params), expected)
+
+
+def test_criteria_implementing_only_evaluate_are_used_by_the_tool():
+    class MaxErrorCriterion(ModelSelectionCriterionStrategy):
+        def evaluate(self, y, y_pred, num_params):
+            return np.max(np.abs(y - y_pred))
+
+    tool = CurveFittingTool()
+    tool.criterion_factory.criterions["max_error"] = MaxErrorCriterion()
+    x = np.linspace(1, 10, 50)
+    y = 3 * x + 2
+    result = tool.search_and_evaluate(x, y, ["linear"], ["max_error", "r_squared"])[0]
+    assert_almost_equal(result["max_error"], 0.0)
+
+    with pytest.raises(NotImplementedError, match="evaluate_statistics"):
+        tool.search_and_evaluate_batch(x, np.vstack([y, y]), ["linear"], ["max_error"])
@@ -1,6 +1,13 @@
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from fitmaster.core.curve_fitting_tool import CurveFittingTool, CurveFittingVisualizer
-from fitmaster.forms.concrete import LinearForm
+from fitmaster.core.budget import FitBudget
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.visualization import CurveFittingVisualizer
+from fitmaster.core.hooks import TimingHook
+from fitmaster.forms.concrete import ExponentialForm, LinearForm
 
 
 def test_CurveFittingTool():
@@ -55,3 +62,381 @@ def test_CurveFittingVisualizer():
     for fig, ax in figs_axes:
         assert fig is not None
         assert ax is not None
+
+
+def test_search_and_evaluate_batch():
+    tool = CurveFittingTool()
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 50)
+    y = np.vstack(
+        [
+            3 * x + 2 + rng.normal(0, 0.1, (4, len(x))),
+            2 * np.log(x) + 1 + rng.normal(0, 0.01, (3, len(x))),
+        ]
+    )
+
+    results = tool.search_and_evaluate_batch(
+        x, y, ["linear", "logarithmic"], n_jobs=2, backend="threading", chunk_size=3
+    )
+
+    assert len(results) == 7
+    assert results.forms == ("linear", "logarithmic")
+    assert results.params["linear"].shape == (7, 2)
+    assert results.criteria["r_squared"].shape == (7, 2)
+    assert results.success.all()
+    assert list(results.best_forms()) == ["linear"] * 4 + ["logarithmic"] * 3
+    assert list(results.best_forms("aic")) == ["linear"] * 4 + ["logarithmic"] * 3
+
+    # Per-series x gives the same fits as the shared x
+    per_series = tool.search_and_evaluate_batch(
+        np.tile(x, (7, 1)), y, ["linear", "logarithmic"]
+    )
+    np.testing.assert_allclose(per_series.params["linear"], results.params["linear"])
+
+
+def test_batch_accepts_a_starting_point():
+    tool = CurveFittingTool()
+    x = np.linspace(1, 5, 50)
+    y = 2 * np.exp(0.4 * x) + 1 + np.random.normal(0, 0.01, (3, len(x)))
+
+    batch = tool.search_and_evaluate_batch(
+        x, y, ["linear", "exponential"], n_jobs=1, p0=[1.0, 0.5, 0.0]
+    )
+    assert batch.success.all()
+    for i in range(3):
+        single = tool.fit_and_evaluate(x, y[i], "exponential", ExponentialForm(), p0=[1, 0.5, 0])
+        np.testing.assert_allclose(batch.params["exponential"][i], single.params)
+
+
+def test_initial_guesses_are_moved_into_the_bounds():
+    tool = CurveFittingTool()
+    x = np.linspace(1, 10, 50)
+    y = 2 * x + 1
+    bounds = ([0, -1, -10], [10, 1, 10])
+
+    single = tool.fit_and_evaluate(x, y, "exponential", ExponentialForm(), bounds=bounds)
+    assert single.converged and single["r_squared"] > 0.95
+    batch = tool.search_and_evaluate_batch(
+        x, np.vstack([y, y]), ["exponential"], n_jobs=1, bounds=bounds
+    )
+    assert batch.success.all()
+    np.testing.assert_allclose(batch.params["exponential"][0], single.params)
+
+
+def test_batch_fails_forms_undefined_at_the_shared_x():
+    tool = CurveFittingTool()
+    x = np.linspace(0, 10, 50)
+    y = 3 * x + 2 + np.random.normal(0, 0.1, (4, len(x)))
+
+    batch = tool.search_and_evaluate_batch(x, y, ["linear", "logarithmic"], n_jobs=1)
+    assert batch.success[:, 0].all()
+    assert not batch.success[:, 1].any()
+    assert np.isnan(batch.params["logarithmic"]).all()
+    assert np.isnan(batch.criteria["r_squared"][:, 1]).all()
+
+    single = tool.search_and_evaluate(x, y[0], ["linear", "logarithmic"])
+    assert [r.converged for r in single] == [True, False]
+
+
+def test_linear_forms_are_solved_in_closed_form():
+    tool = CurveFittingTool()
+
+    x = np.linspace(1, 10, 100)
+    y = 3 * x + 2 + np.random.normal(0, 1, len(x))
+
+    result = tool.fit_and_evaluate(x, y, "linear", LinearForm())
+    np.testing.assert_allclose(result["params"], np.polyfit(x, y, 1)[::-1])
+
+    sigma = np.linspace(1, 2, len(x))
+    result = tool.fit_and_evaluate(x, y, "linear", LinearForm(), sigma=sigma)
+    np.testing.assert_allclose(
+        result["params"], np.polyfit(x, y, 1, w=1 / sigma)[::-1]
+    )
+
+
+def test_exponential_form_is_fitted_by_variable_projection():
+    tool = CurveFittingTool()
+
+    # exp(1 * x) overflows over this range, so a full search from [1, 1, 1] fails
+    x = np.linspace(0, 800, 200)
+    y = -3 * np.exp(-0.01 * x) + 7
+
+    result = tool.fit_and_evaluate(x, y, "exponential", ExponentialForm())
+    np.testing.assert_allclose(result["params"], [-3, -0.01, 7], rtol=1e-6)
+
+
+def test_fit_result_computes_predictions_lazily():
+    tool = CurveFittingTool()
+
+    x = np.linspace(1, 10, 100)
+    y = 3 * x + 2 + np.random.normal(0, 1, len(x))
+
+    result = tool.fit_and_evaluate(x, y, "linear", LinearForm())
+    assert not hasattr(result, "__dict__")
+    assert set(result) >= {"form", "params", "y_pred", "residuals", "aic", "bic", "r_squared"}
+    np.testing.assert_allclose(result["y_pred"], LinearForm().func(x, *result.params))
+    np.testing.assert_allclose(result.residuals, y - result.y_pred)
+    assert result["r_squared"] == result.criteria["r_squared"]
+
+    batch = tool.search_and_evaluate_batch(x, np.vstack([y, y]))
+    results = batch.results(1, tool.form_factory.functional_forms, x, y)
+    assert [r.form for r in results] == [r.form for r in tool.search_and_evaluate(x, y)]
+    linear = next(r for r in results if r.form == "linear")
+    np.testing.assert_allclose(linear.y_pred, result.y_pred)
+
+
+def test_fits_report_diagnostics_to_hooks():
+    hook = TimingHook()
+    tool = CurveFittingTool(hooks=[hook])
+
+    x = np.linspace(1, 10, 100)
+    y = 2 * np.exp(0.3 * x) + 1 + np.random.normal(0, 0.1, len(x))
+
+    results = tool.search_and_evaluate(x, y)
+    for result in results:
+        assert result.converged
+        assert result.nfev >= 1
+        assert result.elapsed > 0
+        assert result.message
+    assert len(hook.searches) == 1
+    assert set(hook.fits) == {"linear", "exponential", "logarithmic"}
+
+    batch = tool.search_and_evaluate_batch(x, np.vstack([y, y]), chunk_size=1)
+    assert batch.nfev.shape == batch.elapsed.shape == (2, 3)
+    assert len(hook.batches) == 1
+    assert hook.summary()["exponential"]["count"] == 3
+
+
+def test_multiresolution_search_refines_the_best_coarse_forms():
+    tool = CurveFittingTool()
+
+    rng = np.random.default_rng(0)
+    x = rng.uniform(1, 10, 200_000)
+    y = 2 * np.exp(0.3 * x) + 1 + rng.normal(0, 0.5, len(x))
+
+    result = tool.search_and_evaluate_multiresolution(
+        x, y, subsample_size=2_000, top_k=2, seed=0
+    )
+
+    assert result.subsample_size == 2_000
+    assert len(result.coarse_results) == 3
+    assert len(result.results) == 2
+    assert result.refined_ranking[0] == "exponential"
+    assert not result.ranking_disagrees
+    np.testing.assert_allclose(result.results[0].params, [2, 0.3, 1], rtol=1e-2)
+    assert result.results[0].x is x
+
+
+def test_plots_are_only_saved_when_requested(tmp_path):
+    tool = CurveFittingTool()
+    x = np.linspace(1, 10, 50)
+    y = 3 * x + 2 + np.random.normal(0, 1, len(x))
+    results = tool.search_and_evaluate(x, y, ["linear"])
+
+    CurveFittingVisualizer.plot_residuals(x, y, results, save_path=tmp_path, save_fig=False)
+    assert not list(tmp_path.iterdir())
+
+    CurveFittingVisualizer.plot_fits(x, y, results, save_path=tmp_path)
+    assert (tmp_path / "fit_results.png").exists()
+
+
+def test_render_batch_writes_decimated_plots(tmp_path):
+    from fitmaster.core.visualization import _decimate
+
+    tool = CurveFittingTool()
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 100_000)
+    series = []
+    for slope in (1, 2, 3):
+        y = slope * x + 2 + rng.normal(0, 1, len(x))
+        series.append((x, y, tool.search_and_evaluate(x, y, ["linear", "logarithmic"])))
+
+    paths = CurveFittingVisualizer.render_batch(
+        series, save_path=tmp_path, names=["a", "b", "c"], n_jobs=1, chunk_size=2
+    )
+
+    assert len(paths) == 3 * (1 + 2 * 2)
+    assert all(path.endswith(".png") for path in paths)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        path.rsplit("/", 1)[-1] for path in paths
+    )
+
+    keep = _decimate(x, series[0][1], 1_000)
+    assert len(keep) <= 1_000
+    assert np.argmin(series[0][1]) in keep and np.argmax(series[0][1]) in keep
+
+
+def test_cross_validation_matches_refitting_every_fold():
+    tool = CurveFittingTool()
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 60)
+    y = 2 * np.exp(0.3 * x) + 1 + rng.normal(0, 0.5, len(x))
+
+    for k in (None, 4):
+        results = {
+            result.form: result
+            for result in tool.search_and_evaluate_cv(x, y, k=k, seed=1, n_jobs=1)
+        }
+        n_folds = len(x) if k is None else k
+        folds = np.array_split(np.random.default_rng(1).permutation(len(x)), n_folds)
+        for form in ("linear", "logarithmic"):
+            f = tool.form_factory.get_functional_form(form)
+            press = 0.0
+            for test in folds:
+                train = np.setdiff1d(np.arange(len(x)), test)
+                params = tool._fit_params(x[train], y[train], f).x
+                press += np.sum((y[test] - f.func(x[test], *params)) ** 2)
+            np.testing.assert_allclose(results[form]["cv_mse"], press / len(x), rtol=1e-8)
+
+    assert next(iter(results)) == "exponential"
+    assert results["exponential"]["cv_mse"] < results["linear"]["cv_mse"]
+    assert {"aic", "bic", "r_squared", "cv_r_squared"} <= set(results["linear"])
+
+    parallel = tool.search_and_evaluate_cv(x, y, k=4, seed=1, n_jobs=2)
+    for result in parallel:
+        np.testing.assert_allclose(result["cv_mse"], results[result.form]["cv_mse"])
+
+
+def test_bootstrap_matches_refitting_every_resample():
+    tool = CurveFittingTool()
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 80)
+    y = 2 * np.exp(0.3 * x) + 1 + rng.normal(0, 0.5, len(x))
+
+    linear = tool.bootstrap(x, y, "linear", LinearForm(), n_resamples=50, seed=3)
+    indices = np.random.default_rng(3).integers(0, len(x), size=(50, len(x)))
+    for row, index in zip(linear.params, indices):
+        np.testing.assert_allclose(row, tool._fit_params(x[index], y[index], LinearForm()).x)
+    r_squared = [
+        1 - np.sum((y[i] - LinearForm().func(x[i], *p)) ** 2) / np.sum((y[i] - y[i].mean()) ** 2)
+        for p, i in zip(linear.params, indices)
+    ]
+    np.testing.assert_allclose(linear.criteria["r_squared"], r_squared)
+
+    exponential = tool.bootstrap(
+        x, y, "exponential", ExponentialForm(), n_resamples=40, seed=3, n_jobs=2, chunk_size=8
+    )
+    assert exponential.params.shape == (40, 3)
+    assert exponential.n_failed == 0
+    low, high = exponential.param_intervals[1]
+    assert low < exponential.result.params[1] < high
+    assert exponential.criteria_intervals["r_squared"].shape == (2,)
+
+
+def test_linear_bootstrap_keeps_its_accuracy_at_timestamp_scale():
+    tool = CurveFittingTool()
+    rng = np.random.default_rng(0)
+    x = 1.7e9 + np.arange(200, dtype=float)
+    y = 2e-2 * (x - x[0]) + 1e6 + rng.normal(0, 1, len(x))
+
+    counted = tool.bootstrap(x, y, "linear", LinearForm(), n_resamples=100, seed=3)
+    # Per-point weights take the path that refits every resample.
+    refitted = tool.bootstrap(
+        x, y, "linear", LinearForm(), n_resamples=100, seed=3, n_jobs=1, sigma=np.ones(len(x))
+    )
+    assert counted.n_failed == 0
+    np.testing.assert_allclose(counted.params, refitted.params, rtol=1e-6)
+    np.testing.assert_allclose(counted.criteria["r_squared"], refitted.criteria["r_squared"])
+    np.testing.assert_allclose(counted.criteria["aic"], refitted.criteria["aic"], atol=1e-5)
+
+
+def test_multistart_fit_is_never_worse_and_reports_its_start():
+    from fitmaster.core.multistart import MultiStart
+
+    rng = np.random.default_rng(2)
+    x = np.linspace(0, 10, 100)
+    y = -1.1 * np.exp(-0.87 * x) + 22.6 + rng.normal(0, 0.5, len(x))
+
+    single = CurveFittingTool()
+    multi = CurveFittingTool(multistart=MultiStart(n_starts=32, n_refine=3, seed=0, n_jobs=1))
+    for kwargs in ({}, {"bounds": (-np.inf, np.inf)}):
+        baseline = single.fit_and_evaluate(x, y, "exponential", ExponentialForm(), **kwargs)
+        result = multi.fit_and_evaluate(x, y, "exponential", ExponentialForm(), **kwargs)
+        assert result["r_squared"] >= baseline["r_squared"] - 1e-9
+        assert result.p0 is not None and len(result.p0) == 3
+        assert "candidates" in result.message
+        assert result.nfev > 32
+
+    # A given p0 bypasses the multi-start search.
+    assert multi.fit_and_evaluate(x, y, "e", ExponentialForm(), p0=[1, -1, 20]).p0 is None
+
+    settings = MultiStart(n_starts=10, sampling="grid")
+    assert settings.starting_points([1.0, 2.0]).shape == (10, 2)
+    lhs = MultiStart(n_starts=9, seed=0).starting_points([0.5])
+    np.testing.assert_allclose(lhs[0], [0.5])
+    assert np.all(np.diff(np.sort(np.floor((lhs[1:, 0] + 0.5) / 2 * 8))) == 1)
+
+
+def test_segmented_forms_are_searched_when_named(monkeypatch):
+    tool = CurveFittingTool()
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 200)
+    forms = ["linear", "logarithmic", "piecewise_linear"]
+
+    # Linear data still select the linear form under every criterion.
+    y = 3 * x + 2 + rng.normal(0, 0.5, len(x))
+    assert {r.form for r in tool.search_and_evaluate(x, y)} == {
+        "linear",
+        "exponential",
+        "logarithmic",
+    }
+    batch = tool.search_and_evaluate_batch(x, np.vstack([y, y]), n_jobs=1)
+    assert "piecewise_linear" not in batch.forms
+    for criterion in ("aic", "bic"):
+        assert list(batch.best_forms(criterion)) == ["linear"] * 2
+
+    y = np.where(x < 6, 1 + x, 19 - 2 * x) + rng.normal(0, 0.1, len(x))
+    results = tool.search_and_evaluate(x, y, forms, criterions=["aic", "r_squared"])
+    best = min(results, key=lambda result: result["aic"])
+    assert best.form == "piecewise_linear"
+    assert best.converged and best.nfev == 1
+    np.testing.assert_allclose(best.params[0], 6, atol=0.1)
+
+    # Batched segmented fits use their own fitting method and need no starting point.
+    form = tool.form_factory.get_functional_form("piecewise_linear")
+    monkeypatch.setattr(form, "initial_guess", None)
+    batch = tool.search_and_evaluate_batch(x, np.vstack([y, y]), forms, n_jobs=1)
+    assert list(batch.best_forms("aic")) == ["piecewise_linear"] * 2
+
+
+def test_forms_are_fitted_concurrently_on_an_executor():
+    x = np.linspace(1, 10, 20_000)
+    y = 2 * np.exp(0.3 * x) + 1 + np.random.normal(0, 0.5, len(x))
+    sequential = CurveFittingTool().search_and_evaluate(x, y)
+
+    hook = TimingHook()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        tool = CurveFittingTool(hooks=[hook], executor=executor)
+        for _ in range(3):
+            concurrent = tool.search_and_evaluate(x, y)
+            assert [r.form for r in concurrent] == [r.form for r in sequential]
+            for a, b in zip(concurrent, sequential):
+                np.testing.assert_array_equal(a.params, b.params)
+                assert a.criteria == b.criteria
+        assert len(hook.searches) == 3
+
+        # Thresholds depend on the forms fitted before, so such searches stay sequential.
+        tool.budget = FitBudget(stop_r_squared=0.5)
+        results = tool.search_and_evaluate(x, y)
+        assert sum("threshold" in r.message for r in results) == len(results) - 1
+
+    assert pickle.loads(pickle.dumps(tool)).executor is None
+
+
+def test_queued_forms_get_their_whole_time_budget():
+    class SlowLinearForm(LinearForm):
+        def fit(self, x, y, sigma=None):
+            time.sleep(0.1)
+            return np.polynomial.polynomial.polyfit(x, y, 1)
+
+    x = np.linspace(1, 10, 50)
+    y = 3 * x + 2
+    forms = [f"slow_{i}" for i in range(4)]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        tool = CurveFittingTool(executor=executor)
+        tool.budget = FitBudget(timeout=0.25)
+        for form in forms:
+            tool.form_factory.functional_forms[form] = SlowLinearForm()
+        results = tool.search_and_evaluate(x, y, forms)
+    assert all(result.converged for result in results)
@@ -1,5 +1,5 @@
 import numpy as np
-from fitmaster.forms.concrete import LinearForm, ExponentialForm, LogarithmicForm
+from fitmaster.forms.concrete import LinearForm, ExponentialForm, LogarithmicForm, SegmentedForm
 from numpy.testing import assert_almost_equal
 
 
@@ -9,7 +9,7 @@ def test_linear_form():
     a = 1.0
     b = 2.0
     assert_almost_equal(linear_form.func(x, a, b), np.array([3.0, 5.0, 7.0]))
-    assert linear_form.initial_guess(x, x) == [1, 1]
+    assert_almost_equal(linear_form.initial_guess(x, 2 * x + 1), [1.0, 2.0])
 
 
 def test_exponential_form():
@@ -22,7 +22,11 @@ def test_exponential_form():
         exponential_form.func(x, a, b, c),
         np.array([8.3890561, 55.59815003, 404.42879349]),
     )
-    assert exponential_form.initial_guess(x, x) == [1, 1, 1]
+    y = np.vstack([2 * np.exp(0.5 * x) + 1, -3 * np.exp(-0.8 * x) + 4])
+    guesses = exponential_form.initial_guess(x, y)
+    assert guesses.shape == (2, 3)
+    assert np.all(np.sign(guesses[:, :2]) == [[1, 1], [-1, -1]])
+    assert_almost_equal(guesses[1], exponential_form.initial_guess(x, y[1]))
 
 
 def test_logarithmic_form():
@@ -34,4 +38,76 @@ def test_logarithmic_form():
         logarithmic_form.func(x, a, b),
         np.array([1.0, 2.38629436, 3.19722458]),
     )
-    assert logarithmic_form.initial_guess(x, x) == [1, 1]
+    assert_almost_equal(
+        logarithmic_form.initial_guess(x, 2 * np.log(x) + 1), [1.0, 2.0]
+    )
+
+
+def test_basis_matches_func():
+    x = np.array([1.0, 2.0, 3.0])
+    params = np.array([0.5, -1.5])
+    for form in (LinearForm(), LogarithmicForm()):
+        assert form.nonlinear_params == ()
+        assert_almost_equal(form.basis(x) @ params, form.func(x, *params))
+
+    exponential_form = ExponentialForm()
+    assert exponential_form.nonlinear_params == (1,)
+    assert_almost_equal(
+        exponential_form.basis(x, 0.3) @ params,
+        exponential_form.func(x, 0.5, 0.3, -1.5),
+    )
+
+
+def test_jacobian_matches_finite_differences():
+    x = np.linspace(0.5, 3.0, 20)
+    step = 1e-6
+    for form, params in (
+        (LinearForm(), [1.0, 2.0]),
+        (ExponentialForm(), [1.5, 0.7, -2.0]),
+        (LogarithmicForm(), [1.0, 2.0]),
+    ):
+        assert form.has_jacobian
+        numeric = np.column_stack(
+            [
+                (form.func(x, *(params + step * e)) - form.func(x, *(params - step * e)))
+                / (2 * step)
+                for e in np.eye(len(params))
+            ]
+        )
+        np.testing.assert_allclose(form.jacobian(x, *params), numeric, rtol=1e-6)
+
+
+def test_segmented_form_finds_the_best_breakpoint():
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0, 10, 60))
+    y = np.where(x < 4, 1 + 2 * x, 13 - x) + rng.normal(0, 0.3, len(x))
+    form = SegmentedForm(2)
+
+    params = form.fit(x, y)
+    assert form.has_fit and params.shape == (form.num_params,)
+
+    def sse(i):
+        return sum(
+            np.sum((y[s] - np.polyval(np.polyfit(x[s], y[s], 1), x[s])) ** 2)
+            for s in (slice(0, i), slice(i, None))
+        )
+
+    best = min(range(2, len(x) - 1), key=sse)
+    assert_almost_equal(params[0], (x[best - 1] + x[best]) / 2)
+    assert_almost_equal(np.sum((y - form.func(x, *params)) ** 2), sse(best))
+    assert_almost_equal(form.basis(x, params[0]) @ params[1:], form.func(x, *params))
+
+
+def test_segmented_form_places_several_breakpoints():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(1, 100, 1_000_000)
+    y = np.select([x < 30, x < 70], [x, 60 - x], 2 * x - 150) + rng.normal(0, 1, len(x))
+
+    form = SegmentedForm(3)
+    params = form.fit(x, y)
+    assert_almost_equal(params[:2], [30, 70], decimal=1)
+    np.testing.assert_allclose(params[2:], [0, 1, 60, -1, -150, 2], atol=0.1)
+
+    log_form = SegmentedForm(2, "logarithmic")
+    y = np.where(x < 20, 2 * np.log(x), 1 + np.log(x))
+    assert_almost_equal(log_form.fit(x, y), [20, 0, 2, 1, 1], decimal=3)
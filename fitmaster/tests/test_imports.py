@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+
+def _loaded_modules(statement):
+    code = f"import sys\n{statement}\nprint(' '.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.split())
+
+
+def test_importing_the_tool_does_not_load_plotting_modules():
+    loaded = _loaded_modules("from fitmaster.core.curve_fitting_tool import CurveFittingTool")
+
+    assert "matplotlib" not in loaded
+    assert "scipy.stats" not in loaded
+    assert "joblib" not in loaded
+
+
+def test_visualizer_is_still_available_from_the_tool_module():
+    from fitmaster.core.curve_fitting_tool import CurveFittingVisualizer
+    from fitmaster.core.visualization import CurveFittingVisualizer as moved
+
+    assert CurveFittingVisualizer is moved
@@ -0,0 +1,99 @@
+import numpy as np
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.incremental import IncrementalCurveFitter
+from numpy.testing import assert_allclose
+
+
+def _by_form(results):
+    return {result["form"]: result for result in results}
+
+
+def test_incremental_matches_full_refit():
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 5, 200)
+    y = 2 * np.exp(0.4 * x) + 1 + rng.normal(0, 0.1, len(x))
+
+    fitter = IncrementalCurveFitter()
+    for xi, yi in zip(x[:100], y[:100]):
+        fitter.update(xi, yi)
+    fitter.results()
+    fitter.update(x[100:], y[100:])
+
+    incremental = _by_form(fitter.results())
+    full = _by_form(CurveFittingTool().search_and_evaluate(x, y))
+    assert fitter.n_observations == len(x)
+    for form, result in full.items():
+        assert_allclose(incremental[form]["params"], result["params"], rtol=1e-6)
+        for name in ("aic", "bic", "r_squared"):
+            assert_allclose(incremental[form][name], result[name], rtol=1e-6)
+
+
+def test_sliding_window_only_fits_recent_points():
+    rng = np.random.default_rng(0)
+    x = np.arange(1, 101, dtype=float)
+    y = np.where(x <= 50, 10 - x, 3 * x + 2) + rng.normal(0, 1e-3, len(x))
+
+    fitter = IncrementalCurveFitter(["linear", "logarithmic"], window=30)
+    for xi, yi in zip(x, y):
+        fitter.update(xi, yi)
+
+    results = _by_form(fitter.results())
+    assert fitter.n_observations == 30
+    assert_allclose(results["linear"]["params"], [2, 3], atol=1e-2)
+    assert_allclose(results["linear"]["r_squared"], 1.0, atol=1e-8)
+
+
+def test_forgetting_down_weights_old_points():
+    x = np.arange(1, 201, dtype=float)
+    y = np.where(x <= 100, -x, 3 * x + 2)
+
+    fitter = IncrementalCurveFitter(["linear"], forgetting=0.8)
+    fitter.update(x, y)
+
+    assert_allclose(fitter.results()[0]["params"], [2, 3], atol=1e-3)
+
+
+def test_badly_scaled_x_keeps_its_accuracy():
+    rng = np.random.default_rng(0)
+    x = 1.7e9 + np.arange(5_000, dtype=float) * 60
+    y = 2e-4 * (x - x[0]) + 5 + rng.normal(0, 1, len(x))
+
+    for window in (None, 1_000):
+        fitter = IncrementalCurveFitter(["linear"], window=window)
+        for start in range(0, len(x), 100):
+            fitter.update(x[start : start + 100], y[start : start + 100])
+        recent = slice(-window if window else None, None)
+        full = CurveFittingTool().search_and_evaluate(x[recent], y[recent], ["linear"])[0]
+        result = fitter.results()[0]
+        assert_allclose(result["r_squared"], full["r_squared"], rtol=1e-6)
+        assert_allclose(result["params"], full["params"], rtol=1e-6)
+
+
+def test_failed_fits_are_reported(monkeypatch):
+    fitter = IncrementalCurveFitter(["linear", "exponential"])
+    fitter.update(np.arange(1.0, 11.0), np.arange(1.0, 11.0))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("Optimal parameters not found.")
+
+    monkeypatch.setattr(fitter.tool, "_fit_params", fail)
+    results = fitter.results()
+    assert [r.form for r in results] == ["linear", "exponential"]
+    assert results[0].converged
+    assert not results[1].converged and "not found" in results[1].message
+    assert np.isnan(results[1]["r_squared"])
+
+
+def test_forms_undefined_at_a_point_fail_until_it_leaves_the_window():
+    x = np.arange(0, 20, dtype=float)
+    y = 3 * x + 2
+
+    fitter = IncrementalCurveFitter(["linear", "logarithmic"], window=10)
+    fitter.update(x[:10], y[:10])
+    results = _by_form(fitter.results())
+    assert_allclose(results["linear"]["params"], [2, 3])
+    assert not results["logarithmic"].converged
+    assert np.isnan(results["logarithmic"]["r_squared"])
+
+    fitter.update(x[10:], y[10:])
+    assert all(result.converged for result in fitter.results())
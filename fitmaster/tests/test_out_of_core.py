@@ -0,0 +1,89 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.out_of_core import OutOfCoreCurveFitter
+from numpy.testing import assert_allclose
+
+
+def _by_form(results):
+    return {result["form"]: result for result in results}
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(1, 10, n)
+    y = 2 * np.exp(0.3 * x) + 1 + rng.normal(0, 0.5, n)
+    return x, y
+
+
+def test_out_of_core_matches_in_memory_fit(tmp_path):
+    x, y = _series(50_000)
+    np.save(tmp_path / "x.npy", x)
+    np.save(tmp_path / "y.npy", y)
+
+    fitter = OutOfCoreCurveFitter(chunk_size=4_096, subsample_size=1_000)
+    out_of_core = _by_form(fitter.search_and_evaluate(tmp_path / "x.npy", tmp_path / "y.npy"))
+    in_memory = _by_form(CurveFittingTool().search_and_evaluate(x, y))
+
+    for form, result in in_memory.items():
+        assert out_of_core[form].converged
+        assert_allclose(out_of_core[form]["params"], result["params"], rtol=1e-5, atol=1e-8)
+        for name in ("aic", "bic", "r_squared"):
+            assert_allclose(out_of_core[form][name], result[name], rtol=1e-6)
+    assert isinstance(out_of_core["linear"].x, np.memmap)
+
+
+def test_out_of_core_accepts_reiterable_chunks():
+    x, y = _series(20_000)
+    chunks = [(x[i : i + 3_000], y[i : i + 3_000]) for i in range(0, len(x), 3_000)]
+
+    fitter = OutOfCoreCurveFitter(subsample_size=500)
+    from_chunks = _by_form(fitter.search_and_evaluate_chunks(chunks))
+    from_arrays = _by_form(fitter.search_and_evaluate(x, y))
+
+    for form, result in from_arrays.items():
+        assert_allclose(from_chunks[form]["params"], result["params"], rtol=1e-6, atol=1e-8)
+    assert from_chunks["linear"].x is None
+
+    with pytest.raises(ValueError):
+        fitter.search_and_evaluate_chunks(iter(chunks))
+
+
+def test_out_of_core_peak_memory_stays_bounded(tmp_path):
+    x, y = _series(2_000_000)
+    np.save(tmp_path / "x.npy", x)
+    np.save(tmp_path / "y.npy", y)
+    del x, y
+
+    fitter = OutOfCoreCurveFitter(chunk_size=32_768)
+    tracemalloc.start()
+    results = fitter.search_and_evaluate(tmp_path / "x.npy", tmp_path / "y.npy")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert results[0]["form"] == "exponential"
+    # The data alone occupy 32 MB.
+    assert peak < 8 * 2**20
+
+
+def test_out_of_core_streams_the_linear_parameters_of_segmented_forms():
+    rng = np.random.default_rng(0)
+    x = np.linspace(1, 10, 50_000)
+    y = np.where(x < 6, 1 + x, 19 - 2 * x) + rng.normal(0, 0.1, len(x))
+
+    forms = ["piecewise_linear"]
+    fitter = OutOfCoreCurveFitter(forms, chunk_size=4_096, subsample_size=5_000)
+    result = fitter.search_and_evaluate(x, y)[0]
+    in_memory = CurveFittingTool().search_and_evaluate(x, y, forms)[0]
+
+    assert result.converged
+    assert_allclose(result["params"][0], in_memory["params"][0], atol=0.1)
+    assert_allclose(result["params"][1:], [1, 1, 19, -2], atol=0.01)
+    assert_allclose(result["r_squared"], in_memory["r_squared"], rtol=1e-4)
+
+    # The linear parameters are the exact least-squares solution at the breakpoint found.
+    form = fitter.tool.form_factory.get_functional_form("piecewise_linear")
+    basis = form.basis(x, result["params"][0])
+    assert_allclose(result["params"][1:], np.linalg.lstsq(basis, y)[0], rtol=1e-8)
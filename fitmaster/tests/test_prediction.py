@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.prediction import predict_batch
+from fitmaster.core.store import ResultStore
+
+
+def test_predict_batch_matches_per_series_predictions():
+    forms = CurveFittingTool().form_factory.functional_forms
+    names = list(forms)
+    rng = np.random.default_rng(0)
+    form_ids = rng.integers(-1, len(names), 500)
+    params = rng.uniform(0.1, 1, (500, 5))
+    params[:, 0] = np.where(form_ids >= names.index("piecewise_linear"), 5.0, params[:, 0])
+    x = np.linspace(1, 10, 40)
+
+    out = np.empty((500, 40))
+    predictions = predict_batch(x, form_ids, params, names, forms, out=out, chunk_size=64)
+    assert predictions is out
+    for i, form_id in enumerate(form_ids):
+        if form_id < 0:
+            assert np.isnan(predictions[i]).all()
+        else:
+            form = forms[names[form_id]]
+            expected = form.func(x, *params[i, : form.num_params])
+            np.testing.assert_allclose(predictions[i], expected, rtol=1e-12)
+
+    single = predict_batch(x, form_ids, params, names, forms, dtype=np.float32)
+    assert single.dtype == np.float32
+    np.testing.assert_allclose(single, predictions, rtol=1e-5)
+
+    per_series = np.tile(x, (500, 1))
+    np.testing.assert_array_equal(
+        predict_batch(per_series, form_ids, params, names, forms), predictions
+    )
+    with pytest.raises(ValueError):
+        predict_batch(x, form_ids, params, names, forms, out=np.empty((500, 39)))
+
+
+def test_batch_and_store_predictions(tmp_path):
+    tool = CurveFittingTool()
+    x = np.linspace(1, 10, 50)
+    y = np.vstack([2 * x + 1, 3 * np.log(x) - 1, 2 * np.exp(0.3 * x) + 1])
+    batch = tool.search_and_evaluate_batch(x, y, ["linear", "exponential", "logarithmic"])
+
+    grid = np.linspace(2, 8, 7)
+    predictions = batch.predict(grid, tool.form_factory.functional_forms)
+    np.testing.assert_allclose(
+        predictions, [2 * grid + 1, 3 * np.log(grid) - 1, 2 * np.exp(0.3 * grid) + 1], rtol=1e-6
+    )
+
+    store = ResultStore.create(tmp_path, batch.forms, ["r_squared"], max_params=3)
+    store.append_batch(batch)
+    rows = store.select(forms=["linear"])
+    np.testing.assert_allclose(
+        store.predict(rows, grid, tool.form_factory.functional_forms)[0], 2 * grid + 1
+    )
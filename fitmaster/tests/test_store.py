@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from fitmaster.core.curve_fitting_tool import CurveFittingTool
+from fitmaster.core.store import ResultStore
+
+
+def _batch(tool, n_series, seed):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(1, 10, 50)
+    slopes = rng.uniform(0.5, 2, n_series)
+    y = slopes[:, None] * x + rng.normal(0, 0.5, (n_series, len(x)))
+    return x, y, tool.search_and_evaluate_batch(x, y, n_jobs=1)
+
+
+def test_result_store_appends_and_reloads(tmp_path):
+    tool = CurveFittingTool()
+    forms = list(tool.form_factory.functional_forms)
+    store = ResultStore.create(
+        tmp_path / "store", forms, ["aic", "r_squared"], max_params=3, n_points=50
+    )
+
+    x, y, first = _batch(tool, 20, 0)
+    store.append_batch(first)
+    _, _, second = _batch(tool, 10, 1)
+    store.append_batch(second)
+    results = tool.search_and_evaluate(x, y[0])
+    store.append(results)
+
+    reopened = ResultStore(tmp_path / "store")
+    assert len(reopened) == 3 * (20 + 10 + 1)
+    assert reopened.n_series == 31
+    assert isinstance(reopened.column("r_squared"), np.memmap)
+    np.testing.assert_array_equal(reopened.column("series")[-3:], [30, 30, 30])
+
+    rows = reopened.select(forms=["linear"], where={"r_squared": (0.5, None)})
+    assert len(rows) == 31
+    loaded = reopened.results(rows, tool.form_factory.functional_forms)
+    np.testing.assert_allclose(loaded[0].params, first.params["linear"][0])
+    np.testing.assert_allclose(loaded[0]["r_squared"], first.criteria["r_squared"][0, 0])
+    assert loaded[-1].params.shape == (2,)
+    np.testing.assert_allclose(
+        reopened.column("y_pred")[-3], results[0].y_pred.astype(np.float32)
+    )
+
+    exponential = reopened.select(forms=["exponential"])
+    assert np.all(np.isnan(reopened.column("params")[exponential][:, 3:]))
+
+    with pytest.raises(FileExistsError):
+        ResultStore.create(tmp_path / "store", forms, ["aic"], max_params=3)
+
+
+def test_result_store_ignores_rows_of_an_interrupted_append(tmp_path):
+    tool = CurveFittingTool()
+    store = ResultStore.create(tmp_path, ["linear"], ["r_squared"], max_params=2)
+    x, y, _ = _batch(tool, 4, 0)
+    store.append_batch(tool.search_and_evaluate_batch(x, y, ["linear"], n_jobs=1))
+
+    # Simulate a crash after some column files were written but before the manifest was.
+    with open(tmp_path / "series.bin", "ab") as f:
+        f.write(np.arange(3, dtype="<i8").tobytes())
+
+    reopened = ResultStore(tmp_path)
+    assert len(reopened) == 4
+    reopened.append_batch(tool.search_and_evaluate_batch(x, y, ["linear"], n_jobs=1))
+    np.testing.assert_array_equal(reopened.column("series"), np.arange(8))
+
+
+def test_result_store_only_registers_forms_of_a_valid_append(tmp_path):
+    tool = CurveFittingTool()
+    store = ResultStore.create(tmp_path, ["linear"], ["r_squared"], max_params=3, n_points=50)
+    _, y, batch = _batch(tool, 4, 0)
+
+    with pytest.raises(ValueError):
+        store.append_batch(batch, {form: y[:2] for form in batch.forms})
+    assert store.forms == ["linear"]
+    assert ResultStore(tmp_path).forms == ["linear"]
+
+    store.append_batch(batch)
+    assert store.forms == ["linear", "exponential", "logarithmic"]